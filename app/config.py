@@ -7,6 +7,11 @@ class Settings(BaseSettings):
     MODEL_DIR: str = os.getenv("MODEL_DIR", "./models")
     DATA_DIR: str = os.getenv("DATA_DIR", "./data/processed")
     DATASET_PATH: str = os.getenv("DATASET_PATH", "combined_movie_data.csv")
+    RATINGS_PATH: str = os.getenv("RATINGS_PATH", "cleaned_ratings.csv")
+    CATALOG_DIR: str = os.getenv("CATALOG_DIR", "catalog")
+    USER_HISTORY_DIR: str = os.getenv("USER_HISTORY_DIR", "user_history")
+    ARTIFACT_BUNDLE_DIR: str = os.getenv("ARTIFACT_BUNDLE_DIR", "bundle")
+    VERIFY_ARTIFACT_CHECKSUMS: bool = os.getenv("VERIFY_ARTIFACT_CHECKSUMS", "False").lower() == "true"
     
     # Server configurations
     HOST: str = os.getenv("HOST", "0.0.0.0")
@@ -17,8 +22,54 @@ class Settings(BaseSettings):
     API_DESCRIPTION: str = "API for movie recommendations using KNN algorithm"
     API_VERSION: str = "1.0.0"
     
+    # Admin configurations
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    # Without a token the admin endpoints answer 403 unless this is explicitly enabled
+    ADMIN_ALLOW_UNAUTHENTICATED: bool = os.getenv("ADMIN_ALLOW_UNAUTHENTICATED", "False").lower() in ("1", "true")
+    
     # Performance configurations
     ENABLE_CACHING: bool = os.getenv("ENABLE_CACHING", "True").lower() == "true"
+    RECOMMENDATION_CACHE_SIZE: int = int(os.getenv("RECOMMENDATION_CACHE_SIZE", 10000))
+    RECOMMENDATION_CACHE_MAX_MB: float = float(os.getenv("RECOMMENDATION_CACHE_MAX_MB", 64))
+    RECOMMENDATION_CACHE_TTL: float = float(os.getenv("RECOMMENDATION_CACHE_TTL", 3600))
+    RECOMMENDATION_CACHE_URL: str = os.getenv("RECOMMENDATION_CACHE_URL", "")
+    LISTING_CACHE_MAX_MB: float = float(os.getenv("LISTING_CACHE_MAX_MB", 32))
+    MODEL_WATCH_INTERVAL: float = float(os.getenv("MODEL_WATCH_INTERVAL", 0))
+    INDEX_BACKEND: str = os.getenv("INDEX_BACKEND", "exact")
+    INDEX_DIR: str = os.getenv("INDEX_DIR", "index")
+    COLLABORATIVE_DIR: str = os.getenv("COLLABORATIVE_DIR", "collaborative")
+    FACTORS_DIR: str = os.getenv("FACTORS_DIR", "factors")
+    TEXT_INDEX_DIR: str = os.getenv("TEXT_INDEX_DIR", "text_index")
+    IVF_N_PROBE: int = int(os.getenv("IVF_N_PROBE", 0))
+    INDEX_DTYPE: str = os.getenv("INDEX_DTYPE", "float32")
+    INDEX_SHARDS: int = int(os.getenv("INDEX_SHARDS", 0))
+    NEIGHBOR_TABLE_K: int = int(os.getenv("NEIGHBOR_TABLE_K", 100))
+    
+    # Filtered recommendations: exact scan over matching movies up to this many
+    FILTER_SCAN_MAX: int = int(os.getenv("FILTER_SCAN_MAX", 50000))
+    
+    # Free-text recommendations: weight of the feature KNN blended with the tag
+    # match, and how many top tag matches seed the feature query
+    TEXT_BLEND_WEIGHT: float = float(os.getenv("TEXT_BLEND_WEIGHT", 0.0))
+    TEXT_BLEND_SEEDS: int = int(os.getenv("TEXT_BLEND_SEEDS", 10))
+    
+    # Micro-batching of live neighbor searches
+    BATCH_WINDOW_MS: float = float(os.getenv("BATCH_WINDOW_MS", 2))
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", 64))
+    BATCH_MAX_PENDING: int = int(os.getenv("BATCH_MAX_PENDING", 1024))
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", min(4, os.cpu_count() or 1)))
+    
+    # Hybrid ranking configurations
+    HYBRID_CONTENT_WEIGHT: float = float(os.getenv("HYBRID_CONTENT_WEIGHT", 0.5))
+    HYBRID_COLLABORATIVE_WEIGHT: float = float(os.getenv("HYBRID_COLLABORATIVE_WEIGHT", 0.4))
+    HYBRID_PRIOR_WEIGHT: float = float(os.getenv("HYBRID_PRIOR_WEIGHT", 0.1))
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", 100))
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", 10000))
+    
+    # Profiling configurations (0 disables the sampling profiler)
+    PROFILE_SLOW_REQUEST_MS: float = float(os.getenv("PROFILE_SLOW_REQUEST_MS", 0))
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "./profiles")
     
     class Config:
         env_file = ".env"
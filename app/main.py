@@ -1,13 +1,20 @@
 import logging
 import time
+from pathlib import Path
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 
 from app.config import settings
 from app.models.loader import ModelLoader
-from app.routers import movies
+from app.routers import admin, metrics, movies, users
+from app.services.batcher import query_batcher
+from app.services.metrics import request_latency
+from app.services.profiler import profiler
+from app.services.recommendation import RecommendationService
+from app.services.users import UserRecommendationService
 
 # Configure logging
 logging.basicConfig(
@@ -39,23 +46,37 @@ app.add_middleware(
 # Add request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
+    status_code = 500
     try:
         response = await call_next(request)
-        process_time = time.time() - start_time
+        status_code = response.status_code
+        process_time = time.perf_counter() - start_time
         response.headers["X-Process-Time"] = str(process_time)
         logger.debug(f"Request to {request.url.path} took {process_time:.4f}s")
         return response
     except Exception as e:
         logger.error(f"Request to {request.url.path} failed: {str(e)}")
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
         return JSONResponse(
             status_code=500,
             content={"detail": str(e), "path": request.url.path, "process_time": process_time}
         )
+    finally:
+        stop_time = time.perf_counter()
+        # Label by route template so metric cardinality does not grow with movie ids
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        request_latency.observe(stop_time - start_time, request.method, route_path, str(status_code))
+        if profiler.is_slow(stop_time - start_time):
+            # Collapsing the samples and writing the profile would stall every other request
+            await run_in_threadpool(profiler.record, f"{request.method} {request.url.path}", start_time, stop_time)
 
 # Include routers
 app.include_router(movies.router)
+app.include_router(users.router)
+app.include_router(admin.router)
+app.include_router(metrics.router)
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -72,12 +93,28 @@ async def startup_event():
     logger.info("Starting movie recommendation API")
     try:
         model_loader = ModelLoader()
-        model_loader.load_models()
+        model_loader.add_reload_listener(RecommendationService.clear_cache)
+        model_loader.add_reload_listener(UserRecommendationService.clear_cache)
         model_loader.load_dataset()
+        model_loader.load_models()
         logger.info("API startup complete")
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         # Allow the app to start even if models fail to load - they can be loaded later
+    finally:
+        ModelLoader().start_watching(settings.MODEL_WATCH_INTERVAL)
+        if settings.PROFILE_SLOW_REQUEST_MS > 0:
+            profiler.start(settings.PROFILE_SLOW_REQUEST_MS / 1000, Path(settings.PROFILE_DIR),
+                           settings.PROFILE_INTERVAL_MS / 1000)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers on application shutdown."""
+    ModelLoader().stop_watching()
+    profiler.stop()
+    query_batcher.shutdown()
+    if ModelLoader().index is not None:
+        ModelLoader().index.close()
 
 @app.get("/", tags=["status"])
 async def root():
@@ -0,0 +1,289 @@
+"""Versioned, memory-mappable model artifact bundles."""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+# Legacy pickle files and the bundle entries they migrate to
+LEGACY_ARRAY_FILES = {
+    "features.pkl": "features",
+    "tag_vectors.pkl": "tag_vectors",
+}
+LEGACY_OBJECT_FILES = {
+    "tfidf_model.pkl": "tfidf",
+}
+LEGACY_OPTIONAL_ARRAY_FILES = {
+    "neighbor_indices.npy": "neighbor_indices",
+    "neighbor_distances.npy": "neighbor_distances",
+}
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact bundle is missing, malformed or corrupt."""
+
+
+def file_checksum(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactBundle:
+    """
+    A loaded artifact bundle.
+
+    Arrays are opened with ``mmap_mode='r'`` so that every worker process maps
+    the same page-cache copy instead of holding a private heap copy.
+    """
+
+    def __init__(self, path: Path, manifest: Dict[str, Any],
+                 arrays: Dict[str, np.ndarray], objects: Dict[str, Any]):
+        self.path = path
+        self.manifest = manifest
+        self.arrays = arrays
+        self.objects = objects
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.manifest.get("params", {})
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return an array or object entry by name, or None if absent."""
+        if name in self.arrays:
+            return self.arrays[name]
+        return self.objects.get(name)
+
+
+def _replace_file(path: Path, write: Callable[[Any], None]) -> None:
+    """
+    Write a file through a temporary name and rename it into place.
+
+    Renaming gives the new file a fresh inode, so processes that still have the
+    previous version memory-mapped keep reading intact data.
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def is_bundle(path: Path) -> bool:
+    """Check whether a directory contains an artifact bundle manifest."""
+    return (Path(path) / MANIFEST_FILE).exists()
+
+
+def write_bundle(
+    bundle_dir: Path,
+    arrays: Dict[str, np.ndarray],
+    objects: Optional[Dict[str, Any]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    version: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Write arrays as raw ``.npy`` files and objects as pickles, then the manifest.
+
+    Every file is renamed into place and the manifest is written last, so a
+    reader never sees a bundle whose files are still being written, and
+    processes mapping the previous version are not disturbed.
+
+    Args:
+        bundle_dir: Output directory
+        arrays: Named NumPy arrays
+        objects: Named picklable objects (e.g. fitted vectorizers)
+        params: Free-form build parameters recorded in the manifest
+        version: Bundle version; defaults to a hash of the file checksums
+
+    Returns:
+        The manifest dictionary
+    """
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = bundle_dir / MANIFEST_FILE
+
+    array_entries = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        filename = f"{name}.npy"
+        _replace_file(bundle_dir / filename, lambda f: np.save(f, array))
+        array_entries[name] = {
+            "file": filename,
+            "shape": list(array.shape),
+            "dtype": array.dtype.str,
+            "sha256": file_checksum(bundle_dir / filename),
+        }
+
+    object_entries = {}
+    for name, obj in (objects or {}).items():
+        filename = f"{name}.pkl"
+        _replace_file(
+            bundle_dir / filename,
+            lambda f: pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        object_entries[name] = {
+            "file": filename,
+            "sha256": file_checksum(bundle_dir / filename),
+        }
+
+    if version is None:
+        digest = hashlib.sha256()
+        for entries in (array_entries, object_entries):
+            for name in sorted(entries):
+                digest.update(f"{name}:{entries[name]['sha256']}".encode())
+        version = digest.hexdigest()[:12]
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "params": params or {},
+        "arrays": array_entries,
+        "objects": object_entries,
+    }
+
+    _replace_file(manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+
+    logger.info(f"Wrote artifact bundle {version} to {bundle_dir}")
+    return manifest
+
+
+def read_bundle(bundle_dir: Path, mmap: bool = True, verify_checksums: bool = False) -> ArtifactBundle:
+    """
+    Open an artifact bundle.
+
+    Args:
+        bundle_dir: Directory containing ``manifest.json``
+        mmap: Memory-map arrays read-only instead of reading them into memory
+        verify_checksums: Re-hash every file against the manifest (reads all bytes)
+
+    Returns:
+        The loaded ArtifactBundle
+    """
+    bundle_dir = Path(bundle_dir)
+    manifest_path = bundle_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise ArtifactError(f"Manifest not found: {manifest_path}")
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported bundle format {manifest.get('format_version')} (expected {FORMAT_VERSION})"
+        )
+
+    def check_file(entry: Dict[str, Any]) -> Path:
+        path = bundle_dir / entry["file"]
+        if not path.exists():
+            raise ArtifactError(f"Artifact file not found: {path}")
+        if verify_checksums and file_checksum(path) != entry["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {path}")
+        return path
+
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        array = np.load(check_file(entry), mmap_mode="r" if mmap else None, allow_pickle=False)
+        if list(array.shape) != entry["shape"] or array.dtype.str != entry["dtype"]:
+            raise ArtifactError(
+                f"Array {name} is {array.dtype.str}{list(array.shape)}, "
+                f"manifest says {entry['dtype']}{entry['shape']}"
+            )
+        arrays[name] = array
+
+    objects = {}
+    for name, entry in manifest["objects"].items():
+        with open(check_file(entry), "rb") as f:
+            objects[name] = pickle.load(f)
+
+    return ArtifactBundle(bundle_dir, manifest, arrays, objects)
+
+
+def load_feature_matrix(model_dir: Path) -> np.ndarray:
+    """Read the feature matrix from the artifact bundle, or ``features.pkl`` if there is none."""
+    bundle_dir = Path(model_dir) / settings.ARTIFACT_BUNDLE_DIR
+    if is_bundle(bundle_dir):
+        return read_bundle(bundle_dir).get("features")
+    with open(Path(model_dir) / "features.pkl", "rb") as f:
+        return np.asarray(pickle.load(f))
+
+
+def migrate_legacy(model_dir: Path, bundle_dir: Path) -> Dict[str, Any]:
+    """
+    Convert the legacy pickle files in ``model_dir`` into an artifact bundle.
+
+    The fitted ``NearestNeighbors`` pickle is not copied: it only holds a second
+    copy of the feature matrix, so its parameters are recorded in the manifest
+    and the index is refitted on the memory-mapped features at load time.
+    """
+    model_dir = Path(model_dir)
+    arrays = {}
+    objects = {}
+    params = {}
+
+    for filename, name in LEGACY_ARRAY_FILES.items():
+        with open(model_dir / filename, "rb") as f:
+            arrays[name] = np.asarray(pickle.load(f))
+
+    for filename, name in LEGACY_OBJECT_FILES.items():
+        with open(model_dir / filename, "rb") as f:
+            objects[name] = pickle.load(f)
+
+    for filename, name in LEGACY_OPTIONAL_ARRAY_FILES.items():
+        if (model_dir / filename).exists():
+            arrays[name] = np.load(model_dir / filename)
+
+    knn_path = model_dir / "knn_model.pkl"
+    if knn_path.exists():
+        with open(knn_path, "rb") as f:
+            knn = pickle.load(f)
+        params["knn"] = {"metric": knn.metric, "n_neighbors": int(knn.n_neighbors)}
+
+    return write_bundle(bundle_dir, arrays, objects, params)
+
+
+def main() -> None:
+    """Command line entry point for bundle maintenance."""
+    parser = argparse.ArgumentParser(description="Manage model artifact bundles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate", help="Convert legacy pickles into a bundle")
+    migrate.add_argument("--model-dir", default=settings.MODEL_DIR)
+    migrate.add_argument("--bundle-dir", default=None)
+
+    verify = subparsers.add_parser("verify", help="Check a bundle's shapes and checksums")
+    verify.add_argument("--bundle-dir", default=None)
+
+    args = parser.parse_args()
+    bundle_dir = Path(args.bundle_dir or Path(settings.MODEL_DIR) / settings.ARTIFACT_BUNDLE_DIR)
+
+    if args.command == "migrate":
+        manifest = migrate_legacy(Path(args.model_dir), bundle_dir)
+        print(f"Migrated legacy models to bundle {manifest['version']} at {bundle_dir}")
+    elif args.command == "verify":
+        bundle = read_bundle(bundle_dir, verify_checksums=True)
+        print(f"Bundle {bundle.version} at {bundle_dir} is valid")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
@@ -0,0 +1,90 @@
+"""Sparse item-item neighbor graph for collaborative recommendations."""
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from app.models.artifacts import read_bundle, write_bundle
+
+
+class NeighborGraph:
+    """
+    Top-K item-item similarities in CSR layout.
+
+    Row ``i`` of the graph is ``indices[indptr[i]:indptr[i + 1]]`` with the
+    matching ``similarities``, sorted by decreasing similarity. Rows can hold
+    fewer than K entries (or none) when a movie has few co-raters, and the
+    arrays are memory-mapped when loaded from disk.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, similarities: np.ndarray,
+                 params: Optional[Dict[str, Any]] = None, version: Optional[str] = None):
+        self.indptr = indptr
+        self.indices = indices
+        self.similarities = similarities
+        self.params = params or {}
+        self.version = version
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def k(self) -> int:
+        return int(self.params.get("k", np.diff(self.indptr).max(initial=0)))
+
+    def neighbors(self, idx: int, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return up to ``n_neighbors`` (indices, similarities) of one movie."""
+        start = int(self.indptr[idx])
+        stop = min(int(self.indptr[idx + 1]), start + n_neighbors)
+        return np.asarray(self.indices[start:stop]), np.asarray(self.similarities[start:stop])
+
+    def matrix(self) -> sp.csr_matrix:
+        """Return the graph as a (movies x movies) scipy CSR matrix of similarities, built once."""
+        if self._matrix is None:
+            n_items = len(self)
+            self._matrix = sp.csr_matrix(
+                (self.similarities, self.indices, self.indptr), shape=(n_items, n_items), copy=False
+            )
+        return self._matrix
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the graph size and build parameters."""
+        degrees = np.diff(self.indptr)
+        return {
+            "version": self.version,
+            "size": len(self),
+            "k": self.k,
+            "edges": int(self.indptr[-1]),
+            "empty_rows": int(np.count_nonzero(degrees == 0)),
+        }
+
+    @classmethod
+    def from_table(cls, indices: np.ndarray, distances: np.ndarray) -> "NeighborGraph":
+        """View a dense top-K neighbor table of cosine distances as a graph of similarities."""
+        n_items, k = indices.shape
+        return cls(
+            np.arange(0, n_items * k + 1, k, dtype=np.int64),
+            np.ascontiguousarray(indices, dtype=np.int32).ravel(),
+            (1.0 - np.asarray(distances, dtype=np.float32)).ravel(),
+            params={"k": k}
+        )
+
+    def save(self, directory: Path, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Persist the graph as an artifact bundle."""
+        arrays = {
+            "indptr": self.indptr.astype(np.int64, copy=False),
+            "indices": self.indices.astype(np.int32, copy=False),
+            "similarities": self.similarities.astype(np.float32, copy=False),
+        }
+        manifest = write_bundle(directory, arrays, params={**self.params, **(params or {})})
+        self.version = manifest["version"]
+        return manifest
+
+    @classmethod
+    def load(cls, directory: Path) -> "NeighborGraph":
+        """Open a persisted graph with memory-mapped arrays."""
+        bundle = read_bundle(directory, mmap=True)
+        return cls(bundle.get("indptr"), bundle.get("indices"), bundle.get("similarities"),
+                   bundle.params, bundle.version)
@@ -0,0 +1,89 @@
+"""Latent-factor (matrix factorization) model served with dot products."""
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.models.artifacts import read_bundle, write_bundle
+
+
+class FactorModel:
+    """
+    User and item factor matrices from ALS training.
+
+    ``user_factors`` row ``i`` belongs to ``user_ids[i]`` (sorted) and
+    ``item_factors`` rows follow the catalog order. Scoring a user against
+    every movie is one float32 matrix-vector product, so the cost per request
+    does not depend on the length of the user's history.
+    """
+
+    def __init__(self, user_ids: np.ndarray, user_factors: np.ndarray, item_factors: np.ndarray,
+                 params: Optional[Dict[str, Any]] = None, version: Optional[str] = None):
+        self.user_ids = user_ids
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.params = params or {}
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.item_factors)
+
+    @property
+    def offset(self) -> float:
+        """Global mean added to explicit-feedback predictions."""
+        return float(self.params.get("global_mean", 0.0)) if not self.params.get("implicit") else 0.0
+
+    def position(self, user_id: int) -> Optional[int]:
+        """Return the factor row of a user, or None if the user was not trained on."""
+        row = int(np.searchsorted(self.user_ids, user_id))
+        if row < len(self.user_ids) and self.user_ids[row] == user_id:
+            return row
+        return None
+
+    def scores(self, row: int) -> np.ndarray:
+        """Score every movie for one user row."""
+        user_vector = np.asarray(self.user_factors[row], dtype=np.float32)
+        return self.item_factors @ user_vector + np.float32(self.offset)
+
+    def top_k(self, row: int, n_results: int,
+              exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (indices, scores) of the best ``n_results`` movies, skipping ``exclude``."""
+        scores = self.scores(row)
+        if exclude is not None and len(exclude):
+            scores[exclude] = -np.inf
+
+        n_results = min(n_results, len(scores) - (len(exclude) if exclude is not None else 0))
+        if n_results <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, n_results - 1)[:n_results]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top]
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the model size and training parameters."""
+        return {
+            "version": self.version,
+            "users": len(self.user_ids),
+            "items": len(self),
+            "factors": int(self.item_factors.shape[1]),
+            "implicit": bool(self.params.get("implicit", False)),
+            "report": self.params.get("report"),
+        }
+
+    def save(self, directory: Path, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Persist the factors as a bundle of float32 ``.npy`` arrays."""
+        arrays = {
+            "user_ids": self.user_ids.astype(np.int32, copy=False),
+            "user_factors": self.user_factors.astype(np.float32, copy=False),
+            "item_factors": self.item_factors.astype(np.float32, copy=False),
+        }
+        manifest = write_bundle(directory, arrays, params={**self.params, **(params or {})})
+        self.version = manifest["version"]
+        return manifest
+
+    @classmethod
+    def load(cls, directory: Path) -> "FactorModel":
+        """Open persisted factors with memory-mapped arrays."""
+        bundle = read_bundle(directory, mmap=True)
+        return cls(bundle.get("user_ids"), bundle.get("user_factors"), bundle.get("item_factors"),
+                   bundle.params, bundle.version)
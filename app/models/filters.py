@@ -0,0 +1,131 @@
+"""Bitset and sorted-array indexes for filtering movies by genre, year and popularity."""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.index import normalize_rows
+
+# Catalog columns with a sorted index for range filters
+RANGE_COLUMNS = ("release_year", "total_ratings")
+
+
+class FilterIndex:
+    """
+    Candidate masks for filtered recommendations, built once per catalog.
+
+    Every genre is a packed bitset with one bit per movie, so requiring
+    several genres is a byte-wise AND over ``n / 8`` bytes. ``release_year``
+    and ``total_ratings`` are stored as values sorted with their movie
+    indices: a range filter is two binary searches, and only the movies
+    inside the range are touched when it is turned into a mask.
+    """
+
+    def __init__(self, genre_names: Sequence[str], genre_mask: np.ndarray,
+                 columns: Dict[str, np.ndarray]):
+        self.n_items = len(genre_mask)
+        self.genre_names = list(genre_names)
+        self._genre_lookup = {name.lower(): name for name in self.genre_names}
+        genre_mask = np.asarray(genre_mask, dtype=np.uint32)
+        self.genre_bits = {
+            name: np.packbits((genre_mask >> np.uint32(bit)) & np.uint32(1) == 1)
+            for bit, name in enumerate(self.genre_names)
+        }
+        self.sorted_columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            order = np.argsort(values, kind="stable").astype(np.int32)
+            self.sorted_columns[name] = (values[order], order)
+
+    @classmethod
+    def from_catalog(cls, catalog) -> "FilterIndex":
+        columns = {name: getattr(catalog, name) for name in RANGE_COLUMNS
+                   if getattr(catalog, name, None) is not None}
+        return cls(catalog.genre_names, catalog.genre_mask, columns)
+
+    def parse_genres(self, genres: Optional[str]) -> List[str]:
+        """Parse a comma-separated, case-insensitive genre list."""
+        if not genres:
+            return []
+        names = [name.strip() for name in genres.split(",") if name.strip()]
+        unknown = [name for name in names if name.lower() not in self._genre_lookup]
+        if unknown:
+            raise ValueError(f"Unknown genres {unknown}; choose from {self.genre_names}")
+        return [self._genre_lookup[name.lower()] for name in names]
+
+    def _range(self, column: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Return the movies whose ``column`` lies in [low, high] (either bound may be open)."""
+        if column not in self.sorted_columns:
+            raise ValueError(f"The catalog has no {column} column; rebuild it with python -m app.models.catalog")
+        values, order = self.sorted_columns[column]
+        start = np.searchsorted(values, low, side="left") if low is not None else 0
+        stop = np.searchsorted(values, high, side="right") if high is not None else len(values)
+        return order[start:stop]
+
+    def mask(self, genres: Sequence[str] = (), year_min: Optional[int] = None,
+             year_max: Optional[int] = None, min_ratings: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Combine filters into a boolean mask over the catalog.
+
+        Args:
+            genres: Genre names a movie must all have
+            year_min: Earliest release year (inclusive)
+            year_max: Latest release year (inclusive)
+            min_ratings: Minimum number of ratings
+
+        Returns:
+            Boolean array with one entry per movie, or None when no filter is set
+        """
+        if not genres and year_min is None and year_max is None and min_ratings is None:
+            return None
+
+        if genres:
+            bits = self.genre_bits[genres[0]].copy()
+            for name in genres[1:]:
+                np.bitwise_and(bits, self.genre_bits[name], out=bits)
+            mask = np.unpackbits(bits, count=self.n_items).view(bool)
+        else:
+            mask = np.ones(self.n_items, dtype=bool)
+
+        ranges = []
+        if year_min is not None or year_max is not None:
+            # Unknown years are stored as 0 and never match a year filter
+            ranges.append(self._range("release_year", max(year_min or 1, 1), year_max))
+        if min_ratings is not None:
+            ranges.append(self._range("total_ratings", min_ratings, None))
+        for matches in ranges:
+            in_range = np.zeros(self.n_items, dtype=bool)
+            in_range[matches] = True
+            mask &= in_range
+        return mask
+
+    def memory_usage(self) -> int:
+        """Return the size in bytes of the bitsets and sorted arrays."""
+        return (sum(bits.nbytes for bits in self.genre_bits.values())
+                + sum(values.nbytes + order.nbytes for values, order in self.sorted_columns.values()))
+
+
+def masked_search(features: np.ndarray, query: np.ndarray, candidates: np.ndarray, n_results: int,
+                  block_size: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine search restricted to a set of candidate rows.
+
+    Candidates are scored in blocks, keeping a running top ``n_results``, so
+    memory stays bounded however broad the filter is.
+
+    Returns:
+        Tuple of (movie indices, cosine similarities), most similar first
+    """
+    query = normalize_rows(query)[0]
+    best_indices = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0, dtype=np.float32)
+    for start in range(0, len(candidates), block_size):
+        block = candidates[start:start + block_size]
+        scores = normalize_rows(features[block]) @ query
+        best_indices = np.concatenate((best_indices, block))
+        best_scores = np.concatenate((best_scores, scores))
+        if len(best_scores) > n_results:
+            top = np.argpartition(-best_scores, n_results - 1)[:n_results]
+            best_indices, best_scores = best_indices[top], best_scores[top]
+
+    order = np.argsort(-best_scores, kind="stable")
+    return best_indices[order], best_scores[order]
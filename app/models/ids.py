@@ -0,0 +1,88 @@
+"""Lookup of catalog rows by external movie ids (MovieLens, IMDb, TMDb)."""
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# API id type -> (response field, catalog array)
+ID_TYPES = {
+    "id": ("movieId", "movie_id"),
+    "imdb": ("imdbId", "imdb_id"),
+    "tmdb": ("tmdbId", "tmdb_id"),
+}
+
+# Ids are looked up in a dense table when it is at most this many entries per movie
+DENSE_MAX_RATIO = 32
+
+
+class IdLookup:
+    """
+    Maps the positive ids of one catalog column to row indices.
+
+    When the largest id is small relative to the catalog (MovieLens movie
+    ids), a dense int32 table indexed by id answers in O(1). Sparse id
+    spaces (IMDb ids reach the millions) would make that table mostly
+    empty, so they are kept as sorted keys with their rows and looked up
+    with a binary search instead. Ids of 0 mean unknown and are skipped.
+    When several movies share an id, the first row wins.
+    """
+
+    def __init__(self, ids: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        known = np.flatnonzero(ids > 0)
+        keys, first = np.unique(ids[known], return_index=True)
+        rows = known[first].astype(np.int32)
+        self.n_ids = len(keys)
+        self.duplicates = len(known) - len(keys)
+
+        max_id = int(keys[-1]) if len(keys) else 0
+        self.dense = max_id < DENSE_MAX_RATIO * max(len(ids), 1)
+        if self.dense:
+            self.table = np.full(max_id + 1, -1, dtype=np.int32)
+            self.table[keys] = rows
+        else:
+            self.keys = keys
+            self.rows = rows
+
+    def position(self, value: int) -> Optional[int]:
+        """Return the row of an id, or None if no movie has it."""
+        if self.dense:
+            row = int(self.table[value]) if 0 < value < len(self.table) else -1
+        else:
+            slot = int(np.searchsorted(self.keys, value))
+            row = int(self.rows[slot]) if slot < len(self.keys) and self.keys[slot] == value else -1
+        return row if row >= 0 else None
+
+    def memory_usage(self) -> int:
+        return self.table.nbytes if self.dense else self.keys.nbytes + self.rows.nbytes
+
+
+class IdIndex:
+    """Row lookups for every external id type the catalog carries."""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.lookups = {id_type: IdLookup(ids) for id_type, ids in columns.items()}
+
+    @classmethod
+    def from_catalog(cls, catalog) -> "IdIndex":
+        # Catalogs built before the link columns were added only have movie ids
+        return cls({id_type: getattr(catalog, column) for id_type, (_, column) in ID_TYPES.items()
+                    if getattr(catalog, column, None) is not None})
+
+    def position(self, id_type: str, value: int) -> Optional[int]:
+        """
+        Return the catalog row of a movie id.
+
+        Raises:
+            KeyError: If the catalog has no ids of this type
+        """
+        return self.lookups[id_type].position(value)
+
+    def memory_usage(self) -> int:
+        return sum(lookup.memory_usage() for lookup in self.lookups.values())
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            id_type: {"ids": lookup.n_ids, "duplicates": lookup.duplicates,
+                      "layout": "dense" if lookup.dense else "sorted", "bytes": lookup.memory_usage()}
+            for id_type, lookup in self.lookups.items()
+        }
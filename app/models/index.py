@@ -0,0 +1,327 @@
+"""Nearest-neighbor index backends behind the recommendation service."""
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+from app.models.artifacts import read_bundle, write_bundle
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(vectors: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """Return an L2-normalized copy of the rows (zero rows stay zero)."""
+    matrix = np.asarray(vectors, dtype=dtype)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class NeighborIndex:
+    """
+    Base class for cosine nearest-neighbor indexes.
+
+    Every backend answers ``query`` with the same contract as
+    ``NearestNeighbors.kneighbors``: a pair of (distances, indices) arrays of
+    shape (n_queries, n_neighbors), sorted by increasing cosine distance.
+    """
+
+    backend = None
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def query(self, vectors: np.ndarray, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the backend name and its tunable parameters."""
+        return {"backend": self.backend, "size": len(self)}
+
+    def close(self) -> None:
+        """Release resources held outside this object, such as worker processes."""
+
+
+class ExactIndex(NeighborIndex):
+    """Brute-force cosine search through a fitted ``NearestNeighbors`` model."""
+
+    backend = "exact"
+
+    def __init__(self, knn: NearestNeighbors):
+        self.knn = knn
+
+    @classmethod
+    def build(cls, features: np.ndarray) -> "ExactIndex":
+        return cls(NearestNeighbors(metric="cosine", algorithm="brute").fit(features))
+
+    def __len__(self) -> int:
+        return self.knn.n_samples_fit_
+
+    def query(self, vectors: np.ndarray, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.knn.kneighbors(vectors, n_neighbors=min(n_neighbors, len(self)))
+
+
+class IVFIndex(NeighborIndex):
+    """
+    Inverted-file approximate index over L2-normalized vectors.
+
+    Vectors are clustered with spherical k-means into ``n_lists`` lists and
+    stored grouped by list. A query scores the centroids, then scans only the
+    ``n_probe`` closest lists, so the cost per query is roughly
+    ``n_lists + n_probe * N / n_lists`` dot products instead of ``N``.
+    Raising ``n_probe`` trades speed for recall.
+    """
+
+    backend = "ivf"
+
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray,
+                 list_items: np.ndarray, vectors: np.ndarray, n_probe: int = 8):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_items = list_items
+        self.vectors = vectors
+        self.n_probe = n_probe
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.list_items)
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "n_lists": self.n_lists, "n_probe": self.n_probe}
+
+    @classmethod
+    def build(cls, features: np.ndarray, n_lists: Optional[int] = None, n_probe: int = 8,
+              n_iter: int = 20, sample_size: int = 256, seed: int = 42) -> "IVFIndex":
+        """
+        Train the coarse quantizer and assign every vector to a list.
+
+        Args:
+            features: Feature matrix of shape (n_items, n_features)
+            n_lists: Number of k-means lists (defaults to ~sqrt(n_items))
+            n_probe: Default number of lists scanned per query
+            n_iter: Number of k-means iterations
+            sample_size: Training points per list used to fit the centroids
+            seed: Random seed for reproducible builds
+        """
+        vectors = normalize_rows(features)
+        n_items = len(vectors)
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(n_items)))
+        n_lists = min(n_lists, n_items)
+        rng = np.random.default_rng(seed)
+
+        sample = vectors
+        if n_items > n_lists * sample_size:
+            sample = vectors[rng.choice(n_items, n_lists * sample_size, replace=False)]
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignments = cls._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)
+            # Re-seed empty lists with random training points
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+
+        assignments = cls._assign(vectors, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_lists)
+        list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        return cls(centroids, list_offsets, order.astype(np.int32),
+                   np.ascontiguousarray(vectors[order]), n_probe)
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, block_size: int = 65536) -> np.ndarray:
+        """Assign each vector to its most similar centroid, in blocks."""
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start:start + block_size]
+            assignments[start:start + block_size] = np.argmax(block @ centroids.T, axis=1)
+        return assignments
+
+    def query(self, vectors: np.ndarray, n_neighbors: int,
+              n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize_rows(vectors)
+        n_neighbors = min(n_neighbors, len(self))
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        list_sizes = np.diff(self.list_offsets)
+
+        distances = np.empty((len(queries), n_neighbors), dtype=np.float64)
+        indices = np.empty((len(queries), n_neighbors), dtype=np.int64)
+        list_order = np.argsort(-(queries @ self.centroids.T), axis=1)
+
+        for row, query in enumerate(queries):
+            # Probe at least n_probe lists, and more if they hold fewer than n_neighbors items
+            probe_count = max(n_probe, int(np.searchsorted(np.cumsum(list_sizes[list_order[row]]), n_neighbors)) + 1)
+            probed = list_order[row, :probe_count]
+            positions = np.concatenate([
+                np.arange(self.list_offsets[lst], self.list_offsets[lst + 1]) for lst in probed
+            ])
+
+            similarities = self.vectors[positions] @ query
+            if len(positions) > n_neighbors:
+                top = np.argpartition(-similarities, n_neighbors - 1)[:n_neighbors]
+            else:
+                top = np.arange(len(positions))
+            top = top[np.argsort(-similarities[top], kind="stable")]
+
+            indices[row] = self.list_items[positions[top]]
+            distances[row] = np.clip(1.0 - similarities[top], 0.0, 2.0)
+
+        return distances, indices
+
+    def save(self, directory: Path, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Persist the index as an artifact bundle."""
+        arrays = {
+            "centroids": self.centroids,
+            "list_offsets": self.list_offsets,
+            "list_items": self.list_items,
+            "vectors": self.vectors,
+        }
+        return write_bundle(directory, arrays, params={
+            "backend": self.backend, "n_probe": self.n_probe, **(params or {})
+        })
+
+    @classmethod
+    def load(cls, directory: Path, n_probe: Optional[int] = None) -> "IVFIndex":
+        """Open a persisted index with memory-mapped arrays."""
+        bundle = read_bundle(directory, mmap=True)
+        return cls(
+            bundle.get("centroids"),
+            bundle.get("list_offsets"),
+            bundle.get("list_items"),
+            bundle.get("vectors"),
+            n_probe or bundle.params.get("n_probe", 8)
+        )
+
+
+class FlatIndex(NeighborIndex):
+    """
+    Brute-force cosine search over pre-normalized, optionally quantized vectors.
+
+    Rows are L2-normalized once when the index is built, so a query is a
+    plain matrix-vector product; ``NearestNeighbors`` recomputes the norms
+    on every call. Vectors are stored as float32, float16, or int8 codes
+    with one float32 scale per dimension, in which case the similarity is
+    ``codes @ (query * scales)``. The scan runs ``block_size`` rows at a
+    time, converted to float32 for BLAS, and keeps each block's best rows
+    with ``argpartition``.
+    """
+
+    backend = "flat"
+    DTYPES = ("float32", "float16", "int8")
+
+    def __init__(self, vectors: np.ndarray, scales: Optional[np.ndarray] = None, block_size: int = 16384):
+        self.vectors = vectors
+        self.scales = scales
+        self.block_size = block_size
+
+    @property
+    def dtype(self) -> str:
+        return str(self.vectors.dtype)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def memory_usage(self) -> int:
+        """Return the bytes held by the stored vectors and scales."""
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "dtype": self.dtype, "bytes": self.memory_usage()}
+
+    @classmethod
+    def build(cls, features: np.ndarray, dtype: str = "float32", block_size: int = 16384) -> "FlatIndex":
+        """
+        Normalize the feature rows and store them in the given precision.
+
+        Args:
+            features: Feature matrix of shape (n_items, n_features)
+            dtype: ``float32``, ``float16`` or ``int8``
+            block_size: Rows scored per matrix product
+        """
+        if dtype not in cls.DTYPES:
+            raise ValueError(f"Unknown index dtype '{dtype}' (expected one of {list(cls.DTYPES)})")
+
+        vectors = np.empty(features.shape, dtype=np.float32)
+        for start in range(0, len(features), 65536):
+            vectors[start:start + 65536] = normalize_rows(features[start:start + 65536])
+        if dtype != "int8":
+            return cls(vectors.astype(dtype, copy=False), block_size=block_size)
+
+        # Symmetric per-dimension quantization of the normalized values
+        scales = np.abs(vectors).max(axis=0) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales).astype(np.int8)
+        return cls(codes, scales.astype(np.float32), block_size)
+
+    def query(self, vectors: np.ndarray, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize_rows(vectors)
+        if self.scales is not None:
+            queries = queries * self.scales
+        n_neighbors = min(n_neighbors, len(self))
+
+        block_scores, block_indices = [], []
+        for start in range(0, len(self), self.block_size):
+            scores = queries @ np.asarray(self.vectors[start:start + self.block_size], dtype=np.float32).T
+            if scores.shape[1] > n_neighbors:
+                top = np.argpartition(-scores, n_neighbors - 1, axis=1)[:, :n_neighbors]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            block_scores.append(scores)
+            block_indices.append(top + start)
+
+        scores, indices = np.hstack(block_scores), np.hstack(block_indices)
+        if scores.shape[1] > n_neighbors:
+            top = np.argpartition(-scores, n_neighbors - 1, axis=1)[:, :n_neighbors]
+            scores, indices = np.take_along_axis(scores, top, axis=1), np.take_along_axis(indices, top, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        scores, indices = np.take_along_axis(scores, order, axis=1), np.take_along_axis(indices, order, axis=1)
+        return np.clip(1.0 - scores.astype(np.float64), 0.0, 2.0), indices.astype(np.int64)
+
+
+INDEX_BACKENDS = {
+    ExactIndex.backend: ExactIndex,
+    IVFIndex.backend: IVFIndex,
+    FlatIndex.backend: FlatIndex,
+}
+
+
+def recall_at_k(index: NeighborIndex, exact: NeighborIndex, queries: np.ndarray,
+                k: int = 10) -> Dict[str, float]:
+    """
+    Measure the recall@k of an index against exact search and time both.
+
+    Returns:
+        Dictionary with recall and mean per-query latency (ms) of each index
+    """
+    start_time = time.perf_counter()
+    _, approx_indices = index.query(queries, k)
+    approx_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    _, exact_indices = exact.query(queries, k)
+    exact_time = time.perf_counter() - start_time
+
+    hits = sum(
+        len(np.intersect1d(approx_row, exact_row))
+        for approx_row, exact_row in zip(approx_indices, exact_indices)
+    )
+    return {
+        "recall": hits / float(exact_indices.size),
+        "index_ms_per_query": 1000 * approx_time / len(queries),
+        "exact_ms_per_query": 1000 * exact_time / len(queries),
+    }
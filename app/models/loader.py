@@ -1,15 +1,68 @@
+import hashlib
 import pickle
 import logging
-import pandas as pd
-from typing import Dict, List, Any, Tuple
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import os
 from pathlib import Path
 from fastapi import HTTPException
+from sklearn.neighbors import NearestNeighbors
 
 from app.config import settings
+from app.models.catalog import Catalog
+from app.models.filters import FilterIndex
+from app.models.ids import ID_TYPES, IdIndex
+from app.models.collaborative import NeighborGraph
+from app.models.factors import FactorModel
+from app.models.artifacts import MANIFEST_FILE, ArtifactError, is_bundle, read_bundle
+from app.models.index import INDEX_BACKENDS, ExactIndex, FlatIndex, NeighborIndex
+from app.models.search import TitleSearchIndex
+from app.models.shards import ShardedIndex
+from app.models.text import TagIndex
+from app.models.users import UserHistory
+from app.services.listing import MovieListing
+from app.services.metrics import shard_latency
+from app.training.neighbors import NEIGHBOR_INDICES_FILE, NEIGHBOR_DISTANCES_FILE
 
 logger = logging.getLogger(__name__)
 
+class ModelState:
+    """
+    An immutable snapshot of one loaded model version.
+    
+    Requests capture the active snapshot once, so a hot reload never mixes
+    artifacts from two versions within a single request.
+    """
+    
+    def __init__(self, knn=None, tfidf=None, tag_vectors=None, features=None,
+                 neighbor_indices=None, neighbor_distances=None, version=None,
+                 artifact_format=None, load_timings=None, loaded_at=None, index=None,
+                 collaborative=None, factors=None, text_index=None):
+        self.knn = knn
+        self.index = index
+        self.tfidf = tfidf
+        self.tag_vectors = tag_vectors
+        self.features = features
+        self.neighbor_indices = neighbor_indices
+        self.neighbor_distances = neighbor_distances
+        self.collaborative = collaborative
+        self.factors = factors
+        self.text_index = text_index
+        self.version = version
+        self.artifact_format = artifact_format
+        self.load_timings = load_timings or {}
+        self.loaded_at = loaded_at
+        self._content_graph = None
+    
+    def content_graph(self) -> Optional[NeighborGraph]:
+        """Return the precomputed neighbor table as a similarity graph, built on first use."""
+        if self._content_graph is None and self.neighbor_indices is not None:
+            self._content_graph = NeighborGraph.from_table(self.neighbor_indices, self.neighbor_distances)
+        return self._content_graph
+
+
 class ModelLoader:
     """Responsible for loading and managing ML models and datasets."""
     
@@ -19,83 +72,518 @@ class ModelLoader:
         if cls._instance is None:
             cls._instance = super(ModelLoader, cls).__new__(cls)
             # Initialize instance variables
-            cls._instance.knn = None
-            cls._instance.tfidf = None
-            cls._instance.tag_vectors = None
-            cls._instance.features = None
-            cls._instance.movie_names = None
-            cls._instance.movie_df = None
+            cls._instance.models = ModelState()
+            cls._instance.catalog = None
+            cls._instance.title_index = None
+            cls._instance.filter_index = None
+            cls._instance.id_index = None
+            cls._instance.movie_listing = None
+            cls._instance.user_history = None
+            cls._instance.dataset_version = None
+            cls._instance.reload_status = {"state": "idle"}
+            cls._instance._reload_lock = threading.Lock()
+            cls._instance._reload_listeners = []
+            cls._instance._watcher = None
         return cls._instance
     
+    # Accessors for the active model version
+    knn = property(lambda self: self.models.knn)
+    index = property(lambda self: self.models.index)
+    tfidf = property(lambda self: self.models.tfidf)
+    tag_vectors = property(lambda self: self.models.tag_vectors)
+    features = property(lambda self: self.models.features)
+    neighbor_indices = property(lambda self: self.models.neighbor_indices)
+    neighbor_distances = property(lambda self: self.models.neighbor_distances)
+    collaborative = property(lambda self: self.models.collaborative)
+    factors = property(lambda self: self.models.factors)
+    model_version = property(lambda self: self.models.version)
+    artifact_format = property(lambda self: self.models.artifact_format)
+    
     def load_models(self) -> None:
-        """Load all required ML models from disk."""
-        model_dir = settings.MODEL_DIR
+        """
+        Load all required ML models from disk.
+        
+        Prefers the memory-mapped artifact bundle in ``MODEL_DIR/ARTIFACT_BUNDLE_DIR``
+        and falls back to the legacy pickle files when no bundle exists.
+        """
+        try:
+            self._activate(self._read_models())
+        except Exception as e:
+            logger.error(f"Error loading models: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to load models: {str(e)}")
+    
+    def reload_models(self) -> Dict[str, Any]:
+        """
+        Load a new model version, validate it and swap it in atomically.
+        
+        The active version keeps serving while the new one loads; requests
+        that already captured it finish against it. Only one reload runs at
+        a time.
         
+        Returns:
+            The reload status dictionary
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise HTTPException(status_code=409, detail="A model reload is already in progress")
+        
+        previous_version = self.model_version
+        self.reload_status = {"state": "loading", "started_at": time.time()}
         try:
-            # Check if models directory exists
-            if not os.path.exists(model_dir):
-                raise FileNotFoundError(f"Model directory not found: {model_dir}")
+            self.load_user_history()
+            state = self._read_models()
             
-            model_files = {
-                "knn_model.pkl": "knn",
-                "tfidf_model.pkl": "tfidf",
-                "tag_vectors.pkl": "tag_vectors",
-                "features.pkl": "features"
-            }
+            start_time = time.perf_counter()
+            self.validate_models(state)
+            state.load_timings["validate"] = time.perf_counter() - start_time
             
-            for filename, attr_name in model_files.items():
-                file_path = Path(model_dir) / filename
-                if not file_path.exists():
-                    raise FileNotFoundError(f"Model file not found: {file_path}")
-                
-                logger.info(f"Loading model from {file_path}")
-                with open(file_path, "rb") as f:
-                    setattr(self, attr_name, pickle.load(f))
+            if state.version == previous_version and state.artifact_format == "bundle":
+                self.reload_status = {"state": "unchanged", "version": state.version}
+                logger.info(f"Model version {state.version} is already active")
+                return self.reload_status
             
-            logger.info("All models loaded successfully")
+            self._activate(state)
+            self.reload_status = {
+                "state": "completed",
+                "previous_version": previous_version,
+                "version": state.version,
+                "load_timings": state.load_timings
+            }
+            logger.info(f"Swapped model version {previous_version} -> {state.version}")
             
         except Exception as e:
-            logger.error(f"Error loading models: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to load models: {str(e)}")
+            logger.error(f"Model reload failed, keeping version {previous_version}: {str(e)}")
+            self.reload_status = {"state": "failed", "version": previous_version, "error": str(e)}
+        finally:
+            self._reload_lock.release()
+        
+        return self.reload_status
+    
+    def reload_in_background(self) -> None:
+        """Start a model reload on a background thread."""
+        if self._reload_lock.locked():
+            raise HTTPException(status_code=409, detail="A model reload is already in progress")
+        threading.Thread(target=self.reload_models, name="model-reload", daemon=True).start()
+    
+    def validate_models(self, state: ModelState) -> None:
+        """Check a loaded model version against the catalog and run a smoke query."""
+        n_movies = len(state.features)
+        
+        if self.catalog is not None and n_movies != len(self.catalog):
+            raise ValueError(
+                f"Feature rows ({n_movies}) do not match the catalog ({len(self.catalog)} movies)"
+            )
+        
+        if self.features is not None and state.features.shape[1] != self.features.shape[1]:
+            logger.warning(
+                f"Feature width changed from {self.features.shape[1]} to {state.features.shape[1]}"
+            )
+        
+        if len(state.index) != n_movies:
+            raise ValueError(f"Index holds {len(state.index)} items, expected {n_movies}")
+        
+        distances, indices = state.index.query(np.asarray(state.features[:1]), n_neighbors=2)
+        if not np.all((indices >= 0) & (indices < n_movies)) or not np.all(np.isfinite(distances)):
+            raise ValueError("Smoke query returned invalid neighbors")
+    
+    def add_reload_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Register a callback invoked with (old_version, new_version) after each swap."""
+        if listener not in self._reload_listeners:
+            self._reload_listeners.append(listener)
+    
+    def _activate(self, state: ModelState) -> None:
+        """Make a loaded model version the active one and notify listeners."""
+        previous_version = self.models.version
+        state.loaded_at = time.time()
+        self.models = state
+        logger.info(f"All models loaded successfully (version {state.version})")
+        
+        for listener in self._reload_listeners:
+            try:
+                listener(previous_version, state.version)
+            except Exception as e:
+                logger.warning(f"Reload listener failed: {str(e)}")
+    
+    def _read_models(self) -> ModelState:
+        """Read a complete model version from disk without activating it."""
+        model_dir = settings.MODEL_DIR
+        bundle_dir = Path(model_dir) / settings.ARTIFACT_BUNDLE_DIR
+        
+        # Check if models directory exists
+        if not os.path.exists(model_dir):
+            raise FileNotFoundError(f"Model directory not found: {model_dir}")
+        
+        start_time = time.perf_counter()
+        if is_bundle(bundle_dir):
+            state = self._load_bundle(bundle_dir)
+        else:
+            state = self._load_legacy_models(Path(model_dir))
+        state.index = self._load_index(state)
+        state.collaborative = self._load_aligned(state, "collaborative", settings.COLLABORATIVE_DIR, NeighborGraph)
+        state.factors = self._load_aligned(state, "factors", settings.FACTORS_DIR, FactorModel)
+        state.text_index = self._load_aligned(state, "text", settings.TEXT_INDEX_DIR, TagIndex)
+        if state.text_index is not None and not state.text_index.matches(state.tfidf):
+            logger.warning("Ignoring text index built with a different TF-IDF vocabulary")
+            state.text_index = None
+        for model in (state.collaborative, state.factors, state.text_index):
+            if model is not None:
+                # A new graph or factor model alone is a new model version
+                state.version = f"{state.version}+{model.version}"
+        state.load_timings["total"] = time.perf_counter() - start_time
+        
+        return state
+    
+    def _load_bundle(self, bundle_dir: Path) -> ModelState:
+        """Load models from a versioned artifact bundle with memory-mapped arrays."""
+        logger.info(f"Loading artifact bundle from {bundle_dir}")
+        start_time = time.perf_counter()
+        bundle = read_bundle(bundle_dir, mmap=True, verify_checksums=settings.VERIFY_ARTIFACT_CHECKSUMS)
+        read_time = time.perf_counter() - start_time
+        
+        for name in ("features", "tag_vectors", "tfidf"):
+            if bundle.get(name) is None:
+                raise ArtifactError(f"Bundle {bundle.version} has no '{name}' entry")
+        
+        features = bundle.get("features")
+        
+        # Brute-force fitting keeps a reference to the mapped features instead of a copy
+        start_time = time.perf_counter()
+        knn_params = bundle.params.get("knn", {})
+        knn = NearestNeighbors(
+            n_neighbors=knn_params.get("n_neighbors", 10),
+            metric=knn_params.get("metric", "cosine"),
+            algorithm="brute"
+        ).fit(features)
+        fit_time = time.perf_counter() - start_time
+        
+        indices = bundle.get("neighbor_indices")
+        distances = bundle.get("neighbor_distances")
+        if indices is None or distances is None:
+            indices, distances = self.load_neighbor_table()
+        indices, distances = self._check_neighbor_table(indices, distances, features)
+        
+        return ModelState(
+            knn=knn,
+            tfidf=bundle.get("tfidf"),
+            tag_vectors=bundle.get("tag_vectors"),
+            features=features,
+            neighbor_indices=indices,
+            neighbor_distances=distances,
+            version=bundle.version,
+            artifact_format="bundle",
+            load_timings={"read_artifacts": read_time, "fit_index": fit_time}
+        )
+    
+    def _load_legacy_models(self, model_dir: Path) -> ModelState:
+        """Load models from the legacy pickle files."""
+        model_files = {
+            "knn_model.pkl": "knn",
+            "tfidf_model.pkl": "tfidf",
+            "tag_vectors.pkl": "tag_vectors",
+            "features.pkl": "features"
+        }
+        
+        start_time = time.perf_counter()
+        loaded = {}
+        for filename, attr_name in model_files.items():
+            file_path = model_dir / filename
+            if not file_path.exists():
+                raise FileNotFoundError(f"Model file not found: {file_path}")
+            
+            logger.info(f"Loading model from {file_path}")
+            with open(file_path, "rb") as f:
+                loaded[attr_name] = pickle.load(f)
+        
+        indices, distances = self._check_neighbor_table(*self.load_neighbor_table(), loaded["features"])
+        
+        return ModelState(
+            neighbor_indices=indices,
+            neighbor_distances=distances,
+            version="legacy",
+            artifact_format="legacy",
+            load_timings={"read_artifacts": time.perf_counter() - start_time},
+            **loaded
+        )
+    
+    def _load_index(self, state: ModelState) -> NeighborIndex:
+        """Open the configured index backend, falling back to exact search."""
+        backend = settings.INDEX_BACKEND
+        if backend == ExactIndex.backend:
+            return ExactIndex(state.knn)
+        
+        if backend in (FlatIndex.backend, ShardedIndex.backend):
+            # Normalizing the features is cheap, so these indexes are never stale on disk
+            start_time = time.perf_counter()
+            if backend == ShardedIndex.backend:
+                index = ShardedIndex.build(state.features, settings.INDEX_DTYPE, settings.INDEX_SHARDS or None,
+                                           latency=shard_latency)
+            else:
+                index = FlatIndex.build(state.features, settings.INDEX_DTYPE)
+            state.load_timings["build_index"] = time.perf_counter() - start_time
+            logger.info(f"Built '{backend}' index: {index.describe()}")
+            return index
+        
+        if backend not in INDEX_BACKENDS:
+            backends = sorted([*INDEX_BACKENDS, ShardedIndex.backend])
+            raise ValueError(f"Unknown index backend '{backend}' (expected one of {backends})")
+        
+        index_dir = Path(settings.MODEL_DIR) / settings.INDEX_DIR / backend
+        if not is_bundle(index_dir):
+            logger.warning(f"No '{backend}' index found in {index_dir}, using exact search")
+            return ExactIndex(state.knn)
+        
+        start_time = time.perf_counter()
+        index = INDEX_BACKENDS[backend].load(index_dir, settings.IVF_N_PROBE or None)
+        state.load_timings["load_index"] = time.perf_counter() - start_time
+        
+        if len(index) != len(state.features):
+            logger.warning(
+                f"Ignoring '{backend}' index with {len(index)} items: features have {len(state.features)} rows"
+            )
+            return ExactIndex(state.knn)
+        
+        logger.info(f"Loaded '{backend}' index: {index.describe()}")
+        return index
+    
+    def _load_aligned(self, state: ModelState, name: str, directory: str, model_class: Any) -> Optional[Any]:
+        """Open an optional per-movie model (graph, factors) if it has been built for these movies."""
+        model_dir = Path(settings.MODEL_DIR) / directory
+        if not is_bundle(model_dir):
+            logger.info(f"No {name} model found in {model_dir}")
+            return None
+        
+        start_time = time.perf_counter()
+        model = model_class.load(model_dir)
+        state.load_timings[f"load_{name}"] = time.perf_counter() - start_time
+        
+        if len(model) != len(state.features):
+            logger.warning(
+                f"Ignoring {name} model with {len(model)} movies: features have {len(state.features)} rows"
+            )
+            return None
+        
+        logger.info(f"Loaded {name} model: {model.describe()}")
+        return model
+    
+    def load_neighbor_table(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Load the precomputed top-K neighbor table if it has been built."""
+        indices_path = Path(settings.MODEL_DIR) / NEIGHBOR_INDICES_FILE
+        distances_path = Path(settings.MODEL_DIR) / NEIGHBOR_DISTANCES_FILE
+        
+        if not indices_path.exists() or not distances_path.exists():
+            logger.info("No precomputed neighbor table found, using live KNN queries")
+            return None, None
+        
+        return np.load(indices_path), np.load(distances_path)
+    
+    def _check_neighbor_table(
+        self, indices: Optional[np.ndarray], distances: Optional[np.ndarray], features: np.ndarray
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Return the neighbor table if it matches the features, otherwise (None, None)."""
+        if indices is None or distances is None:
+            return None, None
+        
+        if indices.shape != distances.shape or indices.shape[0] != len(features):
+            logger.warning(
+                f"Ignoring neighbor table with shape {indices.shape}: does not match the features"
+            )
+            return None, None
+        
+        logger.info(f"Loaded neighbor table with K={indices.shape[1]}")
+        return indices, distances
+    
+    def artifact_fingerprint(self) -> Optional[Tuple]:
+        """Return the modification times of the artifact files, used to detect new versions."""
+        model_dir = Path(settings.MODEL_DIR)
+        bundle_dir = model_dir / settings.ARTIFACT_BUNDLE_DIR
+        
+        if is_bundle(bundle_dir):
+            paths = [bundle_dir / MANIFEST_FILE]
+        else:
+            paths = [
+                model_dir / filename
+                for filename in ("knn_model.pkl", "tfidf_model.pkl", "tag_vectors.pkl",
+                                 "features.pkl", NEIGHBOR_INDICES_FILE, NEIGHBOR_DISTANCES_FILE)
+            ]
+        paths.append(model_dir / settings.COLLABORATIVE_DIR / MANIFEST_FILE)
+        paths.append(model_dir / settings.FACTORS_DIR / MANIFEST_FILE)
+        paths.append(model_dir / settings.TEXT_INDEX_DIR / MANIFEST_FILE)
+        paths.append(Path(settings.DATA_DIR) / settings.USER_HISTORY_DIR / MANIFEST_FILE)
+        
+        try:
+            return tuple(path.stat().st_mtime_ns if path.exists() else None for path in paths)
+        except OSError:
+            return None
+    
+    def start_watching(self, interval: float) -> None:
+        """Poll the artifact files and hot reload when they change."""
+        if self._watcher is not None or interval <= 0:
+            return
+        
+        stop_event = threading.Event()
+        
+        def watch():
+            fingerprint = self.artifact_fingerprint()
+            while not stop_event.wait(interval):
+                current = self.artifact_fingerprint()
+                if current == fingerprint:
+                    continue
+                logger.info("Model artifacts changed on disk, reloading")
+                try:
+                    self.reload_models()
+                except HTTPException:
+                    # Another reload is running; keep the old fingerprint so the next poll retries
+                    logger.info("A reload is already in progress, retrying on the next poll")
+                    continue
+                fingerprint = current
+        
+        thread = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher = (thread, stop_event)
+        thread.start()
+        logger.info(f"Watching model artifacts every {interval}s")
+    
+    def stop_watching(self) -> None:
+        """Stop the artifact file watcher if it is running."""
+        if self._watcher is not None:
+            thread, stop_event = self._watcher
+            stop_event.set()
+            thread.join(timeout=5)
+            self._watcher = None
     
     def load_dataset(self) -> None:
-        """Load the movie dataset and extract relevant information."""
+        """
+        Load the movie catalog and build the lookup structures.
+        
+        Opens the prebuilt columnar catalog in ``DATA_DIR/CATALOG_DIR`` when it
+        exists, otherwise builds it from the combined dataset CSV.
+        """
+        catalog_dir = Path(settings.DATA_DIR) / settings.CATALOG_DIR
         csv_path = Path(settings.DATA_DIR) / settings.DATASET_PATH
         
         try:
-            if not csv_path.exists():
-                raise FileNotFoundError(f"Dataset file not found: {csv_path}")
-            
-            logger.info(f"Loading dataset from {csv_path}")
-            self.movie_df = pd.read_csv(csv_path)
+            if is_bundle(catalog_dir):
+                logger.info(f"Loading catalog from {catalog_dir}")
+                catalog = Catalog.load(catalog_dir)
+            else:
+                if not csv_path.exists():
+                    raise FileNotFoundError(f"Dataset file not found: {csv_path}")
+                
+                logger.info(f"No catalog in {catalog_dir}, building it from {csv_path}")
+                catalog = Catalog.from_csv(csv_path)
+                stat = csv_path.stat()
+                catalog.version = hashlib.sha1(
+                    f"{csv_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+                ).hexdigest()[:12]
             
-            if "title" not in self.movie_df.columns:
-                raise ValueError("CSV file does not contain a 'title' column")
+            self.catalog = catalog
+            self.dataset_version = catalog.version
+            self.title_index = TitleSearchIndex(list(catalog.iter_titles()))
+            self.filter_index = FilterIndex.from_catalog(catalog)
+            self.id_index = IdIndex.from_catalog(catalog)
+            self.movie_listing = MovieListing({
+                "index": lambda start, stop: list(range(start, stop)),
+                "movieId": lambda start, stop: catalog.movie_id[start:stop].tolist(),
+                "title": catalog.titles
+            }, len(catalog), catalog.version,
+                max_cached_bytes=int(settings.LISTING_CACHE_MAX_MB * 1024 * 1024))
             
-            self.movie_names = self.movie_df["title"].tolist()
-            logger.info(f"Loaded {len(self.movie_names)} movie titles")
+            logger.info(
+                f"Loaded {len(catalog)} movies ({catalog.memory_usage()['total'] / 1024:.1f} KiB catalog)"
+            )
+            self.load_user_history()
             
         except Exception as e:
             logger.error(f"Error loading dataset: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to load dataset: {str(e)}")
     
+    def load_user_history(self) -> None:
+        """Open the per-user rating history index if it has been built and changed."""
+        history_dir = Path(settings.DATA_DIR) / settings.USER_HISTORY_DIR
+        if not is_bundle(history_dir):
+            logger.info(f"No user history index in {history_dir}, user recommendations are disabled")
+            return
+        
+        history = UserHistory.load(history_dir)
+        if self.user_history is not None and history.version == self.user_history.version:
+            return
+        
+        n_movies = len(self.catalog) if self.catalog is not None else None
+        if n_movies is not None and len(history.items) and int(history.items.max()) >= n_movies:
+            logger.warning(f"Ignoring user history {history.version}: it references movies beyond the catalog")
+            return
+        
+        self.user_history = history
+        logger.info(f"Loaded user history: {history.describe()}")
+    
     def get_movie_name(self, idx: int) -> str:
         """Get movie title by index with validation."""
-        if self.movie_names is None:
+        if self.catalog is None:
             raise HTTPException(status_code=500, detail="Movie data not loaded")
             
-        if not 0 <= idx < len(self.movie_names):
+        if not 0 <= idx < len(self.catalog):
             raise HTTPException(status_code=404, detail=f"Movie index {idx} out of bounds")
             
-        return self.movie_names[idx]
+        return self.catalog.title(idx)
+    
+    def resolve_movie_id(self, id_type: str, movie_id: int) -> int:
+        """Return the catalog index of a movie given its MovieLens, IMDb or TMDb id."""
+        if self.id_index is None:
+            raise HTTPException(status_code=500, detail="Movie data not loaded")
+        
+        field = ID_TYPES[id_type][0]
+        try:
+            idx = self.id_index.position(id_type, movie_id)
+        except KeyError:
+            raise HTTPException(
+                status_code=404,
+                detail=f"The catalog has no {field} column; rebuild it with python -m app.models.catalog"
+            )
+        if idx is None:
+            raise HTTPException(status_code=404, detail=f"No movie with {field} {movie_id}")
+        
+        return idx
+    
+    def get_movie(self, idx: int) -> Dict[str, Any]:
+        """Get a movie's title and external ids by index."""
+        movie = {"index": idx, "title": self.get_movie_name(idx)}
+        for field, column in ID_TYPES.values():
+            ids = getattr(self.catalog, column)
+            if ids is not None:
+                movie[field] = int(ids[idx])
+        return movie
+    
+    def search_titles(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search movie titles, returning ranked matches with their titles."""
+        if self.title_index is None:
+            raise HTTPException(status_code=500, detail="Movie data not loaded")
+        
+        results = self.title_index.search(query, limit)
+        for result in results:
+            result["title"] = self.catalog.title(result["index"])
+        return results
     
-    def get_model_status(self) -> Dict[str, bool]:
+    def get_model_status(self) -> Dict[str, Any]:
         """Return loading status of all models and data."""
+        models = self.models
         return {
-            "knn_loaded": self.knn is not None,
-            "tfidf_loaded": self.tfidf is not None,
-            "tag_vectors_loaded": self.tag_vectors is not None,
-            "features_loaded": self.features is not None,
-            "movie_data_loaded": self.movie_names is not None,
-            "total_movies": len(self.movie_names) if self.movie_names else 0
-        }
\ No newline at end of file
+            "model_version": models.version,
+            "artifact_format": models.artifact_format,
+            "loaded_at": models.loaded_at,
+            "load_timings": models.load_timings,
+            "reload": self.reload_status,
+            "index": models.index.describe() if models.index is not None else None,
+            "knn_loaded": models.knn is not None,
+            "tfidf_loaded": models.tfidf is not None,
+            "tag_vectors_loaded": models.tag_vectors is not None,
+            "features_loaded": models.features is not None,
+            "neighbor_table_k": models.neighbor_indices.shape[1] if models.neighbor_indices is not None else 0,
+            "collaborative": models.collaborative.describe() if models.collaborative is not None else None,
+            "factors": models.factors.describe() if models.factors is not None else None,
+            "text_index": models.text_index.describe() if models.text_index is not None else None,
+            "movie_data_loaded": self.catalog is not None,
+            "dataset_version": self.dataset_version,
+            "user_history": self.user_history.describe() if self.user_history is not None else None,
+            "catalog_bytes": self.catalog.memory_usage()["total"] if self.catalog is not None else 0,
+            "filter_index_bytes": self.filter_index.memory_usage() if self.filter_index is not None else 0,
+            "id_index": self.id_index.describe() if self.id_index is not None else None,
+            "total_movies": len(self.catalog) if self.catalog is not None else 0
+        }
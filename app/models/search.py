@@ -0,0 +1,149 @@
+"""In-memory title search index for lookup and autocomplete."""
+import bisect
+import re
+import unicodedata
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+YEAR_PATTERN = re.compile(r"\s*\(\d{4}(?:-\d{4})?\)\s*$")
+TRAILING_ARTICLE_PATTERN = re.compile(r"^(.*), (the|a|an|les|la|le|l'|il|el|die|der|das)$")
+NON_WORD_PATTERN = re.compile(r"[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Ranking tiers: exact title > title prefix > fuzzy n-gram match
+EXACT_MATCH = 3.0
+PREFIX_MATCH = 2.0
+
+
+def normalize_title(text: str) -> str:
+    """
+    Normalize a title or query for matching.
+
+    Lowercases, strips accents and punctuation, removes a trailing release
+    year and moves MovieLens-style trailing articles to the front, so
+    "Matrix, The (1999)" becomes "the matrix".
+    """
+    text = YEAR_PATTERN.sub("", text.strip())
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    match = TRAILING_ARTICLE_PATTERN.match(text)
+    if match:
+        text = f"{match.group(2)} {match.group(1)}"
+    text = NON_WORD_PATTERN.sub(" ", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def trigrams(text: str) -> List[str]:
+    """Return the distinct character trigrams of a padded string."""
+    padded = f"  {text} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class TitleSearchIndex:
+    """
+    Title lookup structures built once when the dataset is loaded.
+
+    A sorted array of normalized keys answers prefix (autocomplete) queries
+    with a binary search, and a character trigram inverted index answers
+    typo-tolerant queries by counting shared trigrams with ``np.bincount``.
+    Every title is indexed with and without its leading article.
+    """
+
+    def __init__(self, titles: Sequence[str]):
+        self.n_titles = len(titles)
+        keys = []
+        for idx, title in enumerate(titles):
+            key = normalize_title(title)
+            keys.append((key, idx))
+            stripped = re.sub(r"^(the|a|an) ", "", key)
+            if stripped != key:
+                keys.append((stripped, idx))
+        keys.sort()
+
+        self.sorted_keys = [key for key, _ in keys]
+        self.sorted_ids = np.array([idx for _, idx in keys], dtype=np.int32)
+
+        # Trigram postings and per-title trigram counts over the full normalized title
+        postings: Dict[str, List[int]] = {}
+        self.trigram_counts = np.zeros(self.n_titles, dtype=np.int32)
+        for idx, title in enumerate(titles):
+            grams = trigrams(normalize_title(title))
+            self.trigram_counts[idx] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(idx)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def prefix_matches(self, query: str, limit: int) -> List[int]:
+        """Return indices of titles whose normalized form starts with the query."""
+        start = bisect.bisect_left(self.sorted_keys, query)
+        matches = []
+        seen = set()
+        for position in range(start, len(self.sorted_keys)):
+            if not self.sorted_keys[position].startswith(query) or len(matches) >= limit:
+                break
+            idx = int(self.sorted_ids[position])
+            if idx not in seen:
+                seen.add(idx)
+                matches.append(idx)
+        return matches
+
+    def fuzzy_matches(self, query: str, limit: int, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        """Return (index, Dice similarity) pairs of titles sharing trigrams with the query."""
+        grams = [gram for gram in trigrams(query) if gram in self.postings]
+        if not grams:
+            return []
+
+        shared = np.bincount(
+            np.concatenate([self.postings[gram] for gram in grams]), minlength=self.n_titles
+        )
+        candidates = np.flatnonzero(shared)
+        scores = 2.0 * shared[candidates] / (len(trigrams(query)) + self.trigram_counts[candidates])
+
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, object]]:
+        """
+        Rank titles for a user-typed query.
+
+        Exact (year-insensitive) matches come first, then prefix matches,
+        then fuzzy trigram matches ordered by similarity.
+
+        Returns:
+            List of dicts with ``index``, ``score`` and ``match`` keys
+        """
+        normalized = normalize_title(query)
+        if not normalized:
+            return []
+
+        results = []
+        seen = set()
+        for idx in self.prefix_matches(normalized, limit):
+            exact = self._is_exact(idx, normalized)
+            results.append({
+                "index": idx,
+                "score": EXACT_MATCH if exact else PREFIX_MATCH,
+                "match": "exact" if exact else "prefix",
+            })
+            seen.add(idx)
+
+        if len(results) < limit:
+            for idx, score in self.fuzzy_matches(normalized, limit + len(seen)):
+                if idx not in seen:
+                    results.append({"index": idx, "score": score, "match": "fuzzy"})
+                    seen.add(idx)
+
+        results.sort(key=lambda result: -result["score"])
+        return results[:limit]
+
+    def _is_exact(self, idx: int, normalized: str) -> bool:
+        """Check whether one of a title's keys equals the normalized query."""
+        start = bisect.bisect_left(self.sorted_keys, normalized)
+        end = bisect.bisect_right(self.sorted_keys, normalized)
+        return idx in self.sorted_ids[start:end]
@@ -0,0 +1,146 @@
+"""Scatter-gather neighbor search over item shards held by worker processes."""
+import heapq
+import logging
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+from app.models.index import FlatIndex, NeighborIndex
+from app.models.shared import ArraySpecs, SharedArrays, attach, attached
+
+logger = logging.getLogger(__name__)
+
+_worker: Dict[str, Any] = {}
+
+
+def _attach(specs: ArraySpecs, block_size: int) -> None:
+    """Worker initializer: map the parent's vectors and keep BLAS on one thread."""
+    attach(specs)
+    # Shards already run on separate cores, threaded BLAS would oversubscribe them
+    _worker["blas_limits"] = threadpool_limits(1)
+    _worker["block_size"] = block_size
+
+
+def _search_shard(start: int, stop: int, queries: np.ndarray,
+                  n_neighbors: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Search rows ``start:stop`` of the shared vectors.
+
+    Returns:
+        Tuple of (distances, global indices, seconds spent searching)
+    """
+    start_time = time.perf_counter()
+    shard = FlatIndex(attached["vectors"][start:stop], attached.get("scales"), _worker["block_size"])
+    distances, indices = shard.query(queries, n_neighbors)
+    return distances, indices + start, time.perf_counter() - start_time
+
+
+def _release(executor: ProcessPoolExecutor, shared: SharedArrays) -> None:
+    """Stop the workers, then free the shared vectors."""
+    executor.shutdown(wait=True, cancel_futures=True)
+    shared.__exit__(None, None, None)
+
+
+class ShardedIndex(NeighborIndex):
+    """
+    Exact search with the catalog split into shards searched in parallel.
+
+    The normalized (optionally quantized) vectors of a ``FlatIndex`` are
+    copied once into shared memory and cut into ``n_shards`` contiguous row
+    ranges. Each query batch is sent to a pool of worker processes, one
+    task per shard. Every worker returns the shard's local top-K, and the
+    API process merges the sorted shard lists with a heap. A single query
+    therefore uses up to ``n_shards`` cores instead of one.
+
+    Workers are started with ``spawn`` so they never inherit the API
+    process's threads. The pool and the shared memory are released by
+    ``close`` or when the index is garbage collected after a model swap.
+    When a ``latency`` histogram is given, each shard's search time is
+    observed under the shard number and the merge under ``"merge"``.
+    """
+
+    backend = "sharded"
+
+    def __init__(self, index: FlatIndex, n_shards: int, latency: Optional[Any] = None):
+        self.n_shards = max(1, min(n_shards, len(index)))
+        self.bounds = np.linspace(0, len(index), self.n_shards + 1).astype(np.int64)
+        self.dtype = index.dtype
+        self.size = len(index)
+        self.bytes = index.memory_usage()
+        self.latency = latency
+
+        self._shared = SharedArrays()
+        self._shared.add("vectors", np.asarray(index.vectors))
+        if index.scales is not None:
+            self._shared.add("scales", index.scales)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_shards,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach,
+            initargs=(self._shared.specs(), index.block_size)
+        )
+        self._finalizer = weakref.finalize(self, _release, self._executor, self._shared)
+
+    @classmethod
+    def build(cls, features: np.ndarray, dtype: str = "float32",
+              n_shards: Optional[int] = None, latency: Optional[Any] = None) -> "ShardedIndex":
+        """
+        Build the flat vectors, share them and start one worker per shard.
+
+        Args:
+            features: Feature matrix of shape (n_items, n_features)
+            dtype: Storage precision, as for ``FlatIndex``
+            n_shards: Number of shards and worker processes (defaults to the CPU count)
+            latency: Histogram with one label observing the shard and merge times
+        """
+        index = cls(FlatIndex.build(features, dtype), n_shards or os.cpu_count() or 1, latency)
+        # Start every worker now rather than on the first request
+        index.query(np.asarray(features[:1]), 1)
+        return index
+
+    def __len__(self) -> int:
+        return self.size
+
+    def describe(self) -> Dict[str, Any]:
+        return {**super().describe(), "n_shards": self.n_shards, "dtype": self.dtype, "bytes": self.bytes}
+
+    def query(self, vectors: np.ndarray, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        n_neighbors = min(n_neighbors, len(self))
+
+        futures = [
+            self._executor.submit(_search_shard, int(start), int(stop), queries, n_neighbors)
+            for start, stop in zip(self.bounds[:-1], self.bounds[1:])
+        ]
+        results = []
+        for shard, future in enumerate(futures):
+            distances, indices, seconds = future.result()
+            if self.latency is not None:
+                self.latency.observe(seconds, str(shard))
+            results.append((distances.tolist(), indices.tolist()))
+
+        start_time = time.perf_counter()
+        distances = np.empty((len(queries), n_neighbors), dtype=np.float64)
+        indices = np.empty((len(queries), n_neighbors), dtype=np.int64)
+        for row in range(len(queries)):
+            # Each shard's list is already sorted by distance
+            merged = heapq.merge(*(zip(shard_distances[row], shard_indices[row])
+                                   for shard_distances, shard_indices in results))
+            distances[row], indices[row] = zip(*islice(merged, n_neighbors))
+        if self.latency is not None:
+            self.latency.observe(time.perf_counter() - start_time, "merge")
+        return distances, indices
+
+    def close(self) -> None:
+        """Stop the worker processes and free the shared vectors."""
+        self._finalizer()
+
@@ -0,0 +1,58 @@
+"""NumPy arrays shared with worker processes through ``multiprocessing.shared_memory``."""
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Block name, shape and dtype of each shared array, as passed to workers
+ArraySpecs = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+# Arrays attached by this worker process, by name
+attached: Dict[str, np.ndarray] = {}
+_blocks: Dict[str, shared_memory.SharedMemory] = {}
+
+
+class SharedArrays:
+    """
+    NumPy arrays backed by ``multiprocessing.shared_memory`` blocks.
+
+    The parent process copies each array in once. Workers map the blocks by
+    name with ``attach``, so large matrices exist once in memory however
+    many processes read them, and workers can write results in place.
+    """
+
+    def __init__(self):
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    def add(self, name: str, array: np.ndarray) -> None:
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        view[...] = array
+        self.blocks[name] = block
+        self.arrays[name] = view
+
+    def specs(self) -> ArraySpecs:
+        return {name: (self.blocks[name].name, array.shape, array.dtype.str)
+                for name, array in self.arrays.items()}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+
+
+def attach(specs: ArraySpecs) -> None:
+    """Worker initializer: map the parent's shared arrays into ``attached``."""
+    attached.clear()
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _blocks[name] = block
+        attached[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
@@ -0,0 +1,125 @@
+"""TF-IDF tag index for free-text recommendations."""
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from app.models.artifacts import read_bundle, write_bundle
+
+
+def vocabulary_hash(vectorizer: Any) -> str:
+    """Fingerprint a fitted vectorizer's vocabulary, in column order."""
+    terms = vectorizer.get_feature_names_out()
+    return hashlib.sha1("\n".join(terms).encode("utf-8")).hexdigest()[:16]
+
+
+class TagIndex:
+    """
+    L2-normalized TF-IDF tag vectors of every movie, stored as term postings.
+
+    The movie x term matrix is kept term-major (the CSR layout of its
+    transpose): ``movies[indptr[t]:indptr[t + 1]]`` are the movies that
+    contain term ``t`` and ``weights`` their TF-IDF weights. Scoring a query
+    only reads the postings of its own terms, so the cost depends on how
+    many movies share a query term rather than on the catalog size.
+    """
+
+    def __init__(self, indptr: np.ndarray, movies: np.ndarray, weights: np.ndarray,
+                 params: Optional[Dict[str, Any]] = None, version: Optional[str] = None):
+        self.indptr = indptr
+        self.movies = movies
+        self.weights = weights
+        self.params = params or {}
+        self.version = version
+
+    def __len__(self) -> int:
+        return int(self.params["n_items"])
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.indptr) - 1
+
+    @classmethod
+    def build(cls, vectorizer: Any, documents: Iterable[str]) -> "TagIndex":
+        """Vectorize every movie's tags and invert the matrix into postings."""
+        matrix = vectorizer.transform(documents)
+        # TfidfVectorizer already normalizes rows, but other vectorizers may not
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        postings = sp.csr_matrix(sp.diags(scale) @ matrix).T.tocsr()
+        postings.sort_indices()
+        return cls(
+            postings.indptr.astype(np.int64),
+            postings.indices.astype(np.int32),
+            postings.data.astype(np.float32),
+            params={
+                "n_items": matrix.shape[0],
+                "vocabulary_hash": vocabulary_hash(vectorizer),
+                "tagged_items": int(np.count_nonzero(norms)),
+            }
+        )
+
+    def matches(self, vectorizer: Any) -> bool:
+        """Check that the index was built with the same vocabulary as ``vectorizer``."""
+        return self.params.get("vocabulary_hash") == vocabulary_hash(vectorizer)
+
+    def search(self, query: sp.spmatrix, n_results: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rank movies by cosine similarity to a vectorized query.
+
+        Args:
+            query: One-row sparse TF-IDF vector (L2-normalized)
+            n_results: Maximum number of movies to return
+
+        Returns:
+            Tuple of (movie indices, cosine similarities), most similar first;
+            only movies sharing at least one query term are returned
+        """
+        query = sp.csr_matrix(query)
+        terms, term_weights = query.indices, query.data
+        if len(terms) == 0 or n_results <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        norm = np.linalg.norm(term_weights)
+        spans = [(int(self.indptr[term]), int(self.indptr[term + 1])) for term in terms]
+        movies = np.concatenate([self.movies[start:stop] for start, stop in spans])
+        weights = np.concatenate([
+            self.weights[start:stop] * (weight / norm) for (start, stop), weight in zip(spans, term_weights)
+        ])
+        if len(movies) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        candidates, positions = np.unique(movies, return_inverse=True)
+        scores = np.bincount(positions, weights=weights).astype(np.float32)
+        if len(scores) > n_results:
+            top = np.argpartition(-scores, n_results - 1)[:n_results]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[top].astype(np.int64), scores[top]
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the index size and vocabulary."""
+        return {
+            "version": self.version,
+            "size": len(self),
+            "terms": self.n_terms,
+            "postings": int(self.indptr[-1]),
+            "tagged_items": self.params.get("tagged_items"),
+        }
+
+    def save(self, directory: Path, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Persist the index as an artifact bundle."""
+        arrays = {"indptr": self.indptr, "movies": self.movies, "weights": self.weights}
+        manifest = write_bundle(directory, arrays, params={**self.params, **(params or {})})
+        self.version = manifest["version"]
+        return manifest
+
+    @classmethod
+    def load(cls, directory: Path) -> "TagIndex":
+        """Open a persisted index with memory-mapped arrays."""
+        bundle = read_bundle(directory, mmap=True)
+        return cls(bundle.get("indptr"), bundle.get("movies"), bundle.get("weights"),
+                   bundle.params, bundle.version)
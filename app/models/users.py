@@ -0,0 +1,148 @@
+"""Compact per-user rating history index."""
+import argparse
+import logging
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.artifacts import read_bundle, write_bundle
+
+logger = logging.getLogger(__name__)
+
+
+class UserHistory:
+    """
+    Every user's rated movies and ratings in CSR layout.
+
+    Layout (u = number of users, r = number of ratings):
+
+    - ``user_ids``: int32, sorted, u entries
+    - ``indptr``: int64, u + 1 entries
+    - ``items``: int32 catalog indices, sorted within each user, r entries
+    - ``ratings``: float32, r entries
+    - ``checksums``: uint32 CRC of each user's items and ratings, u entries
+
+    A user's history (and seen-set) is a slice of ``items`` found with one
+    binary search, and the checksums tell when a rebuilt index changed a
+    user's history.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], version: Optional[str] = None):
+        self.arrays = arrays
+        self.version = version
+        self.user_ids = arrays["user_ids"]
+        self.indptr = arrays["indptr"]
+        self.items = arrays["items"]
+        self.ratings = arrays["ratings"]
+        self.checksums = arrays["checksums"]
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def position(self, user_id: int) -> Optional[int]:
+        """Return the row of a user, or None if the user has no ratings."""
+        row = int(np.searchsorted(self.user_ids, user_id))
+        if row < len(self.user_ids) and self.user_ids[row] == user_id:
+            return row
+        return None
+
+    def history(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (sorted catalog indices, ratings) of one user row."""
+        start, stop = int(self.indptr[row]), int(self.indptr[row + 1])
+        return np.asarray(self.items[start:stop]), np.asarray(self.ratings[start:stop])
+
+    def describe(self) -> Dict[str, object]:
+        """Return the index version and size."""
+        return {
+            "version": self.version,
+            "users": len(self),
+            "ratings": int(self.indptr[-1]),
+            "bytes": sum(int(array.nbytes) for array in self.arrays.values()),
+        }
+
+    def save(self, directory: Path) -> Dict:
+        """Persist the index as an artifact bundle."""
+        manifest = write_bundle(directory, self.arrays)
+        self.version = manifest["version"]
+        return manifest
+
+    @classmethod
+    def load(cls, directory: Path) -> "UserHistory":
+        """Open a persisted index with memory-mapped arrays."""
+        bundle = read_bundle(directory, mmap=True)
+        return cls(bundle.arrays, bundle.version)
+
+    @classmethod
+    def build(cls, user_ids: np.ndarray, movie_ids: np.ndarray, ratings: np.ndarray,
+              catalog_movie_ids: np.ndarray) -> "UserHistory":
+        """
+        Build the index from rating columns, mapping movie ids to catalog indices.
+
+        Ratings of movies missing from the catalog are dropped; for repeated
+        (user, movie) pairs the last rating wins.
+        """
+        order = np.argsort(catalog_movie_ids, kind="stable")
+        positions = np.searchsorted(catalog_movie_ids, movie_ids, sorter=order)
+        positions = np.minimum(positions, len(order) - 1)
+        items = order[positions]
+        known = catalog_movie_ids[items] == movie_ids
+        if not known.all():
+            logger.warning(f"Ignoring {np.count_nonzero(~known)} ratings of movies missing from the catalog")
+
+        user_ids = np.asarray(user_ids)[known].astype(np.int32)
+        items = items[known].astype(np.int32)
+        ratings = np.asarray(ratings)[known].astype(np.float32)
+
+        # Sort by (user, item) and keep the last rating of duplicate pairs
+        order = np.lexsort((items, user_ids))
+        user_ids, items, ratings = user_ids[order], items[order], ratings[order]
+        last = np.ones(len(items), dtype=bool)
+        last[:-1] = (user_ids[1:] != user_ids[:-1]) | (items[1:] != items[:-1])
+        user_ids, items, ratings = user_ids[last], items[last], ratings[last]
+
+        unique_users, starts = np.unique(user_ids, return_index=True)
+        indptr = np.append(starts, len(items)).astype(np.int64)
+        checksums = np.array([
+            zlib.crc32(ratings[start:stop].tobytes(), zlib.crc32(items[start:stop].tobytes()))
+            for start, stop in zip(indptr[:-1], indptr[1:])
+        ], dtype=np.uint32)
+
+        return cls({
+            "user_ids": unique_users.astype(np.int32),
+            "indptr": indptr,
+            "items": items,
+            "ratings": ratings,
+            "checksums": checksums,
+        })
+
+
+def main() -> None:
+    """Build the user history index from the cleaned ratings."""
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Build the per-user rating history index")
+    parser.add_argument("--ratings", default=str(Path(settings.DATA_DIR) / settings.RATINGS_PATH))
+    parser.add_argument("--dataset", default=str(Path(settings.DATA_DIR) / settings.DATASET_PATH))
+    parser.add_argument("--output-dir", default=str(Path(settings.DATA_DIR) / settings.USER_HISTORY_DIR))
+    args = parser.parse_args()
+
+    catalog_movie_ids = pd.read_csv(args.dataset, usecols=["movieId"])["movieId"].to_numpy()
+    ratings = pd.read_csv(
+        args.ratings, usecols=["userId", "movieId", "rating"],
+        dtype={"userId": np.int32, "movieId": np.int32, "rating": np.float32}
+    )
+
+    history = UserHistory.build(
+        ratings["userId"].to_numpy(), ratings["movieId"].to_numpy(),
+        ratings["rating"].to_numpy(), catalog_movie_ids
+    )
+    manifest = history.save(Path(args.output_dir))
+    print(f"Built user history {manifest['version']}: {history.describe()} at {args.output_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
@@ -0,0 +1,107 @@
+"""Administrative endpoints for model lifecycle management."""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pathlib import Path
+from typing import Optional
+import hmac
+import logging
+
+from app.config import settings
+from app.models.loader import ModelLoader
+from app.services.batcher import query_batcher
+from app.services.profiler import profiler
+from app.services.recommendation import RecommendationService
+from app.services.users import user_cache
+
+logger = logging.getLogger(__name__)
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Require the configured admin token.
+    
+    Without ``ADMIN_TOKEN`` every admin request is refused, unless
+    ``ADMIN_ALLOW_UNAUTHENTICATED`` opts out of authentication explicitly.
+    """
+    if not settings.ADMIN_TOKEN:
+        if settings.ADMIN_ALLOW_UNAUTHENTICATED:
+            return
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Require a configured and matching admin token, even when unauthenticated access is allowed."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="This endpoint requires ADMIN_TOKEN to be set")
+    verify_admin_token(x_admin_token)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(verify_admin_token)],
+    responses={
+        403: {"description": "Forbidden"},
+        409: {"description": "Reload already in progress"}
+    }
+)
+
+# Dependency to get the model loader
+def get_model_loader():
+    return ModelLoader()
+
+@router.post("/reload", status_code=202, summary="Hot reload model artifacts")
+async def reload_models(model_loader: ModelLoader = Depends(get_model_loader)):
+    """
+    Load the artifacts currently on disk in the background, validate them and
+    swap them in without dropping requests.
+    
+    Poll `GET /admin/reload` for the outcome.
+    """
+    model_loader.reload_in_background()
+    return {"state": "loading", "active_version": model_loader.model_version}
+
+@router.get("/reload", summary="Get hot reload status")
+async def get_reload_status(model_loader: ModelLoader = Depends(get_model_loader)):
+    """Get the status of the most recent model reload and the active version."""
+    return {"active_version": model_loader.model_version, **model_loader.reload_status}
+
+@router.post("/profiler", summary="Toggle the slow-request sampling profiler",
+             dependencies=[Depends(require_admin_token)])
+def toggle_profiler(
+    enabled: bool = Query(..., description="Start or stop sampling"),
+    threshold_ms: float = Query(
+        None, gt=0, description="Dump requests slower than this (default: PROFILE_SLOW_REQUEST_MS or 500)"
+    ),
+    interval_ms: float = Query(None, gt=0, le=1000, description="Sampling interval (default: PROFILE_INTERVAL_MS)")
+):
+    """
+    Start or stop the sampling profiler.
+    
+    While enabled, the stacks of every thread are sampled and requests slower
+    than the threshold are written as folded stacks to `PROFILE_DIR`, ready
+    for flamegraph.pl or speedscope. Always requires `ADMIN_TOKEN`, since it
+    writes files on the server. Declared without ``async`` so that stopping,
+    which joins the sampling thread, runs in the threadpool instead of
+    blocking the event loop.
+    """
+    if enabled:
+        threshold_ms = threshold_ms or settings.PROFILE_SLOW_REQUEST_MS or 500
+        profiler.start(threshold_ms / 1000, Path(settings.PROFILE_DIR),
+                       (interval_ms or settings.PROFILE_INTERVAL_MS) / 1000)
+    else:
+        profiler.stop()
+    return profiler.describe()
+
+@router.get("/profiler", summary="Get the sampling profiler status")
+async def get_profiler_status():
+    """Get the profiler settings and the number of slow-request profiles written."""
+    return profiler.describe()
+
+@router.get("/cache", summary="Get result cache statistics")
+async def get_cache_stats():
+    """Get the size, hit rate and eviction counts of the result caches."""
+    return {
+        "enabled": settings.ENABLE_CACHING,
+        "recommendation": RecommendationService.cache_stats(),
+        "user": user_cache.stats(),
+        "neighbor_search_batcher": query_batcher.describe(),
+    }
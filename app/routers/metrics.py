@@ -0,0 +1,69 @@
+"""Prometheus metrics endpoint."""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import Dict, List, Tuple
+
+from app.models.loader import ModelLoader
+from app.services.metrics import CollectedCounter, Gauge, registry
+from app.services.recommendation import RecommendationService
+from app.services.users import user_cache
+
+router = APIRouter(tags=["status"])
+
+CACHE_EVENTS = ("hits", "misses", "evictions", "expirations")
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Collect the statistics of every result cache by name."""
+    model_loader = ModelLoader()
+    stats = {
+        "recommendation": RecommendationService.cache_stats(),
+        "user": user_cache.stats(),
+    }
+    if model_loader.movie_listing is not None:
+        stats["listing"] = model_loader.movie_listing.stats()
+    return stats
+
+def collect_cache_events() -> List[Tuple[Dict[str, str], float]]:
+    return [
+        ({"cache": cache, "event": event}, stats[event])
+        for cache, stats in cache_stats().items() for event in CACHE_EVENTS if event in stats
+    ]
+
+def collect_cache_entries() -> List[Tuple[Dict[str, str], float]]:
+    return [({"cache": cache}, stats["entries"]) for cache, stats in cache_stats().items()]
+
+def collect_load_timings() -> List[Tuple[Dict[str, str], float]]:
+    return [({"step": step}, seconds) for step, seconds in ModelLoader().models.load_timings.items()]
+
+def collect_model_info() -> List[Tuple[Dict[str, str], float]]:
+    model_loader = ModelLoader()
+    models = model_loader.models
+    if models.version is None:
+        return []
+    return [({
+        "version": models.version,
+        "artifact_format": str(models.artifact_format),
+        "index_backend": models.index.backend if models.index is not None else "none",
+        "dataset_version": str(model_loader.dataset_version),
+    }, 1)]
+
+def collect_loaded_at() -> List[Tuple[Dict[str, str], float]]:
+    loaded_at = ModelLoader().models.loaded_at
+    return [({}, loaded_at)] if loaded_at is not None else []
+
+registry.register(CollectedCounter(
+    "recommender_cache_events_total", "Result cache hits, misses, evictions and expirations", collect_cache_events
+))
+registry.register(Gauge("recommender_cache_entries", "Entries held by each result cache", collect_cache_entries))
+registry.register(Gauge(
+    "recommender_model_load_seconds", "Duration of each step of the last model load", collect_load_timings
+))
+registry.register(Gauge("recommender_model_info", "The active model version", collect_model_info))
+registry.register(Gauge(
+    "recommender_model_loaded_timestamp_seconds", "When the active model version was swapped in", collect_loaded_at
+))
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="Prometheus metrics")
+async def get_metrics():
+    """Latency histograms, cache counters, model versions and process memory in Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Query, Depends, Path
+from fastapi import APIRouter, HTTPException, Query, Depends, Path, Request
+from fastapi.responses import Response, StreamingResponse
 from typing import Dict, List, Any, Optional
-from pydantic import conint
+from pydantic import BaseModel, Field, conint
 import logging
 
 from app.models.loader import ModelLoader
+from app.services.listing import etag_matches, iter_chunks
 from app.services.recommendation import RecommendationService
 
 logger = logging.getLogger(__name__)
@@ -17,6 +19,13 @@ router = APIRouter(
     }
 )
 
+class BatchRecommendationRequest(BaseModel):
+    """Request body for batch recommendations."""
+    indices: List[conint(ge=0)] = Field(
+        ..., min_length=1, max_length=100, description="Indices of the reference movies"
+    )
+    n_neighbors: int = Field(10, ge=1, le=100, description="Number of recommendations per movie")
+
 # Dependency to get the model loader
 def get_model_loader():
     return ModelLoader()
@@ -32,29 +41,183 @@ async def get_status(model_loader: ModelLoader = Depends(get_model_loader)):
 
 @router.get("/all", summary="List all movies")
 async def list_all_movies(
+    request: Request,
+    offset: int = Query(0, ge=0, description="Index of the first movie to return"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size (default: whole catalog)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields: index, movieId, title"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json or ndjson"),
     model_loader: ModelLoader = Depends(get_model_loader)
 ):
     """
     List all movies with their names and IDs.
     
-    Returns a list of all movies with their indices and titles.
+    Parameters:
+    - **offset** / **cursor**: Where the page starts (cursor wins if both are given)
+    - **limit**: Page size; omit to get the whole catalog
+    - **fields**: Fields to include per movie (default: movieId, title)
+    - **format**: `json` (default) or `ndjson`, streamed one movie per line
+    
+    Responses carry a strong ETag; send it back in `If-None-Match` to get a 304.
     """
     try:
-        if model_loader.movie_df is None:
+        listing = model_loader.movie_listing
+        if listing is None:
             raise HTTPException(status_code=500, detail="Movie data not loaded")
         
-        movies_list = model_loader.movie_df[['movieId', 'title']].to_dict(orient='records')
-        # Subtract one from each movie ID
-        for movie in movies_list:
-            movie['movieId'] -= 1
+        if cursor is not None:
+            offset = listing.decode_cursor(cursor)
+        selected_fields = listing.parse_fields(fields)
         
-        return {"movies": movies_list}
+        etag = listing.etag(offset, limit, selected_fields, format)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
+        body = listing.render(offset, limit, selected_fields, format)
+        if format == "ndjson":
+            return StreamingResponse(iter_chunks(body), media_type="application/x-ndjson", headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error listing movies: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/search", summary="Search movies by title")
+async def search_movies(
+    q: str = Query(..., min_length=1, max_length=200, description="Title or title prefix to search for"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    model_loader: ModelLoader = Depends(get_model_loader)
+):
+    """
+    Search movies by title for lookup and autocomplete.
+    
+    Parameters:
+    - **q**: Title or title prefix, release year optional (e.g. "Toy Story")
+    - **limit**: Maximum number of results (default: 10)
+    
+    Returns exact matches first, then prefix matches, then typo-tolerant matches.
+    """
+    try:
+        return {"query": q, "results": model_loader.search_titles(q, limit)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching movies: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/recommend/batch", summary="Get recommendations for several movies")
+async def get_batch_recommendations(
+    request: BatchRecommendationRequest,
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
+):
+    """
+    Get movie recommendations for several reference movies in one call.
+    
+    Parameters:
+    - **indices**: The indices of the reference movies (up to 100)
+    - **n_neighbors**: Number of recommendations per movie (default: 10)
+    
+    Returns one recommendation list per reference movie, in request order.
+    """
+    try:
+        batch = await recommendation_service.get_batch_recommendations_async(
+            request.indices, request.n_neighbors
+        )
+        results = recommendation_service.format_batch_recommendations(request.indices, batch)
+        
+        return {"results": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating batch recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/recommend/by-text", summary="Get recommendations for a free-text query")
+async def get_text_recommendations(
+    q: str = Query(..., min_length=1, max_length=500, description="Free text or tags, e.g. dark sci-fi time travel"),
+    n_neighbors: int = Query(10, ge=1, le=100, description="Number of recommendations"),
+    blend: Optional[float] = Query(None, ge=0.0, le=1.0,
+                                   description="Weight of the feature similarity (default: TEXT_BLEND_WEIGHT)"),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
+):
+    """
+    Get movie recommendations for a free-text or tag query.
+    
+    Parameters:
+    - **q**: The query, matched against the movies' tags with the TF-IDF model
+    - **n_neighbors**: Number of recommendations to return (default: 10)
+    - **blend**: Mix in similarity over the movie features (0: tags only)
+    
+    Returns the best matching movies with their scores.
+    """
+    try:
+        recommended_indices, scores = await recommendation_service.get_text_recommendations_async(
+            q, n_neighbors, blend
+        )
+        recommendations = recommendation_service.format_recommendations(recommended_indices, scores)
+        
+        return {"query": q, "recommendations": recommendations}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating text recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/by-{id_type}/{movie_id}", summary="Get movie by MovieLens, IMDb or TMDb id")
+async def get_movie_by_id(
+    id_type: str = Path(..., pattern="^(id|imdb|tmdb)$", description="id (MovieLens movieId), imdb or tmdb"),
+    movie_id: conint(ge=1) = Path(..., description="The movie's id of that type"),
+    model_loader: ModelLoader = Depends(get_model_loader)
+):
+    """
+    Get a movie by one of its external ids.
+    
+    Parameters:
+    - **id_type**: `id` for the MovieLens movieId, `imdb` or `tmdb`
+    - **movie_id**: The id to look up, e.g. `/movies/by-imdb/114709`
+    
+    Returns the movie's index, title and ids.
+    """
+    try:
+        return model_loader.get_movie(model_loader.resolve_movie_id(id_type, movie_id))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving movie: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/by-{id_type}/{movie_id}/recommend", summary="Get movie recommendations by id")
+async def get_recommendations_by_id(
+    id_type: str = Path(..., pattern="^(id|imdb|tmdb)$", description="id (MovieLens movieId), imdb or tmdb"),
+    movie_id: conint(ge=1) = Path(..., description="The reference movie's id of that type"),
+    n_neighbors: int = Query(10, ge=1, le=100, description="Number of recommendations"),
+    source: str = Query("content", pattern="^(content|collaborative|hybrid)$",
+                        description="content (feature similarity), collaborative (co-ratings) or hybrid"),
+    genres: Optional[str] = Query(None, description="Comma-separated genres the movies must all have"),
+    year_min: Optional[int] = Query(None, ge=0, description="Earliest release year"),
+    year_max: Optional[int] = Query(None, ge=0, description="Latest release year"),
+    min_ratings: Optional[int] = Query(None, ge=0, description="Minimum number of ratings"),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service)
+):
+    """
+    Get movie recommendations for a reference movie given by an external id.
+    
+    Takes the same parameters as `/movies/{index}/recommend`, with the
+    reference movie given as a MovieLens (`id`), IMDb or TMDb id.
+    """
+    try:
+        index = recommendation_service.model_loader.resolve_movie_id(id_type, movie_id)
+        return await recommend_movie(
+            recommendation_service, index, n_neighbors, source, genres, year_min, year_max, min_ratings
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{index}", summary="Get movie by index")
 async def get_movie(
     index: conint(ge=0) = Path(..., description="The index of the movie"),
@@ -69,8 +232,7 @@ async def get_movie(
     Returns movie details.
     """
     try:
-        title = model_loader.get_movie_name(index)
-        return {"index": index, "title": title}
+        return model_loader.get_movie(index)
     except HTTPException:
         raise
     except Exception as e:
@@ -81,6 +243,12 @@ async def get_movie(
 async def get_recommendations(
     index: conint(ge=0) = Path(..., description="The index of the reference movie"),
     n_neighbors: int = Query(10, ge=1, le=100, description="Number of recommendations"),
+    source: str = Query("content", pattern="^(content|collaborative|hybrid)$",
+                        description="content (feature similarity), collaborative (co-ratings) or hybrid"),
+    genres: Optional[str] = Query(None, description="Comma-separated genres the movies must all have"),
+    year_min: Optional[int] = Query(None, ge=0, description="Earliest release year"),
+    year_max: Optional[int] = Query(None, ge=0, description="Latest release year"),
+    min_ratings: Optional[int] = Query(None, ge=0, description="Minimum number of ratings"),
     recommendation_service: RecommendationService = Depends(get_recommendation_service)
 ):
     """
@@ -89,22 +257,51 @@ async def get_recommendations(
     Parameters:
     - **index**: The index of the reference movie
     - **n_neighbors**: Number of recommendations to return (default: 10)
+    - **source**: `content` (default) for KNN over movie features, or
+      `collaborative` for the item-item graph built from user ratings, or
+      `hybrid` to rank both together with a popularity prior (returns scores)
+    - **genres**, **year_min**, **year_max**, **min_ratings**: Optional filters;
+      up to `n_neighbors` matching movies are returned
     
     Returns similar movies based on features using KNN algorithm.
     """
     try:
-        recommended_indices = recommendation_service.get_movie_recommendations(
-            index, n_neighbors
+        return await recommend_movie(
+            recommendation_service, index, n_neighbors, source, genres, year_min, year_max, min_ratings
         )
-        recommendations = recommendation_service.format_recommendations(recommended_indices)
-        
-        return {
-            "input_index": index,
-            "input_title": recommendation_service.model_loader.get_movie_name(index),
-            "recommendations": recommendations
-        }
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error generating recommendations: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def recommend_movie(
+    recommendation_service: RecommendationService,
+    index: int,
+    n_neighbors: int,
+    source: str,
+    genres: Optional[str],
+    year_min: Optional[int],
+    year_max: Optional[int],
+    min_ratings: Optional[int]
+) -> Dict[str, Any]:
+    """Build the recommendation response for a reference movie index."""
+    mask = recommendation_service.candidate_mask(genres, year_min, year_max, min_ratings)
+    if source == "hybrid":
+        recommended_indices, scores = await recommendation_service.get_hybrid_recommendations_async(
+            index, n_neighbors, mask
+        )
+    else:
+        recommended_indices = await recommendation_service.get_movie_recommendations_async(
+            index, n_neighbors, source, mask
+        )
+        scores = None
+    recommendations = recommendation_service.format_recommendations(recommended_indices, scores)
+    
+    return {
+        "input_index": index,
+        "input_movieId": int(recommendation_service.model_loader.catalog.movie_id[index]),
+        "input_title": recommendation_service.model_loader.get_movie_name(index),
+        "source": source,
+        "recommendations": recommendations
+    }
\ No newline at end of file
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Query, Depends, Path
+import logging
+
+from app.models.loader import ModelLoader
+from app.services.users import UserRecommendationService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    responses={
+        404: {"description": "Not found"},
+        500: {"description": "Internal server error"}
+    }
+)
+
+# Dependency to get the user recommendation service
+def get_user_recommendation_service():
+    return UserRecommendationService(ModelLoader())
+
+@router.get("/{user_id}/recommend", summary="Get personalized recommendations")
+async def get_user_recommendations(
+    user_id: int = Path(..., description="The MovieLens user id"),
+    n_neighbors: int = Query(10, ge=1, le=100, description="Number of recommendations"),
+    source: str = Query("collaborative", pattern="^(collaborative|content|mf)$",
+                        description="collaborative (item-item graph), content (feature neighbors) "
+                                    "or mf (matrix factorization)"),
+    service: UserRecommendationService = Depends(get_user_recommendation_service)
+):
+    """
+    Get recommendations for a user from the movies they have rated.
+    
+    Parameters:
+    - **user_id**: The MovieLens user id
+    - **n_neighbors**: Number of recommendations to return (default: 10)
+    - **source**: Item similarities to score with (default: collaborative), or
+      `mf` to rank by the ALS latent factors
+    
+    Returns unseen movies ranked by their similarity to the user's rated movies,
+    weighted by how the user rated them (or by predicted rating for `mf`).
+    """
+    try:
+        indices, scores, history_size = await service.get_user_recommendations_async(user_id, n_neighbors, source)
+        model_loader = service.model_loader
+        
+        return {
+            "user_id": user_id,
+            "source": source,
+            "rated_movies": history_size,
+            "recommendations": [
+                {"index": idx, "movieId": int(model_loader.catalog.movie_id[idx]),
+                 "title": model_loader.get_movie_name(idx), "score": score}
+                for idx, score in zip(indices, scores)
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating user recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
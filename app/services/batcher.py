@@ -0,0 +1,178 @@
+"""Micro-batching of concurrent nearest-neighbor queries off the event loop."""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.config import settings
+from app.models.index import NeighborIndex
+from app.services.metrics import CollectedCounter, Gauge, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class _PendingBatch:
+    """Queries for one index waiting for the batch window to close."""
+
+    def __init__(self, index: NeighborIndex):
+        self.index = index
+        self.vectors: List[np.ndarray] = []
+        self.n_neighbors: List[int] = []
+        self.futures: List[asyncio.Future] = []
+        self.size = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def add(self, vectors: np.ndarray, n_neighbors: int, future: asyncio.Future) -> None:
+        self.vectors.append(vectors)
+        self.n_neighbors.append(n_neighbors)
+        self.futures.append(future)
+        self.size += len(vectors)
+
+
+class QueryBatcher:
+    """
+    Coalesces concurrent ``NeighborIndex.query`` calls into batched queries.
+
+    Queries that arrive within ``window`` seconds of the first one, up to
+    ``max_batch`` rows, are stacked into a single query for the largest
+    requested K. The query runs on a bounded thread pool, so the event loop
+    keeps serving other requests. Every caller gets back the rows of its own
+    vectors, cut to its own K. Queries against different index objects (e.g.
+    across a model swap) are never mixed.
+
+    When ``max_pending`` rows are already queued or running, new queries are
+    rejected with 503 instead of growing the queue without bound.
+    """
+
+    def __init__(self, window: float, max_batch: int, max_pending: int, workers: int):
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.max_pending = max_pending
+        self.workers = workers
+        self.depth = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[int, _PendingBatch] = {}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="neighbor-search")
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once queued searches finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def query(self, index: NeighborIndex, vectors: np.ndarray,
+                    n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Queue a query and wait for the batch it joins.
+
+        Returns:
+            (distances, indices) with the same contract as ``NeighborIndex.query``
+        """
+        vectors = np.asarray(vectors)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if self.depth + len(vectors) > self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many neighbor searches queued, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = id(index)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(index)
+            batch.timer = loop.call_later(self.window, self._flush, key)
+        batch.add(vectors, n_neighbors, future)
+        if batch.size >= self.max_batch:
+            batch.timer.cancel()
+            self._flush(key)
+
+        self.depth += len(vectors)
+        try:
+            return await future
+        finally:
+            self.depth -= len(vectors)
+
+    def _flush(self, key: int) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+
+        batch_size.observe(batch.size)
+        try:
+            stacked = batch.vectors[0] if len(batch.vectors) == 1 else np.vstack(batch.vectors)
+            search = asyncio.get_running_loop().run_in_executor(
+                self.executor, batch.index.query, stacked, max(batch.n_neighbors)
+            )
+        except Exception as e:
+            # e.g. vectors of different widths, or an executor that was shut down
+            logger.error(f"Failed to start a batched neighbor search: {str(e)}")
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        search.add_done_callback(lambda done: self._fan_out(batch, done))
+
+    @staticmethod
+    def _fan_out(batch: _PendingBatch, search: asyncio.Future) -> None:
+        """Hand every caller its rows of the batched result."""
+        error = search.exception()
+        if error is not None:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        distances, indices = search.result()
+        start = 0
+        for vectors, n_neighbors, future in zip(batch.vectors, batch.n_neighbors, batch.futures):
+            stop = start + len(vectors)
+            if not future.done():
+                future.set_result((distances[start:stop, :n_neighbors], indices[start:stop, :n_neighbors]))
+            start = stop
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "max_pending": self.max_pending,
+            "workers": self.workers,
+            "depth": self.depth,
+            "rejected": self.rejected,
+        }
+
+
+query_batcher = QueryBatcher(
+    settings.BATCH_WINDOW_MS / 1000,
+    settings.BATCH_MAX_SIZE,
+    settings.BATCH_MAX_PENDING,
+    settings.INFERENCE_WORKERS
+)
+
+batch_size = registry.register(Histogram(
+    "recommender_neighbor_search_batch_size", "Query rows per batched neighbor search",
+    buckets=BATCH_SIZE_BUCKETS
+))
+registry.register(Gauge(
+    "recommender_neighbor_search_queue_depth", "Query rows queued or running in the neighbor search batcher",
+    lambda: [({}, query_batcher.depth)]
+))
+registry.register(CollectedCounter(
+    "recommender_neighbor_search_rejected_total", "Neighbor searches rejected because the queue was full",
+    lambda: [({}, query_batcher.rejected)]
+))
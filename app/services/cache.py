@@ -0,0 +1,334 @@
+"""Bounded, version-aware cache of top-K recommendation results."""
+import asyncio
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Approximate bytes of bookkeeping per entry (key tuple, list node, array header)
+ENTRY_OVERHEAD = 200
+
+
+class RespBackend:
+    """
+    Minimal client for a Redis-protocol (RESP) key-value store.
+
+    Lets several worker processes share cached results. Only ``GET`` and
+    ``SET ... PX`` are used, so any RESP-compatible server works. Failures
+    are reported to the caller, which treats them as misses.
+    """
+
+    def __init__(self, url: str, timeout: float = 0.05):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def describe(self) -> str:
+        return f"resp://{self.host}:{self.port}/{self.db}"
+
+    def _connect(self) -> None:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock, self._reader = sock, sock.makefile("rb")
+        if self.password:
+            self._send(b"AUTH", self.password.encode())
+        if self.db:
+            self._send(b"SELECT", str(self.db).encode())
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _send(self, *parts: bytes) -> Any:
+        payload = b"*%d\r\n" % len(parts) + b"".join(b"$%d\r\n%s\r\n" % (len(part), part) for part in parts)
+        self._sock.sendall(payload)
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise RuntimeError(body.decode(errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from the cache server: {line[:20]!r}")
+
+    def command(self, *parts: bytes) -> Any:
+        """Send one command, reconnecting if needed."""
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._send(*parts)
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.command(b"GET", key.encode())
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl > 0:
+            self.command(b"SET", key.encode(), value, b"PX", str(int(ttl * 1000)).encode())
+        else:
+            self.command(b"SET", key.encode(), value)
+
+
+class TopKCache:
+    """
+    LRU cache of top-K neighbor lists with a TTL and a memory cap.
+
+    Keys are ``(model version, movie index, source)``. Each entry keeps the
+    largest list computed for its key and the ``n_neighbors`` it was computed
+    for, so a request for fewer neighbors is answered by slicing it. A list
+    shorter than its requested size holds every neighbor there is and
+    answers any size. Entries expire ``ttl`` seconds after they are stored
+    (0 keeps them until evicted). Least recently used entries are evicted
+    when ``max_entries`` or ``max_bytes`` is exceeded.
+
+    An optional RESP ``backend`` is shared between worker processes. It is
+    read on a local miss and written on every store. Backend errors and
+    malformed values count as misses, and the backend is skipped for
+    ``retry_interval`` seconds after an error. The ``*_async`` methods
+    use the local LRU inline and run backend I/O on an executor, so the
+    event loop never waits on the socket.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float = 0,
+                 backend: Optional[RespBackend] = None, key_prefix: str = "movie-recs",
+                 retry_interval: float = 5.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backend = backend
+        self.key_prefix = key_prefix
+        self.retry_interval = retry_interval
+        self._entries: "OrderedDict[Hashable, Tuple[int, np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._backend_retry_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.backend_hits = 0
+        self.backend_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Tuple, n_neighbors: int) -> Optional[np.ndarray]:
+        """Return the first ``n_neighbors`` of a cached list, or None if it is missing or too short."""
+        return self.get_many([key], n_neighbors)[0]
+
+    def get_many(self, keys: List[Tuple], n_neighbors: int) -> List[Optional[np.ndarray]]:
+        """Look several keys up, reading the backend only for the local misses."""
+        return self._get_shared([self.get_local(key, n_neighbors) for key in keys], keys, n_neighbors)
+
+    async def get_many_async(
+        self, keys: List[Tuple], n_neighbors: int, executor: Optional[Executor] = None
+    ) -> List[Optional[np.ndarray]]:
+        """Same as ``get_many``, with the backend reads run on ``executor`` (the loop's default if None)."""
+        found = [self.get_local(key, n_neighbors) for key in keys]
+        if all(indices is not None for indices in found) or not self._backend_available():
+            return self._get_shared(found, keys, n_neighbors)
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, self._get_shared, found, keys, n_neighbors
+        )
+
+    def get_local(self, key: Tuple, n_neighbors: int) -> Optional[np.ndarray]:
+        """Look a list up in the local LRU only; a miss is counted by ``get_shared``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] and entry[2] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None and self._covers(entry[0], entry[1], n_neighbors):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1][:n_neighbors]
+        return None
+
+    def get_shared(self, key: Tuple, n_neighbors: int) -> Optional[np.ndarray]:
+        """Look a list up in the backend after a local miss, keeping a hit locally."""
+        entry = self._backend_get(key)
+        if entry is not None and self._covers(entry[0], entry[1], n_neighbors):
+            self._store(key, entry[0], entry[1])
+            with self._lock:
+                self.hits += 1
+                self.backend_hits += 1
+            return entry[1][:n_neighbors]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _get_shared(self, found: List[Optional[np.ndarray]], keys: List[Tuple],
+                    n_neighbors: int) -> List[Optional[np.ndarray]]:
+        return [indices if indices is not None else self.get_shared(key, n_neighbors)
+                for indices, key in zip(found, keys)]
+
+    def put(self, key: Tuple, n_neighbors: int, indices: np.ndarray) -> None:
+        """Store a list computed for ``n_neighbors``, unless a larger one is already cached."""
+        self.put_many({key: indices}, n_neighbors)
+
+    def put_many(self, entries: Dict[Tuple, np.ndarray], n_neighbors: int) -> None:
+        """Store several lists computed for ``n_neighbors``, locally and in the backend."""
+        self._put_shared(self._put_local_many(entries, n_neighbors), n_neighbors)
+
+    async def put_many_async(
+        self, entries: Dict[Tuple, np.ndarray], n_neighbors: int, executor: Optional[Executor] = None
+    ) -> None:
+        """Same as ``put_many``, with the backend writes run on ``executor`` (the loop's default if None)."""
+        stored = self._put_local_many(entries, n_neighbors)
+        if stored and self._backend_available():
+            await asyncio.get_running_loop().run_in_executor(executor, self._put_shared, stored, n_neighbors)
+
+    def _put_local_many(self, entries: Dict[Tuple, np.ndarray], n_neighbors: int) -> Dict[Tuple, np.ndarray]:
+        stored = {}
+        for key, indices in entries.items():
+            indices = self.put_local(key, n_neighbors, indices)
+            if indices is not None:
+                stored[key] = indices
+        return stored
+
+    def _put_shared(self, stored: Dict[Tuple, np.ndarray], n_neighbors: int) -> None:
+        for key, indices in stored.items():
+            self._backend_set(key, n_neighbors, indices)
+
+    def put_local(self, key: Tuple, n_neighbors: int, indices: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Store a list in the local LRU only.
+
+        Returns:
+            The stored int32 list, to be written to the backend, or None if
+            nothing was stored
+        """
+        if not self.enabled:
+            return None
+        indices = np.asarray(indices, dtype=np.int32)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._covers(entry[0], entry[1], n_neighbors):
+                return None
+        self._store(key, n_neighbors, indices)
+        return indices
+
+    @staticmethod
+    def _covers(n_computed: int, indices: np.ndarray, n_neighbors: int) -> bool:
+        return n_computed >= n_neighbors or len(indices) < n_computed
+
+    def _store(self, key: Tuple, n_neighbors: int, indices: np.ndarray) -> None:
+        size = indices.nbytes + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (n_neighbors, indices, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple) -> None:
+        _, indices, _ = self._entries.pop(key)
+        self._bytes -= indices.nbytes + ENTRY_OVERHEAD
+
+    def _backend_key(self, key: Tuple) -> str:
+        return ":".join([self.key_prefix] + [str(part) for part in key])
+
+    def _backend_available(self) -> bool:
+        return self.backend is not None and time.monotonic() >= self._backend_retry_at
+
+    def _backend_failed(self, e: Exception) -> None:
+        with self._lock:
+            self.backend_errors += 1
+        self._backend_retry_at = time.monotonic() + self.retry_interval
+        logger.warning(f"Cache backend {self.backend.describe()} failed, "
+                       f"retrying in {self.retry_interval}s: {str(e)}")
+
+    def _backend_get(self, key: Tuple) -> Optional[Tuple[int, np.ndarray]]:
+        if not self._backend_available():
+            return None
+        try:
+            value = self.backend.get(self._backend_key(key))
+        except Exception as e:
+            self._backend_failed(e)
+            return None
+        if value is None:
+            return None
+        # Stored as int32 [n_neighbors, index, index, ...]
+        valid = isinstance(value, bytes) and len(value) >= 4 and len(value) % 4 == 0
+        array = np.frombuffer(value, dtype=np.int32) if valid else None
+        if array is None or array[0] < 0 or np.any(array[1:] < 0):
+            logger.warning(f"Ignoring malformed cache value for {self._backend_key(key)}")
+            return None
+        return int(array[0]), array[1:]
+
+    def _backend_set(self, key: Tuple, n_neighbors: int, indices: np.ndarray) -> None:
+        if not self._backend_available():
+            return
+        value = np.concatenate(([n_neighbors], indices)).astype(np.int32).tobytes()
+        try:
+            self.backend.set(self._backend_key(key), value, self.ttl)
+        except Exception as e:
+            self._backend_failed(e)
+
+    def clear(self) -> None:
+        """Drop every local entry (backend entries are versioned and expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cache size, hit rate and event counts."""
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+        if self.backend is not None:
+            stats.update({"backend": self.backend.describe(), "backend_hits": self.backend_hits,
+                          "backend_errors": self.backend_errors})
+        return stats
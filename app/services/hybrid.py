@@ -0,0 +1,63 @@
+"""Fusion of content and collaborative candidates into one hybrid ranking."""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def fuse_candidates(
+    content_indices: np.ndarray,
+    content_scores: np.ndarray,
+    collaborative_indices: np.ndarray,
+    collaborative_scores: np.ndarray,
+    prior: Optional[np.ndarray],
+    weights: Dict[str, float],
+    n_results: int,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Rank the union of two candidate lists by a weighted sum of their scores.
+
+    Each candidate scores ``content * w_content + collaborative *
+    w_collaborative + prior * w_prior``. A candidate missing from one list
+    scores 0 for that source, i.e. it is treated as below that source's
+    top-K cutoff. All steps are array operations over the union.
+
+    Args:
+        content_indices: Candidate movies from the content index
+        content_scores: Their cosine similarities
+        collaborative_indices: Candidate movies from the collaborative graph
+        collaborative_scores: Their item-item similarities
+        prior: Per-movie popularity prior in [0, 1] over the whole catalog, or None
+        weights: ``content``, ``collaborative`` and ``prior`` weights
+        n_results: Number of movies to return
+
+    Returns:
+        Tuple of (movie indices, scores) where ``scores`` maps ``score`` and
+        each component name to an array aligned with the indices
+    """
+    n_content = len(content_indices)
+    candidates, positions = np.unique(
+        np.concatenate((content_indices, collaborative_indices)).astype(np.int64), return_inverse=True
+    )
+
+    content = np.zeros(len(candidates), dtype=np.float32)
+    collaborative = np.zeros(len(candidates), dtype=np.float32)
+    content[positions[:n_content]] = content_scores
+    collaborative[positions[n_content:]] = collaborative_scores
+    popularity = prior[candidates].astype(np.float32) if prior is not None else np.zeros_like(content)
+
+    score = (weights["content"] * content
+             + weights["collaborative"] * collaborative
+             + weights["prior"] * popularity)
+
+    if len(candidates) > n_results:
+        top = np.argpartition(-score, n_results - 1)[:n_results]
+    else:
+        top = np.arange(len(candidates))
+    top = top[np.argsort(-score[top], kind="stable")]
+
+    return candidates[top], {
+        "score": score[top],
+        "content": content[top],
+        "collaborative": collaborative[top],
+        "prior": popularity[top],
+    }
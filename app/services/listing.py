@@ -0,0 +1,144 @@
+"""Pre-serialized, cacheable catalog listings."""
+import base64
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+LISTING_FIELDS = ("index", "movieId", "title")
+DEFAULT_FIELDS = ("movieId", "title")
+LISTING_FORMATS = ("json", "ndjson")
+# Part of every ETag; bump it when the rows served for a dataset version change
+LISTING_REVISION = 2
+
+
+class MovieListing:
+    """
+    Serves ``/movies/all`` pages as bytes rendered once per dataset version.
+
+    Columns are read through ``(start, stop) -> values`` getters over the
+    catalog. Each distinct (page, fields, format) combination is serialized
+    on first request and kept in an LRU bounded by page count and by total
+    bytes, so repeat requests cost a dictionary lookup. A page larger than
+    the byte budget is rendered on every request instead. The ETag is
+    derived from the dataset version and the request parameters, so a
+    matching ``If-None-Match`` can be answered before any rendering.
+    """
+
+    def __init__(self, columns: Dict[str, Callable[[int, int], List]], total: int,
+                 version: str, max_cached_pages: int = 256, max_cached_bytes: int = 32 << 20):
+        self.columns = columns
+        self.version = version
+        self.total = total
+        self.max_cached_pages = max_cached_pages
+        self.max_cached_bytes = max_cached_bytes
+        self._cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+        """Parse a comma-separated field selection."""
+        if not fields:
+            return DEFAULT_FIELDS
+        selected = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        unknown = [field for field in selected if field not in LISTING_FIELDS]
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields {unknown}; choose from {list(LISTING_FIELDS)}"
+            )
+        return selected
+
+    def encode_cursor(self, offset: int) -> str:
+        """Return an opaque cursor pointing at ``offset`` in this dataset version."""
+        return base64.urlsafe_b64encode(f"{self.version}:{offset}".encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> int:
+        """Return the offset encoded in a cursor, rejecting cursors from another version or out of range."""
+        try:
+            version, offset = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit(":", 1)
+            offset = int(offset)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if version != self.version:
+            raise HTTPException(status_code=410, detail="Catalog changed since the cursor was issued")
+        if not 0 <= offset <= self.total:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return offset
+
+    def etag(self, offset: int, limit: Optional[int], fields: Sequence[str], fmt: str) -> str:
+        """Return the strong ETag for a page."""
+        key = f"{LISTING_REVISION}|{self.version}|{offset}|{limit}|{','.join(fields)}|{fmt}"
+        return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+    def render(self, offset: int, limit: Optional[int], fields: Sequence[str], fmt: str) -> bytes:
+        """Return the serialized page, rendering it on first use."""
+        key = (offset, limit, tuple(fields), fmt)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        body = self._serialize(offset, limit, fields, fmt)
+
+        if len(body) > self.max_cached_bytes:
+            return body
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = body
+                self._bytes += len(body)
+            while len(self._cache) > self.max_cached_pages or self._bytes > self.max_cached_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return body
+
+    def stats(self) -> Dict[str, int]:
+        """Return the page cache size and its hit, miss and eviction counts."""
+        return {"entries": len(self._cache), "bytes": self._bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+    def _serialize(self, offset: int, limit: Optional[int], fields: Sequence[str], fmt: str) -> bytes:
+        stop = self.total if limit is None else min(offset + limit, self.total)
+        page_columns = [self.columns[field](offset, stop) for field in fields]
+        rows = [dict(zip(fields, values)) for values in zip(*page_columns)]
+
+        if fmt == "ndjson":
+            return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows).encode()
+
+        body = {
+            "movies": rows,
+            "total": self.total,
+            "offset": offset,
+            "next_cursor": self.encode_cursor(stop) if stop < self.total else None,
+        }
+        return json.dumps(body, separators=(",", ":")).encode()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Return whether an ``If-None-Match`` header matches ``etag``.
+
+    The header is a comma-separated list of entity tags or ``*``. Tags are
+    compared with the weak comparison of RFC 9110, which ignores ``W/``.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in tags)
+
+
+def iter_chunks(body: bytes, chunk_size: int = 65536) -> Iterator[bytes]:
+    """Yield a byte string in fixed-size chunks for streaming responses."""
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
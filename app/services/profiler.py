@@ -0,0 +1,126 @@
+"""Opt-in sampling profiler that dumps the stacks of slow requests."""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def folded_stack(frame) -> str:
+    """Render a frame and its callers as one ``outer;...;inner`` line."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread at a fixed interval into a ring buffer.
+
+    Nothing is recorded until ``start`` is called. When a request takes longer
+    than the threshold, the samples taken while it was in flight are written
+    as folded stacks (``frame;frame;frame count`` per line), the input format
+    of flamegraph.pl and speedscope. Samples from requests that overlapped it
+    are included too. ``record`` collapses the buffer and writes a file, so
+    callers on the event loop should run it in a worker thread.
+    """
+
+    def __init__(self, interval: float = 0.005, max_samples: int = 20000):
+        self.interval = interval
+        self.threshold = 0.0
+        self.output_dir: Optional[Path] = None
+        self.dumps = 0
+        self._samples: Deque[Tuple[float, str]] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def start(self, threshold: float, output_dir: Path, interval: Optional[float] = None) -> None:
+        """Begin sampling and dump requests slower than ``threshold`` seconds into ``output_dir``."""
+        self.threshold = threshold
+        self.output_dir = Path(output_dir)
+        self.interval = interval or self.interval
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler started: every {self.interval * 1000:.1f}ms, "
+                    f"dumping requests slower than {threshold * 1000:.0f}ms to {self.output_dir}")
+
+    def stop(self) -> None:
+        """Stop sampling and drop the buffered samples."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        with self._lock:
+            self._samples.clear()
+        logger.info("Sampling profiler stopped")
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            stacks = [folded_stack(frame) for thread_id, frame in sys._current_frames().items()
+                      if thread_id != own_id]
+            with self._lock:
+                self._samples.extend((now, stack) for stack in stacks)
+
+    def collapse(self, start: float, stop: float) -> Dict[str, int]:
+        """Count the distinct stacks sampled between two ``perf_counter`` times."""
+        with self._lock:
+            samples = list(self._samples)
+        return dict(Counter(stack for timestamp, stack in samples if start <= timestamp <= stop))
+
+    def is_slow(self, seconds: float) -> bool:
+        """Return whether a request of this duration would be recorded."""
+        return self._thread is not None and seconds >= self.threshold
+
+    def record(self, label: str, start: float, stop: float) -> Optional[Path]:
+        """Dump the stacks of a request if it was slower than the threshold."""
+        if not self.is_slow(stop - start):
+            return None
+
+        stacks = self.collapse(start, stop)
+        if not stacks:
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        safe_label = "".join(char if char.isalnum() else "_" for char in label).strip("_")
+        with self._lock:
+            self.dumps += 1
+            dump = self.dumps
+        duration_ms = (stop - start) * 1000
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{dump}-{safe_label}-{duration_ms:.0f}ms.folded"
+        path = self.output_dir / filename
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items())))
+        logger.warning(f"Request {label} took {duration_ms:.0f}ms, wrote {len(stacks)} stacks to {path}")
+        return path
+
+    def describe(self) -> Dict[str, object]:
+        """Return the profiler settings and how many profiles were written."""
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "interval_ms": self.interval * 1000,
+            "output_dir": str(self.output_dir) if self.output_dir is not None else None,
+            "dumps": self.dumps,
+        }
+
+
+profiler = SamplingProfiler()
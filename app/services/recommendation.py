@@ -1,83 +1,680 @@
+import asyncio
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
 import logging
 from fastapi import HTTPException
-from functools import lru_cache
 
+from app.config import settings
+from app.models.filters import masked_search
+from app.models.index import ExactIndex, NeighborIndex, normalize_rows
 from app.models.loader import ModelLoader
+from app.services.batcher import query_batcher
+from app.services.cache import RespBackend, TopKCache
+from app.services.hybrid import fuse_candidates
+from app.services.metrics import stage_latency
 
 logger = logging.getLogger(__name__)
 
+# Shared by every request; keys carry the model version
+recommendation_cache = TopKCache(
+    settings.RECOMMENDATION_CACHE_SIZE,
+    int(settings.RECOMMENDATION_CACHE_MAX_MB * 1024 * 1024),
+    settings.RECOMMENDATION_CACHE_TTL,
+    RespBackend(settings.RECOMMENDATION_CACHE_URL) if settings.RECOMMENDATION_CACHE_URL else None
+)
+
+class _InlineSteps:
+    """
+    The blocking steps of a recommendation, run on the calling thread.
+    
+    Each recommendation is written once, as a coroutine that awaits these
+    steps. The sync API passes this class and drives the coroutine with
+    ``_run_inline``; the async API passes ``_EventLoopSteps``.
+    """
+    
+    async def search(self, index: NeighborIndex, vectors: np.ndarray,
+                     n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        return index.query(vectors, n_neighbors)
+    
+    async def run(self, function: Callable[..., Any], *args) -> Any:
+        return function(*args)
+    
+    async def cache_get(self, keys: List[Tuple], n_neighbors: int) -> List[Optional[np.ndarray]]:
+        return recommendation_cache.get_many(keys, n_neighbors)
+    
+    async def cache_put(self, entries: Dict[Tuple, np.ndarray], n_neighbors: int) -> None:
+        recommendation_cache.put_many(entries, n_neighbors)
+
+class _EventLoopSteps(_InlineSteps):
+    """Steps for the event loop: live searches go to the query batcher, other blocking work to threads."""
+    
+    async def search(self, index: NeighborIndex, vectors: np.ndarray,
+                     n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+        return await query_batcher.query(index, vectors, n_neighbors)
+    
+    async def run(self, function: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(query_batcher.executor, function, *args)
+    
+    async def cache_get(self, keys: List[Tuple], n_neighbors: int) -> List[Optional[np.ndarray]]:
+        return await recommendation_cache.get_many_async(keys, n_neighbors)
+    
+    async def cache_put(self, entries: Dict[Tuple, np.ndarray], n_neighbors: int) -> None:
+        await recommendation_cache.put_many_async(entries, n_neighbors)
+
+def _run_inline(coroutine: Coroutine) -> Any:
+    """Run a recommendation coroutine with ``_InlineSteps``, which never suspends, to completion."""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError("A recommendation step suspended outside the event loop")
+
 class RecommendationService:
     """Service for handling movie recommendation logic."""
     
     def __init__(self, model_loader: ModelLoader):
         self.model_loader = model_loader
+        # Pin the active model version for the lifetime of this request
+        self.models = model_loader.models
+    
+    @staticmethod
+    def clear_cache(old_version: Optional[str] = None, new_version: Optional[str] = None) -> None:
+        """Drop cached recommendations, e.g. after a model version swap."""
+        recommendation_cache.clear()
+        logger.info(f"Cleared recommendation cache after model swap {old_version} -> {new_version}")
+    
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Return the recommendation cache size, hit rate and event counts."""
+        return recommendation_cache.stats()
     
     def validate_movie_index(self, index: int) -> None:
         """Validate if the movie index is within bounds."""
-        if self.model_loader.features is None:
+        if self.models.features is None:
             raise HTTPException(status_code=500, detail="Feature data not loaded")
             
-        if not 0 <= index < len(self.model_loader.features):
+        if not 0 <= index < len(self.models.features):
             raise HTTPException(
                 status_code=404, 
-                detail=f"Movie index {index} out of bounds (max: {len(self.model_loader.features)-1})"
+                detail=f"Movie index {index} out of bounds (max: {len(self.models.features)-1})"
             )
     
-    @lru_cache(maxsize=1000)
-    def get_movie_recommendations(self, movie_index: int, n_neighbors: int = 10) -> List[int]:
+    def get_movie_recommendations(
+        self, movie_index: int, n_neighbors: int = 10, source: str = "content",
+        mask: Optional[np.ndarray] = None
+    ) -> List[int]:
         """
-        Get movie recommendations based on KNN model.
+        Get movie recommendations from the content index or the collaborative graph.
+        
+        Content recommendations are served from the precomputed neighbor table
+        when it holds at least ``n_neighbors`` entries, otherwise from a live
+        KNN query whose result is kept in the shared recommendation cache.
+        Collaborative recommendations are read from the item-item graph and
+        can be fewer than ``n_neighbors`` for rarely rated movies. With a
+        ``mask``, only movies it selects are returned.
         
         Args:
             movie_index: Index of the target movie
             n_neighbors: Number of similar movies to find
+            source: ``content`` or ``collaborative``
+            mask: Optional boolean mask over the catalog from ``candidate_mask``
             
         Returns:
             List of recommended movie indices
         """
+        return _run_inline(self._movie_recommendations(movie_index, n_neighbors, source, mask, _InlineSteps()))
+    
+    async def get_movie_recommendations_async(
+        self, movie_index: int, n_neighbors: int = 10, source: str = "content",
+        mask: Optional[np.ndarray] = None
+    ) -> List[int]:
+        """
+        Same as ``get_movie_recommendations``, for use on the event loop.
+        
+        Live KNN queries are sent to the query batcher, which coalesces them
+        with concurrent requests and runs them on its worker threads; table,
+        graph and local cache reads are answered inline. Filtered searches the
+        table cannot answer run on the same worker threads, and reads and
+        writes of a shared cache backend run on the loop's default executor.
+        """
+        return await self._movie_recommendations(movie_index, n_neighbors, source, mask, _EventLoopSteps())
+    
+    async def _movie_recommendations(
+        self, movie_index: int, n_neighbors: int, source: str, mask: Optional[np.ndarray], steps: "_InlineSteps"
+    ) -> List[int]:
         try:
-            self.validate_movie_index(movie_index)
+            recommended_indices = self._lookup_recommendations(movie_index, n_neighbors, source, mask)
+            if recommended_indices is not None:
+                return recommended_indices
             
-            # Get the features for the requested movie
-            movie_features = self.model_loader.features[movie_index].reshape(1, -1)
+            if mask is not None:
+                indices, _ = await steps.run(self.get_filtered_content_candidates, movie_index, n_neighbors, mask)
+                return indices.tolist()
+            
+            if settings.ENABLE_CACHING:
+                cached, = await steps.cache_get([self._cache_key(movie_index, source)], n_neighbors)
+                if cached is not None:
+                    return cached.tolist()
             
             # Find similar movies using KNN
-            distances, indices = self.model_loader.knn.kneighbors(
-                movie_features, 
-                n_neighbors=min(n_neighbors + 1, len(self.model_loader.features))
+            with stage_latency.time("neighbor_search"):
+                distances, indices = await steps.search(
+                    self.models.index, *self._live_query([movie_index], n_neighbors)
+                )
+            
+            results = self._live_results([movie_index], n_neighbors, indices)
+            if settings.ENABLE_CACHING:
+                await steps.cache_put(self._cache_entries(results, source), n_neighbors)
+            return results[movie_index]
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating recommendations: {str(e)}")
+            raise HTTPException(
+                status_code=500, 
+                detail=f"Failed to generate recommendations: {str(e)}"
+            )
+    
+    def _lookup_recommendations(
+        self, movie_index: int, n_neighbors: int, source: str, mask: Optional[np.ndarray] = None
+    ) -> Optional[List[int]]:
+        """Validate a request and answer it from the graph or neighbor table if possible."""
+        with stage_latency.time("validate"):
+            self.validate_movie_index(movie_index)
+        
+        if source == "collaborative":
+            with stage_latency.time("collaborative_lookup"):
+                return self.get_collaborative_recommendations(movie_index, n_neighbors, mask)
+        
+        if mask is not None:
+            candidates = self._filtered_table_candidates(movie_index, n_neighbors, mask)
+            return candidates[0].tolist() if candidates is not None else None
+        
+        neighbor_table = self.models.neighbor_indices
+        if neighbor_table is not None and n_neighbors <= neighbor_table.shape[1]:
+            with stage_latency.time("neighbor_table"):
+                return neighbor_table[movie_index, :n_neighbors].tolist()
+        # Table and graph reads are already memory-mapped slices; only live queries are cached
+        return None
+    
+    def _live_query(self, movie_indices: List[int], n_neighbors: int) -> Tuple[np.ndarray, int]:
+        """Return the query vectors and K of a live KNN query (one extra neighbor for the movie itself)."""
+        return self.models.features[movie_indices], min(n_neighbors + 1, len(self.models.features))
+    
+    @staticmethod
+    def _live_results(movie_indices: List[int], n_neighbors: int, rows: np.ndarray) -> Dict[int, List[int]]:
+        """Remove each movie from its own KNN results and return the lists by movie."""
+        # The input movie is usually the first result
+        return {
+            movie_index: [int(idx) for idx in row if idx != movie_index][:n_neighbors]
+            for movie_index, row in zip(movie_indices, rows)
+        }
+    
+    def _cache_key(self, movie_index: int, source: str) -> Tuple[str, int, str]:
+        return (self.models.version, movie_index, source)
+    
+    def _cache_entries(self, results: Dict[int, List[int]], source: str) -> Dict[Tuple, np.ndarray]:
+        return {
+            self._cache_key(movie_index, source): np.array(indices)
+            for movie_index, indices in results.items()
+        }
+    
+    def get_collaborative_recommendations(
+        self, movie_index: int, n_neighbors: int = 10, mask: Optional[np.ndarray] = None
+    ) -> List[int]:
+        """Read a movie's most similar movies (that pass ``mask``) from the item-item collaborative graph."""
+        graph = self.models.collaborative
+        if graph is None:
+            raise HTTPException(status_code=503, detail="Collaborative model not loaded")
+        
+        indices, _ = self._collaborative_candidates(movie_index, n_neighbors, mask)
+        return indices.tolist()
+    
+    def _collaborative_candidates(
+        self, movie_index: int, n_candidates: int, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        graph = self.models.collaborative
+        if mask is None:
+            return graph.neighbors(movie_index, n_candidates)
+        # A graph row holds at most K neighbors, so filtering the whole row is cheap
+        indices, similarities = graph.neighbors(movie_index, len(mask))
+        keep = mask[indices]
+        return indices[keep][:n_candidates], similarities[keep][:n_candidates]
+    
+    def candidate_mask(
+        self, genres: Optional[str] = None, year_min: Optional[int] = None,
+        year_max: Optional[int] = None, min_ratings: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Combine request filters into a mask over the catalog using the filter index.
+        
+        Args:
+            genres: Comma-separated genres a movie must all have
+            year_min: Earliest release year (inclusive)
+            year_max: Latest release year (inclusive)
+            min_ratings: Minimum number of ratings
+            
+        Returns:
+            Boolean mask with one entry per movie, or None when no filter is set
+        """
+        if not genres and year_min is None and year_max is None and min_ratings is None:
+            return None
+        
+        filter_index = self.model_loader.filter_index
+        if filter_index is None:
+            raise HTTPException(status_code=503, detail="Movie data not loaded")
+        
+        try:
+            return filter_index.mask(filter_index.parse_genres(genres), year_min, year_max, min_ratings)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    def _filtered_table_candidates(
+        self, movie_index: int, n_candidates: int, mask: np.ndarray
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Read filtered content candidates from the neighbor table, or None if too few of them match."""
+        neighbor_table = self.models.neighbor_indices
+        if neighbor_table is None:
+            return None
+        with stage_latency.time("neighbor_table"):
+            row = np.asarray(neighbor_table[movie_index])
+            keep = mask[row]
+            if np.count_nonzero(keep) < n_candidates:
+                return None
+            distances = np.asarray(self.models.neighbor_distances[movie_index])[keep][:n_candidates]
+            return row[keep][:n_candidates], 1.0 - distances
+    
+    def get_filtered_content_candidates(
+        self, movie_index: int, n_candidates: int, mask: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the ``n_candidates`` most similar movies that pass ``mask``.
+        
+        The neighbor table row is filtered first; when it holds too few
+        matches, the matching movies are scanned exactly, or, for broad
+        filters on an approximate index, the index is queried with a K large
+        enough for the filter's selectivity, doubling until enough match.
+        Fewer results are returned only when fewer movies pass the filter.
+        
+        Returns:
+            Tuple of (movie indices, cosine similarities), most similar first
+        """
+        candidates = self._filtered_table_candidates(movie_index, n_candidates, mask)
+        if candidates is not None:
+            return candidates
+        
+        mask = mask.copy()
+        mask[movie_index] = False
+        n_matches = int(np.count_nonzero(mask))
+        n_candidates = min(n_candidates, n_matches)
+        if n_candidates == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        features, index = self.models.features, self.models.index
+        with stage_latency.time("filtered_search"):
+            if n_matches <= settings.FILTER_SCAN_MAX or index.backend == ExactIndex.backend:
+                return masked_search(features, features[[movie_index]], np.flatnonzero(mask), n_candidates)
+            
+            # Broad filter on an approximate index: over-fetch for the filter's selectivity
+            n_movies = len(features)
+            k = min(n_movies, 2 * n_candidates * n_movies // n_matches + 1)
+            while True:
+                distances, indices = index.query(features[[movie_index]], k)
+                keep = mask[indices[0]]
+                if np.count_nonzero(keep) >= n_candidates or k >= n_movies:
+                    return indices[0][keep][:n_candidates], 1.0 - distances[0][keep][:n_candidates]
+                k = min(n_movies, 2 * k)
+    
+    def get_content_candidates(self, movie_index: int, n_candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return up to ``n_candidates`` (indices, cosine similarities) from the content index."""
+        return _run_inline(self._content_candidates(movie_index, n_candidates, None, _InlineSteps()))
+    
+    async def _content_candidates(
+        self, movie_index: int, n_candidates: int, mask: Optional[np.ndarray], steps: "_InlineSteps"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Read content candidates from the neighbor table, or search for them with ``steps``."""
+        if mask is not None:
+            candidates = self._filtered_table_candidates(movie_index, n_candidates, mask)
+            if candidates is None:
+                candidates = await steps.run(self.get_filtered_content_candidates, movie_index, n_candidates, mask)
+            return candidates
+        
+        candidates = self._table_candidates(movie_index, n_candidates)
+        if candidates is None:
+            with stage_latency.time("neighbor_search"):
+                distances, indices = await steps.search(
+                    self.models.index, *self._live_query([movie_index], n_candidates)
+                )
+            candidates = self._live_candidates(movie_index, n_candidates, distances, indices)
+        return candidates
+    
+    def _table_candidates(self, movie_index: int, n_candidates: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Read content candidates from the neighbor table, or None if it holds too few."""
+        neighbor_table = self.models.neighbor_indices
+        if neighbor_table is None or n_candidates > neighbor_table.shape[1]:
+            return None
+        indices = np.asarray(neighbor_table[movie_index, :n_candidates])
+        distances = np.asarray(self.models.neighbor_distances[movie_index, :n_candidates])
+        return indices, 1.0 - distances
+    
+    @staticmethod
+    def _live_candidates(
+        movie_index: int, n_candidates: int, distances: np.ndarray, indices: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Turn a one-row KNN result into content candidates without the movie itself."""
+        keep = indices[0] != movie_index
+        indices, distances = indices[0][keep][:n_candidates], distances[0][keep][:n_candidates]
+        return indices, 1.0 - distances
+    
+    def get_hybrid_recommendations(
+        self, movie_index: int, n_neighbors: int = 10, mask: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], Dict[str, List[float]]]:
+        """
+        Rank content and collaborative candidates together with a popularity prior.
+        
+        Takes ``HYBRID_CANDIDATES`` candidates from each source and fuses them
+        with the configured weights. Without a collaborative graph the ranking
+        falls back to content similarity and the prior.
+        
+        Args:
+            movie_index: Index of the target movie
+            n_neighbors: Number of recommendations to return
+            mask: Optional boolean mask over the catalog; both sources are filtered by it
+            
+        Returns:
+            Tuple of (movie indices, scores) where ``scores`` holds the fused
+            ``score`` and its ``content``, ``collaborative`` and ``prior`` parts
+        """
+        return _run_inline(self._hybrid_recommendations(movie_index, n_neighbors, mask, _InlineSteps()))
+    
+    async def get_hybrid_recommendations_async(
+        self, movie_index: int, n_neighbors: int = 10, mask: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], Dict[str, List[float]]]:
+        """Same as ``get_hybrid_recommendations``, with a live content query sent to the query batcher."""
+        return await self._hybrid_recommendations(movie_index, n_neighbors, mask, _EventLoopSteps())
+    
+    async def _hybrid_recommendations(
+        self, movie_index: int, n_neighbors: int, mask: Optional[np.ndarray], steps: "_InlineSteps"
+    ) -> Tuple[List[int], Dict[str, List[float]]]:
+        with stage_latency.time("validate"):
+            self.validate_movie_index(movie_index)
+        
+        try:
+            n_candidates = max(n_neighbors, settings.HYBRID_CANDIDATES)
+            content_indices, content_scores = await self._content_candidates(
+                movie_index, n_candidates, mask, steps
             )
             
-            # Remove the input movie from recommendations (usually the first result)
-            recommended_indices = [
-                int(idx) for idx in indices[0] 
-                if idx != movie_index
-            ][:n_neighbors]
+            graph = self.models.collaborative
+            if graph is not None:
+                with stage_latency.time("collaborative_lookup"):
+                    collaborative_indices, collaborative_scores = self._collaborative_candidates(
+                        movie_index, n_candidates, mask
+                    )
+            else:
+                collaborative_indices = collaborative_scores = np.empty(0)
             
-            return recommended_indices
+            catalog = self.model_loader.catalog
+            with stage_latency.time("hybrid_fusion"):
+                indices, scores = fuse_candidates(
+                    content_indices, content_scores,
+                    collaborative_indices, collaborative_scores,
+                    catalog.rating_prior() if catalog is not None else None,
+                    {
+                        "content": settings.HYBRID_CONTENT_WEIGHT,
+                        "collaborative": settings.HYBRID_COLLABORATIVE_WEIGHT,
+                        "prior": settings.HYBRID_PRIOR_WEIGHT,
+                    },
+                    n_neighbors
+                )
+            return indices.tolist(), {name: values.tolist() for name, values in scores.items()}
             
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error generating recommendations: {str(e)}")
+            logger.error(f"Error generating hybrid recommendations: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to generate recommendations: {str(e)}"
+            )
+    
+    def get_text_recommendations(
+        self, query: str, n_neighbors: int = 10, blend: Optional[float] = None
+    ) -> Tuple[List[int], Dict[str, List[float]]]:
+        """
+        Recommend movies for a free-text or tag query.
+        
+        The query is vectorized with the served TF-IDF model and matched
+        against the tag index, which only scores movies sharing a query term.
+        With ``blend`` > 0, the best tag matches also seed a KNN query over
+        the movie features, and both similarities are mixed, so movies
+        without matching tags can still be recommended.
+        
+        Args:
+            query: Free text, e.g. "dark sci-fi time travel"
+            n_neighbors: Number of recommendations to return
+            blend: Weight of the feature similarity in [0, 1] (default ``TEXT_BLEND_WEIGHT``)
+            
+        Returns:
+            Tuple of (movie indices, scores) where ``scores`` holds the final
+            ``score``, the ``text`` similarity and, when blending, the
+            ``features`` similarity
+        """
+        return _run_inline(self._text_recommendations(query, n_neighbors, blend, _InlineSteps()))
+    
+    async def get_text_recommendations_async(
+        self, query: str, n_neighbors: int = 10, blend: Optional[float] = None
+    ) -> Tuple[List[int], Dict[str, List[float]]]:
+        """Same as ``get_text_recommendations``, with the feature KNN query sent to the query batcher."""
+        return await self._text_recommendations(query, n_neighbors, blend, _EventLoopSteps())
+    
+    async def _text_recommendations(
+        self, query: str, n_neighbors: int, blend: Optional[float], steps: "_InlineSteps"
+    ) -> Tuple[List[int], Dict[str, List[float]]]:
+        blend = settings.TEXT_BLEND_WEIGHT if blend is None else blend
+        try:
+            text_indices, text_scores = self._text_matches(query, n_neighbors, blend)
+            seed = self._text_seed_vector(text_indices, text_scores) if blend > 0 else None
+            if seed is None:
+                return text_indices[:n_neighbors].tolist(), {"score": text_scores[:n_neighbors].tolist(),
+                                                             "text": text_scores[:n_neighbors].tolist()}
+            
+            with stage_latency.time("neighbor_search"):
+                _, feature_indices = await steps.search(
+                    self.models.index, seed, self._text_candidate_count(n_neighbors)
+                )
+            return self._blend_text(text_indices, text_scores, feature_indices[0], seed, blend, n_neighbors)
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating text recommendations: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to generate recommendations: {str(e)}"
+            )
+    
+    def _text_candidate_count(self, n_neighbors: int) -> int:
+        return min(max(n_neighbors, settings.HYBRID_CANDIDATES), len(self.models.features))
+    
+    def _text_matches(self, query: str, n_neighbors: int, blend: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorize a query and return its best tag matches (more of them when blending)."""
+        text_index = self.models.text_index
+        if text_index is None or self.models.tfidf is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Text index not loaded; build it with python -m app.training.text"
+            )
+        
+        n_candidates = self._text_candidate_count(n_neighbors) if blend > 0 else n_neighbors
+        with stage_latency.time("text_search"):
+            return text_index.search(self.models.tfidf.transform([query]), n_candidates)
+    
+    def _text_seed_vector(self, indices: np.ndarray, scores: np.ndarray) -> Optional[np.ndarray]:
+        """Average the normalized features of the best tag matches, weighted by their similarity."""
+        seeds = indices[:settings.TEXT_BLEND_SEEDS]
+        if len(seeds) == 0:
+            return None
+        weights = scores[:len(seeds)].reshape(-1, 1)
+        return normalize_rows((normalize_rows(self.models.features[seeds]) * weights).sum(axis=0))
+    
+    def _blend_text(
+        self, text_indices: np.ndarray, text_scores: np.ndarray, feature_indices: np.ndarray,
+        seed: np.ndarray, blend: float, n_neighbors: int
+    ) -> Tuple[List[int], Dict[str, List[float]]]:
+        """Rank the union of tag and feature candidates by a weighted sum of both similarities."""
+        with stage_latency.time("hybrid_fusion"):
+            candidates = np.union1d(text_indices, feature_indices)
+            text = np.zeros(len(candidates), dtype=np.float32)
+            text[np.searchsorted(candidates, text_indices)] = text_scores
+            features = normalize_rows(self.models.features[candidates]) @ seed[0]
+            score = (1.0 - blend) * text + blend * features
+            
+            top = np.argsort(-score, kind="stable")[:n_neighbors]
+            return candidates[top].tolist(), {
+                "score": score[top].tolist(),
+                "text": text[top].tolist(),
+                "features": features[top].tolist(),
+            }
+    
+    def get_batch_recommendations(
+        self, movie_indices: List[int], n_neighbors: int = 10
+    ) -> List[List[int]]:
+        """
+        Get recommendations for several reference movies at once.
+        
+        All indices are validated together, then the neighbors are read from
+        the precomputed table, or from the recommendation cache with a single
+        KNN query on the stacked feature rows of the movies it is missing.
+        
+        Args:
+            movie_indices: Indices of the reference movies
+            n_neighbors: Number of similar movies to find per reference movie
+            
+        Returns:
+            One list of recommended movie indices per reference movie, in input order
+        """
+        return _run_inline(self._batch_recommendations(movie_indices, n_neighbors, _InlineSteps()))
+    
+    async def get_batch_recommendations_async(
+        self, movie_indices: List[int], n_neighbors: int = 10
+    ) -> List[List[int]]:
+        """Same as ``get_batch_recommendations``, with the live KNN query sent to the query batcher."""
+        return await self._batch_recommendations(movie_indices, n_neighbors, _EventLoopSteps())
+    
+    async def _batch_recommendations(
+        self, movie_indices: List[int], n_neighbors: int, steps: "_InlineSteps"
+    ) -> List[List[int]]:
+        results, missing = self._lookup_batch(movie_indices, n_neighbors)
+        if missing and settings.ENABLE_CACHING:
+            cached = await steps.cache_get([self._cache_key(idx, "content") for idx in missing], n_neighbors)
+            missing = self._merge_cached(results, missing, cached)
+        
+        try:
+            # One KNN query for every movie that was not cached
+            if missing:
+                distances, indices = await steps.search(self.models.index, *self._live_query(missing, n_neighbors))
+                live = self._live_results(missing, n_neighbors, indices)
+                if settings.ENABLE_CACHING:
+                    await steps.cache_put(self._cache_entries(live, "content"), n_neighbors)
+                results.update(live)
+            
+            return [results[movie_index] for movie_index in movie_indices]
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating batch recommendations: {str(e)}")
             raise HTTPException(
                 status_code=500, 
                 detail=f"Failed to generate recommendations: {str(e)}"
             )
     
-    def format_recommendations(self, indices: List[int]) -> List[Dict[str, Any]]:
-        """Format recommendation indices into detailed response objects."""
-        recommendations = []
+    def _lookup_batch(self, movie_indices: List[int], n_neighbors: int) -> Tuple[Dict[int, List[int]], List[int]]:
+        """
+        Validate a batch and read what the neighbor table can answer.
+        
+        Returns:
+            Tuple of (recommendations by movie, movies that still need a cache read or KNN query)
+        """
+        if self.models.features is None:
+            raise HTTPException(status_code=500, detail="Feature data not loaded")
+        
+        n_movies = len(self.models.features)
+        invalid = [idx for idx in movie_indices if not 0 <= idx < n_movies]
+        if invalid:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Movie indices {invalid} out of bounds (max: {n_movies-1})"
+            )
         
-        for idx in indices:
+        neighbor_table = self.models.neighbor_indices
+        if neighbor_table is not None and n_neighbors <= neighbor_table.shape[1]:
+            return {idx: neighbor_table[idx, :n_neighbors].tolist() for idx in movie_indices}, []
+        
+        return {}, sorted(set(movie_indices))
+    
+    @staticmethod
+    def _merge_cached(
+        results: Dict[int, List[int]], missing: List[int], cached: List[Optional[np.ndarray]]
+    ) -> List[int]:
+        """Add cache hits to ``results`` and return the movies that still need a KNN query."""
+        for movie_index, indices in zip(missing, cached):
+            if indices is not None:
+                results[movie_index] = indices.tolist()
+        return [movie_index for movie_index in missing if movie_index not in results]
+    
+    def format_batch_recommendations(
+        self, movie_indices: List[int], batch: List[List[int]]
+    ) -> List[Dict[str, Any]]:
+        """Format batch results, resolving each distinct title and movie ID only once."""
+        unique_indices = set(movie_indices)
+        for indices in batch:
+            unique_indices.update(indices)
+        
+        titles = {}
+        movie_ids = {}
+        for idx in unique_indices:
             try:
-                title = self.model_loader.get_movie_name(idx)
-                recommendations.append({
-                    "index": idx,
-                    "title": title
-                })
+                titles[idx] = self.model_loader.get_movie_name(idx)
+                movie_ids[idx] = int(self.model_loader.catalog.movie_id[idx])
             except HTTPException as e:
                 logger.warning(f"Skipping invalid movie index {idx}: {str(e)}")
-                
+        
+        return [
+            {
+                "input_index": movie_index,
+                "input_movieId": movie_ids.get(movie_index),
+                "input_title": titles.get(movie_index),
+                "recommendations": [
+                    {"index": idx, "movieId": movie_ids[idx], "title": titles[idx]}
+                    for idx in indices if idx in titles
+                ]
+            }
+            for movie_index, indices in zip(movie_indices, batch)
+        ]
+    
+    def format_recommendations(
+        self, indices: List[int], scores: Optional[Dict[str, List[float]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Format recommendation indices (and optional per-movie scores) into response objects."""
+        recommendations = []
+        
+        with stage_latency.time("format_titles"):
+            for position, idx in enumerate(indices):
+                try:
+                    title = self.model_loader.get_movie_name(idx)
+                    recommendation = {
+                        "index": idx,
+                        "movieId": int(self.model_loader.catalog.movie_id[idx]),
+                        "title": title
+                    }
+                    if scores is not None:
+                        recommendation["scores"] = {name: values[position] for name, values in scores.items()}
+                    recommendations.append(recommendation)
+                except HTTPException as e:
+                    logger.warning(f"Skipping invalid movie index {idx}: {str(e)}")
+        
         return recommendations
\ No newline at end of file
@@ -0,0 +1,214 @@
+import asyncio
+import numpy as np
+import scipy.sparse as sp
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from fastapi import HTTPException
+
+from app.config import settings
+from app.models.loader import ModelLoader
+from app.services.batcher import query_batcher
+
+logger = logging.getLogger(__name__)
+
+
+class UserResultCache:
+    """
+    Bounded LRU of per-user recommendation results.
+
+    Entries are keyed by (user, model version, source, n) and remember the
+    checksum of the user's history they were computed from; a lookup with a
+    different checksum drops the entry, so only users whose history changed
+    are recomputed after the history index is rebuilt.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple, checksum: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != checksum:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, checksum: int, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (checksum, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+
+user_cache = UserResultCache(settings.USER_CACHE_SIZE)
+
+
+class UserRecommendationService:
+    """Service for personalized recommendations from a user's rating history."""
+
+    def __init__(self, model_loader: ModelLoader):
+        self.model_loader = model_loader
+        # Pin the active model version for the lifetime of this request
+        self.models = model_loader.models
+        self.history = model_loader.user_history
+
+    @staticmethod
+    def clear_cache(old_version: Optional[str] = None, new_version: Optional[str] = None) -> None:
+        """Drop cached user results, e.g. after a model version swap."""
+        user_cache.clear()
+
+    def get_user_row(self, user_id: int) -> int:
+        """Return the history row of a user, raising 404 for unknown users."""
+        if self.history is None:
+            raise HTTPException(status_code=503, detail="User history not loaded")
+
+        row = self.history.position(user_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"User {user_id} has no rating history")
+        return row
+
+    def get_user_recommendations(
+        self, user_id: int, n_neighbors: int = 10, source: str = "collaborative"
+    ) -> Tuple[List[int], List[float], int]:
+        """
+        Score unseen movies by their similarity to the movies a user rated.
+
+        The user's ratings, centered on their mean, form a sparse vector that
+        is multiplied by the item-item similarity matrix of the chosen source,
+        so every candidate's score is the rating-weighted sum of its
+        similarities to the user's movies. Movies already rated are removed
+        using the history's sorted seen-set.
+
+        ``mf`` delegates to the matrix factorization model instead.
+
+        Args:
+            user_id: MovieLens user id
+            n_neighbors: Number of recommendations to return
+            source: ``collaborative`` (item-item graph), ``content`` (neighbor table) or ``mf``
+
+        Returns:
+            Tuple of (movie indices, scores, number of rated movies)
+        """
+        if source == "mf":
+            return self.get_factor_recommendations(user_id, n_neighbors)
+
+        row = self.get_user_row(user_id)
+        checksum = int(self.history.checksums[row])
+        key = (user_id, self.models.version, source, n_neighbors)
+
+        cached = user_cache.get(key, checksum) if settings.ENABLE_CACHING else None
+        if cached is not None:
+            return cached
+
+        graph = self.models.collaborative if source == "collaborative" else self.models.content_graph()
+        if graph is None:
+            raise HTTPException(status_code=503, detail=f"No {source} neighbor structure loaded")
+
+        try:
+            seen, ratings = self.history.history(row)
+            weights = ratings - ratings.mean()
+            if not np.any(weights):
+                # A user who gave every movie the same rating likes them all equally
+                weights = np.ones_like(ratings)
+
+            user_vector = sp.csr_matrix(
+                (weights, seen, np.array([0, len(seen)])), shape=(1, len(graph))
+            )
+            scored = user_vector @ graph.matrix()
+            candidates, scores = scored.indices, scored.data
+
+            # Drop seen movies and non-positive scores
+            position = np.minimum(np.searchsorted(seen, candidates), len(seen) - 1)
+            keep = (seen[position] != candidates) & (scores > 0)
+            candidates, scores = candidates[keep], scores[keep]
+
+            if len(candidates) > n_neighbors:
+                top = np.argpartition(-scores, n_neighbors - 1)[:n_neighbors]
+                candidates, scores = candidates[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            result = (candidates[order].tolist(), scores[order].tolist(), len(seen))
+
+        except Exception as e:
+            logger.error(f"Error generating user recommendations: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to generate recommendations: {str(e)}"
+            )
+
+        if settings.ENABLE_CACHING:
+            user_cache.put(key, checksum, result)
+        return result
+
+    async def get_user_recommendations_async(
+        self, user_id: int, n_neighbors: int = 10, source: str = "collaborative"
+    ) -> Tuple[List[int], List[float], int]:
+        """
+        Same as ``get_user_recommendations``, for use on the event loop.
+
+        The sparse product and the factor scoring run on the query batcher's
+        worker threads, like the other live searches.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            query_batcher.executor, self.get_user_recommendations, user_id, n_neighbors, source
+        )
+
+    def get_factor_recommendations(self, user_id: int, n_neighbors: int = 10) -> Tuple[List[int], List[float], int]:
+        """
+        Score every movie for a user with the ALS factors.
+
+        One float32 matrix-vector product scores the whole catalog and
+        ``argpartition`` selects the top movies, so the cost does not depend
+        on the user's history length. Rated movies are excluded when the
+        history index knows the user.
+
+        Returns:
+            Tuple of (movie indices, predicted scores, number of rated movies)
+        """
+        model = self.models.factors
+        if model is None:
+            raise HTTPException(status_code=503, detail="Matrix factorization model not loaded")
+
+        row = model.position(user_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"User {user_id} is not in the factor model")
+
+        seen = np.empty(0, dtype=np.int32)
+        checksum = 0
+        history_row = self.history.position(user_id) if self.history is not None else None
+        if history_row is not None:
+            seen = self.history.history(history_row)[0]
+            checksum = int(self.history.checksums[history_row])
+
+        key = (user_id, self.models.version, "mf", n_neighbors)
+        cached = user_cache.get(key, checksum) if settings.ENABLE_CACHING else None
+        if cached is not None:
+            return cached
+
+        indices, scores = model.top_k(row, n_neighbors, exclude=seen)
+        result = (indices.tolist(), scores.tolist(), len(seen))
+        if settings.ENABLE_CACHING:
+            user_cache.put(key, checksum, result)
+        return result
@@ -0,0 +1 @@
+"""Offline model building modules."""
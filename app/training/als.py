@@ -0,0 +1,274 @@
+"""Offline alternating least squares (ALS) matrix factorization of the ratings."""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from app.config import settings
+from app.models.artifacts import is_bundle
+from app.models.factors import FactorModel
+from app.models.shared import SharedArrays, attach, attached
+from app.models.users import UserHistory
+
+logger = logging.getLogger(__name__)
+
+# Bytes per entry of a row's (f x f) normal equations and (f) right-hand side:
+# float64 values, plus the copy np.linalg.solve makes of them
+CHUNK_BYTES_PER_ENTRY = 16
+
+
+def _solve_rows(side: str, start: int, stop: int, params: Dict[str, Any],
+                gram: Optional[np.ndarray] = None) -> None:
+    """
+    Solve the least-squares problem of a range of user or item rows in place.
+
+    Explicit feedback minimizes the squared error of ``rating - global_mean``
+    with a regularization weighted by each row's number of ratings (ALS-WR).
+    Implicit feedback uses confidence ``1 + alpha * rating`` on observed
+    entries and the precomputed Gram matrix of the fixed side for the rest.
+    """
+    other = "item" if side == "user" else "user"
+    indptr = attached[f"{side}_indptr"]
+    indices = attached[f"{side}_indices"]
+    ratings = attached[f"{side}_ratings"]
+    target = attached[f"{side}_factors"]
+    fixed = attached[f"{other}_factors"]
+
+    n_factors = fixed.shape[1]
+    identity = np.eye(n_factors)
+    matrices = np.empty((stop - start, n_factors, n_factors))
+    vectors = np.empty((stop - start, n_factors))
+    for position, row in enumerate(range(start, stop)):
+        begin, end = indptr[row], indptr[row + 1]
+        factors = fixed[indices[begin:end]]
+        values = ratings[begin:end]
+        if params["implicit"]:
+            confidence = 1.0 + params["alpha"] * values
+            matrices[position] = gram + (factors.T * (confidence - 1.0)) @ factors
+            matrices[position] += params["reg"] * identity
+            vectors[position] = factors.T @ confidence
+        else:
+            # Rows without ratings solve to zero through the identity term
+            matrices[position] = factors.T @ factors + params["reg"] * max(end - begin, 1) * identity
+            vectors[position] = factors.T @ (values - params["global_mean"])
+
+    # One batched LAPACK call for the whole chunk
+    target[start:stop] = np.linalg.solve(matrices, vectors[..., None])[..., 0]
+
+
+def _csr_arrays(matrix: sp.csr_matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return matrix.indptr.astype(np.int64), matrix.indices.astype(np.int32), matrix.data.astype(np.float64)
+
+
+def train_als(
+    ratings: sp.csr_matrix,
+    user_factors: np.ndarray,
+    item_factors: np.ndarray,
+    params: Dict[str, Any],
+    n_iterations: int,
+    workers: int,
+    max_chunk_mb: int = 64,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run ALS sweeps over a (users x items) rating matrix from the given starting factors.
+
+    Each half-sweep splits the rows into chunks that a process pool solves
+    in parallel against shared-memory factor arrays. There are at least four
+    chunks per worker, and chunks are made smaller when needed so that their
+    stacked normal equations fit in ``max_chunk_mb``.
+
+    Returns:
+        The trained (user_factors, item_factors)
+    """
+    item_matrix = ratings.T.tocsr()
+    n_factors = np.shape(user_factors)[1]
+    chunk_rows = max(1, (max_chunk_mb << 20) // (CHUNK_BYTES_PER_ENTRY * n_factors * (n_factors + 1)))
+
+    with SharedArrays() as shared:
+        for side, matrix, factors in (("user", ratings, user_factors), ("item", item_matrix, item_factors)):
+            for name, array in zip(("indptr", "indices", "ratings"), _csr_arrays(matrix)):
+                shared.add(f"{side}_{name}", array)
+            shared.add(f"{side}_factors", np.asarray(factors, dtype=np.float64))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach,
+                                 initargs=(shared.specs(),)) as executor:
+            for iteration in range(n_iterations):
+                start_time = time.perf_counter()
+                for side, other in (("user", "item"), ("item", "user")):
+                    # Views into shared memory must not outlive this block, so none is bound to a name
+                    gram = (shared[f"{other}_factors"].T @ shared[f"{other}_factors"]
+                            if params["implicit"] else None)
+                    n_rows = len(shared[f"{side}_indptr"]) - 1
+                    n_chunks = max(1, workers * 4, -(-n_rows // chunk_rows))
+                    bounds = np.linspace(0, n_rows, n_chunks + 1).astype(int)
+                    futures = [
+                        executor.submit(_solve_rows, side, int(begin), int(end), params, gram)
+                        for begin, end in zip(bounds[:-1], bounds[1:]) if end > begin
+                    ]
+                    for future in futures:
+                        future.result()
+                logger.info(f"ALS iteration {iteration + 1}/{n_iterations} in {time.perf_counter() - start_time:.2f}s")
+
+        return shared["user_factors"].copy(), shared["item_factors"].copy()
+
+
+def split_holdout(history: UserHistory, fraction: float, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return a random boolean mask of held-out ratings and the user row of every rating."""
+    rows = np.repeat(np.arange(len(history), dtype=np.int32), np.diff(history.indptr))
+    holdout = np.random.default_rng(seed).random(len(rows)) < fraction
+    return holdout, rows
+
+
+def evaluate(user_factors: np.ndarray, item_factors: np.ndarray, train: sp.csr_matrix,
+             test_rows: np.ndarray, test_items: np.ndarray, test_ratings: np.ndarray,
+             params: Dict[str, Any], k: int = 10, relevance_threshold: float = 3.5,
+             max_users: int = 2000, seed: int = 42) -> Dict[str, Any]:
+    """
+    Report RMSE on held-out ratings and NDCG@k of the top-k unseen movies.
+
+    Movies a user rated at or above ``relevance_threshold`` in the held-out
+    set are the relevant ones for NDCG; RMSE is only reported for explicit
+    feedback, where predictions are on the rating scale.
+    """
+    report: Dict[str, Any] = {"k": k, "test_ratings": int(len(test_ratings))}
+    offset = 0.0 if params["implicit"] else params["global_mean"]
+
+    if not params["implicit"]:
+        predictions = offset + np.einsum("ij,ij->i", user_factors[test_rows], item_factors[test_items])
+        report["rmse"] = float(np.sqrt(np.mean((predictions - test_ratings) ** 2)))
+
+    relevant = test_ratings >= relevance_threshold
+    users = np.unique(test_rows[relevant])
+    if len(users) > max_users:
+        users = np.random.default_rng(seed).choice(users, max_users, replace=False)
+
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ndcg = []
+    for user in users:
+        scores = item_factors @ user_factors[user]
+        scores[train.indices[train.indptr[user]:train.indptr[user + 1]]] = -np.inf
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        targets = test_items[(test_rows == user) & relevant]
+        gains = np.isin(top, targets)
+        ideal = discounts[:min(len(targets), k)].sum()
+        ndcg.append(float((gains * discounts).sum() / ideal))
+
+    report["ndcg"] = float(np.mean(ndcg)) if ndcg else None
+    report["ndcg_users"] = len(ndcg)
+    return report
+
+
+def initial_factors(history: UserHistory, n_items: int, n_factors: int, seed: int,
+                    previous: Optional[FactorModel]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return starting factors, reusing a previous model's rows where they still apply.
+
+    Users are matched by id; item factors are reused when the catalog size is
+    unchanged. Everything else starts from small random values.
+    """
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(0, 0.01, (len(history), n_factors))
+    item_factors = rng.normal(0, 0.01, (n_items, n_factors))
+
+    if previous is None:
+        return user_factors, item_factors
+    if previous.item_factors.shape != (n_items, n_factors):
+        logger.warning("Previous factors do not match the catalog or factor count, starting cold")
+        return user_factors, item_factors
+
+    item_factors[:] = previous.item_factors
+    if len(previous.user_ids) == 0:
+        logger.info(f"Warm start from {previous.version}: no users to reuse")
+        return user_factors, item_factors
+    user_ids = np.asarray(history.user_ids)
+    positions = np.minimum(np.searchsorted(previous.user_ids, user_ids), len(previous.user_ids) - 1)
+    known = np.asarray(previous.user_ids)[positions] == user_ids
+    user_factors[known] = np.asarray(previous.user_factors)[positions[known]]
+    logger.info(f"Warm start from {previous.version}: reused {np.count_nonzero(known)}/{len(user_ids)} users")
+    return user_factors, item_factors
+
+
+def main() -> None:
+    """Train ALS factors from the cleaned ratings, report accuracy and save them next to the models."""
+    parser = argparse.ArgumentParser(description="Train a matrix factorization model with ALS")
+    parser.add_argument("--ratings", default=str(Path(settings.DATA_DIR) / settings.RATINGS_PATH))
+    parser.add_argument("--dataset", default=str(Path(settings.DATA_DIR) / settings.DATASET_PATH))
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR)
+    parser.add_argument("--factors", type=int, default=64)
+    parser.add_argument("--reg", type=float, default=0.05)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--implicit", action="store_true", help="treat ratings as implicit confidence")
+    parser.add_argument("--alpha", type=float, default=10.0, help="implicit confidence scale")
+    parser.add_argument("--warm-start", action="store_true", help="start from the saved factors")
+    parser.add_argument("--eval-fraction", type=float, default=0.1, help="ratings held out for the report")
+    parser.add_argument("--refit-iterations", type=int, default=2,
+                        help="sweeps over all ratings after evaluation, warm-started from the evaluated factors")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-chunk-mb", type=int, default=64,
+                        help="memory budget for the normal equations of one chunk of rows")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    output_dir = Path(args.model_dir) / settings.FACTORS_DIR
+    movie_ids = pd.read_csv(args.dataset, usecols=["movieId"])["movieId"].to_numpy()
+    ratings = pd.read_csv(
+        args.ratings, usecols=["userId", "movieId", "rating"],
+        dtype={"userId": np.int32, "movieId": np.int32, "rating": np.float32}
+    )
+    history = UserHistory.build(
+        ratings["userId"].to_numpy(), ratings["movieId"].to_numpy(), ratings["rating"].to_numpy(), movie_ids
+    )
+    shape = (len(history), len(movie_ids))
+    items, values = np.asarray(history.items), np.asarray(history.ratings, dtype=np.float64)
+
+    params = {
+        "implicit": args.implicit,
+        "alpha": args.alpha,
+        "reg": args.reg,
+        "global_mean": float(values.mean()),
+    }
+    previous = FactorModel.load(output_dir) if args.warm_start and is_bundle(output_dir) else None
+    user_factors, item_factors = initial_factors(history, len(movie_ids), args.factors, args.seed, previous)
+
+    report = None
+    start_time = time.perf_counter()
+    if args.eval_fraction > 0:
+        holdout, rows = split_holdout(history, args.eval_fraction, args.seed)
+        train = sp.csr_matrix((values[~holdout], (rows[~holdout], items[~holdout])), shape=shape)
+        params["global_mean"] = float(values[~holdout].mean())
+        user_factors, item_factors = train_als(
+            train, user_factors, item_factors, params, args.iterations, args.workers, args.max_chunk_mb
+        )
+        report = evaluate(user_factors, item_factors, train, rows[holdout], items[holdout],
+                          values[holdout], params, seed=args.seed)
+        iterations = args.refit_iterations
+    else:
+        iterations = args.iterations
+
+    if iterations > 0:
+        full = sp.csr_matrix((values, items, np.asarray(history.indptr)), shape=shape)
+        params["global_mean"] = float(values.mean())
+        user_factors, item_factors = train_als(full, user_factors, item_factors, params, iterations, args.workers,
+                                               args.max_chunk_mb)
+    train_time = time.perf_counter() - start_time
+
+    model = FactorModel(np.asarray(history.user_ids), user_factors, item_factors, params={
+        **params, "factors": args.factors, "iterations": args.iterations, "seed": args.seed,
+        "warm_start": previous.version if previous is not None else None, "report": report,
+    })
+    manifest = model.save(output_dir)
+    print(json.dumps({"version": manifest["version"], "train_seconds": train_time, "report": report}, indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
@@ -0,0 +1,344 @@
+"""Reproducible offline build of the served feature matrix and artifact bundle."""
+import argparse
+import hashlib
+import json
+import logging
+import pickle
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import MultiLabelBinarizer, StandardScaler
+
+from app.config import settings
+from app.models.artifacts import _replace_file, write_bundle
+from app.models.catalog import bayesian_average
+from app.training.neighbors import build_neighbor_table
+
+logger = logging.getLogger(__name__)
+
+# Bump when a stage's code changes so cached results are not reused
+BUILD_VERSION = 1
+
+BUILD_CACHE_DIR = "build_cache"
+NO_TAGS = "no_tags"
+
+# Stage name -> dataset columns it reads
+STAGE_INPUTS = {
+    "genres": ["genres"],
+    "tag_vectors": ["all_tags"],
+    "tfidf": ["all_tags"],
+    "stats": ["average_rating", "rating_count", "release_year", "last_rating_year"],
+}
+
+
+def split_tags(all_tags: pd.Series) -> List[List[str]]:
+    """Split the pipe-separated ``all_tags`` column, mapping the ``no_tags`` marker to no tags."""
+    return [[] if tags == NO_TAGS else tags.split("|") for tags in all_tags.fillna(NO_TAGS)]
+
+
+def stable_hash(token: str) -> int:
+    """Seed hash for Word2Vec that does not depend on ``PYTHONHASHSEED``."""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def train_word2vec(tag_lists: List[List[str]], vector_size: int, seed: int,
+                   workers: int = 1) -> Tuple[List[str], np.ndarray]:
+    """
+    Train Word2Vec on the per-movie tag lists.
+
+    A single worker thread and a process-independent seed hash keep the
+    vectors identical between runs; more workers are faster but not
+    reproducible.
+
+    Returns:
+        Tuple of (vocabulary, vectors) with one row of ``vectors`` per token
+    """
+    try:
+        from gensim.models import Word2Vec
+    except ImportError as e:
+        raise ImportError("The tag_vectors stage requires gensim: pip install gensim") from e
+
+    model = Word2Vec(
+        [tags for tags in tag_lists if tags], vector_size=vector_size, window=5,
+        min_count=1, workers=workers, seed=seed, hashfxn=stable_hash
+    )
+    return list(model.wv.index_to_key), np.asarray(model.wv.vectors)
+
+
+def average_tag_vectors(tag_lists: List[List[str]], vocabulary: List[str],
+                        vectors: np.ndarray) -> np.ndarray:
+    """
+    Average the token vectors of every movie's tags in one sparse product.
+
+    A (movies x vocabulary) matrix holds each movie's tag counts divided by
+    its number of known tags, so multiplying it by the vector table gives
+    the per-movie means. Movies without known tags get a zero vector.
+    """
+    token_ids = {token: i for i, token in enumerate(vocabulary)}
+    rows, cols = [], []
+    for row, tags in enumerate(tag_lists):
+        for tag in tags:
+            col = token_ids.get(tag)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+
+    counts = sp.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(tag_lists), len(vocabulary))
+    )
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    weights = sp.diags(np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0))
+    return np.asarray((weights @ counts) @ vectors)
+
+
+def build_genres(inputs: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Multi-hot genre matrix."""
+    mlb = MultiLabelBinarizer()
+    matrix = mlb.fit_transform(inputs["genres"].str.split("|"))
+    return {"genres": matrix, "genre_classes": list(mlb.classes_)}
+
+
+def build_tag_vectors(inputs: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-movie averages of Word2Vec tag embeddings."""
+    tag_lists = split_tags(inputs["all_tags"])
+    vocabulary, vectors = train_word2vec(
+        tag_lists, params["vector_size"], params["seed"], params["w2v_workers"]
+    )
+    return {"tag_vectors": average_tag_vectors(tag_lists, vocabulary, vectors)}
+
+
+def build_tfidf(inputs: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """TF-IDF vectorizer over the tag strings."""
+    tfidf = TfidfVectorizer(stop_words="english", max_features=params["tfidf_max_features"])
+    tfidf.fit(inputs["all_tags"].fillna(""))
+    return {"tfidf": tfidf}
+
+
+def build_stats(inputs: pd.DataFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Bayesian average rating plus standardized popularity, recency and year features."""
+    df = inputs.copy()
+    for column in STAGE_INPUTS["stats"]:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+        df[column] = df[column].fillna(df[column].median())
+
+    bayesian = bayesian_average(df["average_rating"].to_numpy(), df["rating_count"].to_numpy())
+
+    def standardize(values: pd.Series) -> np.ndarray:
+        return StandardScaler().fit_transform(values.to_numpy(dtype=np.float64).reshape(-1, 1)).ravel()
+
+    # Standardizing makes the recency reference year irrelevant, so the latest
+    # rating year is used instead of the wall clock to keep builds reproducible
+    recency = df["last_rating_year"].max() - df["last_rating_year"]
+    stats = np.column_stack([
+        bayesian,
+        standardize(np.log1p(df["rating_count"])),
+        standardize(recency),
+        standardize(df["average_rating"] * np.log1p(df["rating_count"])),
+        # Standardized rather than min-max scaled, as the served models were trained
+        standardize(df["release_year"]),
+    ])
+    return {"stats": stats}
+
+
+STAGES: Dict[str, Callable[[pd.DataFrame, Dict[str, Any]], Dict[str, Any]]] = {
+    "genres": build_genres,
+    "tag_vectors": build_tag_vectors,
+    "tfidf": build_tfidf,
+    "stats": build_stats,
+}
+
+# Build parameters each stage depends on (part of its cache key)
+STAGE_PARAMS = {
+    "genres": [],
+    "tag_vectors": ["vector_size", "seed"],
+    "tfidf": ["tfidf_max_features"],
+    "stats": [],
+}
+
+
+class StageCache:
+    """
+    Stage outputs stored on disk under a hash of their inputs.
+
+    The key covers the stage name, ``BUILD_VERSION``, the relevant build
+    parameters and the content of the input columns or arrays, so a re-run
+    recomputes only the stages whose inputs changed.
+    """
+
+    def __init__(self, directory: Optional[Path]):
+        self.directory = Path(directory) if directory else None
+
+    @staticmethod
+    def key(stage: str, params: Dict[str, Any], *inputs: Any) -> str:
+        digest = hashlib.sha256(f"{stage}:{BUILD_VERSION}:{json.dumps(params, sort_keys=True)}".encode())
+        for value in inputs:
+            if isinstance(value, pd.DataFrame):
+                digest.update(",".join(value.columns).encode())
+                digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+            else:
+                array = np.ascontiguousarray(value)
+                digest.update(f"{array.dtype.str}{array.shape}".encode())
+                digest.update(array.tobytes())
+        return digest.hexdigest()[:16]
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.directory / f"{stage}-{key}.pkl"
+
+    def get(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        if self.directory is None or not self._path(stage, key).exists():
+            return None
+        with open(self._path(stage, key), "rb") as f:
+            return pickle.load(f)
+
+    def put(self, stage: str, key: str, result: Dict[str, Any]) -> None:
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for stale in self.directory.glob(f"{stage}-*.pkl"):
+            stale.unlink()
+        _replace_file(self._path(stage, key), lambda f: pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def build_artifacts(
+    df: pd.DataFrame,
+    params: Dict[str, Any],
+    cache: StageCache,
+    max_workers: Optional[int] = None,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Run the feature stages and the neighbor table build.
+
+    The independent stages (genres, tag vectors, TF-IDF, rating statistics)
+    run in a process pool; the feature matrix and neighbor table depend on
+    them and run afterwards.
+
+    Args:
+        df: Processed combined dataset, one row per movie in catalog order
+        params: Build parameters (seed, vector_size, tfidf_max_features, neighbor_k, ...)
+        cache: Stage output cache
+        max_workers: Process pool size (default: one per pending stage)
+
+    Returns:
+        Tuple of (arrays, objects, report) where ``report`` holds the seconds
+        and cache status of every stage
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    report: Dict[str, Dict[str, Any]] = {}
+    pending = {}
+
+    for stage in STAGES:
+        inputs = df[STAGE_INPUTS[stage]]
+        stage_params = {name: params[name] for name in STAGE_PARAMS[stage]}
+        key = cache.key(stage, stage_params, inputs)
+        cached = cache.get(stage, key)
+        if cached is not None:
+            results[stage] = cached
+            report[stage] = {"seconds": 0.0, "cached": True}
+        else:
+            pending[stage] = (inputs, key)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers or len(pending)) as executor:
+            futures = {
+                stage: executor.submit(_timed, STAGES[stage], inputs, params)
+                for stage, (inputs, _) in pending.items()
+            }
+            for stage, future in futures.items():
+                results[stage], seconds = future.result()
+                report[stage] = {"seconds": seconds, "cached": False}
+                cache.put(stage, pending[stage][1], results[stage])
+
+    start_time = time.perf_counter()
+    features = np.hstack((
+        results["genres"]["genres"],
+        results["tag_vectors"]["tag_vectors"],
+        results["stats"]["stats"],
+    )).astype(np.float64)
+    report["features"] = {"seconds": time.perf_counter() - start_time, "cached": False}
+
+    neighbor_params = {"k": params["neighbor_k"]}
+    key = cache.key("neighbors", neighbor_params, features)
+    neighbors = cache.get("neighbors", key)
+    report["neighbors"] = {"seconds": 0.0, "cached": neighbors is not None}
+    if neighbors is None:
+        start_time = time.perf_counter()
+        indices, distances = build_neighbor_table(features, k=params["neighbor_k"])
+        neighbors = {"neighbor_indices": indices, "neighbor_distances": distances}
+        report["neighbors"]["seconds"] = time.perf_counter() - start_time
+        cache.put("neighbors", key, neighbors)
+
+    arrays = {
+        "features": features,
+        "tag_vectors": results["tag_vectors"]["tag_vectors"],
+        **neighbors,
+    }
+    objects = {"tfidf": results["tfidf"]["tfidf"]}
+    return arrays, objects, report
+
+
+def _timed(stage: Callable[[pd.DataFrame, Dict[str, Any]], Dict[str, Any]],
+           inputs: pd.DataFrame, params: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    start_time = time.perf_counter()
+    result = stage(inputs, params)
+    return result, time.perf_counter() - start_time
+
+
+def main() -> None:
+    """Build the artifact bundle from the processed dataset."""
+    parser = argparse.ArgumentParser(description="Build the feature matrix, neighbor table and artifact bundle")
+    parser.add_argument("--dataset", default=str(Path(settings.DATA_DIR) / settings.DATASET_PATH))
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--vector-size", type=int, default=50, help="Word2Vec dimensions")
+    parser.add_argument("--w2v-workers", type=int, default=1,
+                        help="Word2Vec threads (more than one is not reproducible)")
+    parser.add_argument("--tfidf-max-features", type=int, default=100)
+    parser.add_argument("--neighbor-k", type=int, default=settings.NEIGHBOR_TABLE_K)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    args = parser.parse_args()
+
+    params = {
+        "seed": args.seed,
+        "vector_size": args.vector_size,
+        "w2v_workers": args.w2v_workers,
+        "tfidf_max_features": args.tfidf_max_features,
+        "neighbor_k": args.neighbor_k,
+    }
+    model_dir = Path(args.model_dir)
+    cache = StageCache(None if args.no_cache else model_dir / BUILD_CACHE_DIR)
+
+    start_time = time.perf_counter()
+    df = pd.read_csv(args.dataset)
+    load_time = time.perf_counter() - start_time
+
+    arrays, objects, report = build_artifacts(df, params, cache, max_workers=args.workers)
+
+    start_time = time.perf_counter()
+    manifest = write_bundle(
+        model_dir / settings.ARTIFACT_BUNDLE_DIR, arrays, objects,
+        params={
+            "knn": {"metric": "cosine", "n_neighbors": 10},
+            "build": {**params, "build_version": BUILD_VERSION, "dataset_rows": len(df)},
+        }
+    )
+    report = {"load": {"seconds": load_time, "cached": False}, **report,
+              "write_bundle": {"seconds": time.perf_counter() - start_time, "cached": False}}
+
+    print(f"{'stage':<14}{'seconds':>10}  cached")
+    for stage, entry in report.items():
+        print(f"{stage:<14}{entry['seconds']:>10.2f}  {'yes' if entry['cached'] else ''}")
+    print(f"Built bundle {manifest['version']} with features {list(arrays['features'].shape)} "
+          f"at {model_dir / settings.ARTIFACT_BUNDLE_DIR}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
@@ -0,0 +1,467 @@
+"""Offline evaluation of ranking quality and latency on a temporal holdout of the ratings."""
+import argparse
+import json
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from app.config import settings
+from app.models.artifacts import is_bundle, load_feature_matrix, read_bundle
+from app.models.collaborative import NeighborGraph
+from app.models.index import IVFIndex
+from app.models.shared import SharedArrays, attach, attached
+from app.models.users import UserHistory
+from app.training.als import initial_factors, train_als
+from app.training.collaborative import build_neighbor_graph
+from app.training.neighbors import build_neighbor_table
+
+logger = logging.getLogger(__name__)
+
+# Columns appended by build.build_stats after the genre and tag vector blocks
+STATS_COLUMNS = 5
+
+SOURCES = ("popularity", "content", "collaborative", "mf")
+
+# Every configuration option and its default
+CONFIG_DEFAULTS: Dict[str, Any] = {
+    "k": 100,            # neighbors per movie (content, collaborative)
+    "index": "exact",    # content neighbor search: exact or ivf
+    "n_lists": 0,        # ivf lists (0: sqrt(n))
+    "n_probe": 8,        # ivf lists scanned per query
+    "genres": 1.0,       # content feature block weights
+    "tags": 1.0,
+    "stats": 1.0,
+    "factors": 64,       # mf
+    "reg": 0.05,
+    "iterations": 10,
+}
+
+DEFAULT_CONFIGS = ["popularity", "content:k=100", "collaborative:k=100"]
+
+# Metrics compared between configurations, and whether higher is better
+REPORTED_METRICS = {
+    "precision": True,
+    "recall": True,
+    "map": True,
+    "ndcg": True,
+    "coverage": True,
+    "batch_ms_per_user": False,
+}
+
+# Item-item similarity matrix rebuilt once per worker process
+_similarity: Dict[str, sp.csr_matrix] = {}
+
+
+def load_ratings(path: Path) -> pd.DataFrame:
+    """Read a ratings file, converting date-string timestamps to epoch seconds."""
+    ratings = pd.read_csv(
+        path, usecols=["userId", "movieId", "rating", "timestamp"],
+        dtype={"userId": np.int32, "movieId": np.int32, "rating": np.float32}
+    )
+    if not pd.api.types.is_numeric_dtype(ratings["timestamp"]):
+        # Cast to seconds first: pandas parses to ns or us depending on the version
+        ratings["timestamp"] = pd.to_datetime(ratings["timestamp"]).astype("datetime64[s]").astype("int64")
+    return ratings
+
+
+def temporal_split(ratings: pd.DataFrame, test_fraction: float, per_user: bool = False) -> np.ndarray:
+    """
+    Return a boolean mask of the held-out ratings.
+
+    By default every rating after a global cutoff time is held out, as if
+    the models had been trained at that moment. With ``per_user``, the
+    latest ``test_fraction`` of each user's ratings is held out instead.
+    """
+    timestamps = ratings["timestamp"].to_numpy()
+    if not per_user:
+        return timestamps > np.quantile(timestamps, 1.0 - test_fraction)
+
+    order = np.lexsort((timestamps, ratings["userId"].to_numpy()))
+    users = ratings["userId"].to_numpy()[order]
+    starts = np.concatenate(([0], np.flatnonzero(users[1:] != users[:-1]) + 1))
+    counts = np.diff(np.append(starts, len(users)))
+    rank = np.arange(len(users)) - np.repeat(starts, counts)
+    n_test = np.floor(counts * test_fraction).astype(np.int64)
+
+    test = np.empty(len(users), dtype=bool)
+    test[order] = rank >= np.repeat(counts - n_test, counts)
+    return test
+
+
+def parse_config(text: str) -> Dict[str, Any]:
+    """Parse ``source[:option=value,...]``, e.g. ``content:k=50,index=ivf,n_probe=4``."""
+    source, _, options = text.partition(":")
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source '{source}' in '{text}' (expected one of {list(SOURCES)})")
+
+    config = {"name": text, "source": source, **CONFIG_DEFAULTS}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        if key not in CONFIG_DEFAULTS:
+            raise ValueError(f"Unknown option '{key}' in '{text}' (expected one of {sorted(CONFIG_DEFAULTS)})")
+        config[key] = type(CONFIG_DEFAULTS[key])(value)
+    return config
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(start, start + length)`` for every pair without a Python loop."""
+    total = int(lengths.sum())
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return offsets + np.arange(total)
+
+
+def weighted_features(features: np.ndarray, tag_dims: int, config: Dict[str, Any]) -> np.ndarray:
+    """Scale the genre, tag vector and statistics blocks of the feature matrix."""
+    features = np.asarray(features, dtype=np.float64)
+    weights = (config["genres"], config["tags"], config["stats"])
+    if weights == (1.0, 1.0, 1.0):
+        return features
+
+    n_genres = features.shape[1] - tag_dims - STATS_COLUMNS
+    if n_genres < 0:
+        raise ValueError("Feature blocks are unknown for this feature matrix; block weights are not supported")
+    return features * np.repeat(weights, [n_genres, tag_dims, STATS_COLUMNS])
+
+
+def content_table(features: np.ndarray, config: Dict[str, Any], seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Build the content neighbor table with exact search or an IVF index."""
+    if config["index"] == "exact":
+        return build_neighbor_table(features, k=config["k"])
+    if config["index"] != IVFIndex.backend:
+        raise ValueError(f"Unknown index '{config['index']}' (expected exact or ivf)")
+
+    index = IVFIndex.build(features, n_lists=config["n_lists"] or None, n_probe=config["n_probe"], seed=seed)
+    n_items = len(features)
+    k = min(config["k"], n_items - 1)
+    indices = np.empty((n_items, k), dtype=np.int32)
+    distances = np.empty((n_items, k), dtype=np.float32)
+    for start in range(0, n_items, 4096):
+        stop = min(start + 4096, n_items)
+        block_distances, block_indices = index.query(features[start:stop], k + 1)
+        # Move each movie's own entry to the end, then keep the first k
+        own = block_indices == np.arange(start, stop)[:, None]
+        order = np.argsort(own, axis=1, kind="stable")[:, :k]
+        indices[start:stop] = np.take_along_axis(block_indices, order, axis=1)
+        distances[start:stop] = np.take_along_axis(block_distances, order, axis=1)
+    return indices, distances
+
+
+def build_scorer(config: Dict[str, Any], train: UserHistory, train_ratings: pd.DataFrame,
+                 movie_ids: np.ndarray, features: Optional[np.ndarray], tag_dims: int,
+                 workers: int, seed: int) -> Dict[str, np.ndarray]:
+    """
+    Fit one configuration on the training ratings.
+
+    Returns:
+        The arrays the workers score users with: ``popularity``, an item-item
+        graph (``graph_*``) or ALS ``user_factors`` / ``item_factors``
+    """
+    n_items = len(movie_ids)
+    source = config["source"]
+    if source == "popularity":
+        return {"popularity": np.bincount(train.items, minlength=n_items).astype(np.float32)}
+
+    if source == "mf":
+        matrix = sp.csr_matrix((train.ratings, train.items, train.indptr), shape=(len(train), n_items))
+        params = {"implicit": False, "alpha": 0.0, "reg": config["reg"],
+                  "global_mean": float(np.mean(train.ratings))}
+        user_factors, item_factors = initial_factors(train, n_items, config["factors"], seed, None)
+        user_factors, item_factors = train_als(matrix, user_factors, item_factors, params,
+                                               config["iterations"], workers)
+        return {"user_factors": user_factors.astype(np.float32), "item_factors": item_factors.astype(np.float32)}
+
+    if source == "content":
+        if features is None:
+            raise ValueError("Content configurations need the feature matrix")
+        graph = NeighborGraph.from_table(*content_table(weighted_features(features, tag_dims, config), config, seed))
+    else:
+        graph = build_neighbor_graph(train_ratings, movie_ids, k=config["k"])
+    return {"graph_indptr": graph.indptr, "graph_indices": graph.indices, "graph_similarities": graph.similarities}
+
+
+def _score_batch(rows: np.ndarray, seen_rows: np.ndarray, seen_items: np.ndarray, seen_ratings: np.ndarray,
+                 lengths: np.ndarray, n_items: int) -> np.ndarray:
+    """Score every movie for a batch of users as a dense (users x movies) float32 matrix."""
+    if "popularity" in attached:
+        return np.tile(attached["popularity"], (len(rows), 1))
+
+    if "user_factors" in attached:
+        return attached["user_factors"][rows] @ attached["item_factors"].T
+
+    if "graph" not in _similarity:
+        _similarity["graph"] = sp.csr_matrix(
+            (attached["graph_similarities"], attached["graph_indices"], attached["graph_indptr"]),
+            shape=(n_items, n_items)
+        )
+    # Mean-centered ratings times item-item similarities, as served by the user endpoint
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    means = np.add.reduceat(seen_ratings, starts) / lengths
+    weights = seen_ratings - np.repeat(means, lengths)
+    flat = np.add.reduceat(np.abs(weights), starts) == 0
+    weights[np.repeat(flat, lengths)] = 1.0
+    users = sp.csr_matrix((weights, (seen_rows, seen_items)), shape=(len(rows), n_items))
+    return (users @ _similarity["graph"]).toarray().astype(np.float32)
+
+
+def _recommend_rows(rows: np.ndarray, k: int, batch_size: int, n_items: int) -> Tuple[np.ndarray, List[float]]:
+    """
+    Return the top-k unseen movies of a chunk of training-history rows.
+
+    Users are scored ``batch_size`` at a time with one matrix product per
+    batch. Item-item sources only recommend positively scored movies; the
+    other slots are -1.
+
+    Returns:
+        Tuple of (recommendations of shape (len(rows), k), seconds per batch)
+    """
+    indptr, items, ratings = (attached[f"train_{name}"] for name in ("indptr", "items", "ratings"))
+    positive_only = "graph_indptr" in attached
+    recommendations = np.full((len(rows), k), -1, dtype=np.int32)
+    batch_seconds = []
+
+    for start in range(0, len(rows), batch_size):
+        start_time = time.perf_counter()
+        batch = rows[start:start + batch_size]
+        lengths = indptr[batch + 1] - indptr[batch]
+        positions = _ranges(indptr[batch], lengths)
+        seen_rows = np.repeat(np.arange(len(batch)), lengths)
+        seen_items = items[positions]
+
+        scores = _score_batch(batch, seen_rows, seen_items, ratings[positions].astype(np.float64), lengths, n_items)
+        scores[seen_rows, seen_items] = -np.inf
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        valid = top_scores > 0 if positive_only else np.isfinite(top_scores)
+        recommendations[start:start + len(batch)] = np.where(valid, top, -1)
+        batch_seconds.append(time.perf_counter() - start_time)
+
+    return recommendations, batch_seconds
+
+
+def ranking_metrics(recommendations: np.ndarray, relevant_indptr: np.ndarray, relevant_items: np.ndarray,
+                    n_items: int) -> Dict[str, float]:
+    """
+    Compute precision, recall, MAP and NDCG at k and catalog coverage.
+
+    Args:
+        recommendations: (users x k) movie indices, -1 for empty slots
+        relevant_indptr: CSR offsets of each user's relevant held-out movies
+        relevant_items: Relevant movies, sorted within each user
+        n_items: Catalog size for coverage
+
+    Returns:
+        Metrics averaged over users
+    """
+    n_users, k = recommendations.shape
+    n_relevant = np.diff(relevant_indptr)
+    relevant_keys = np.repeat(np.arange(n_users, dtype=np.int64), n_relevant) * n_items + relevant_items
+    keys = np.arange(n_users, dtype=np.int64)[:, None] * n_items + recommendations
+    positions = np.minimum(np.searchsorted(relevant_keys, keys), len(relevant_keys) - 1)
+    hits = (relevant_keys[positions] == keys) & (recommendations >= 0)
+
+    n_hits = hits.sum(axis=1)
+    ideal_hits = np.minimum(n_relevant, k)
+    precision_at_rank = np.cumsum(hits, axis=1) / np.arange(1, k + 1)
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ideal_dcg = np.cumsum(discounts)[ideal_hits - 1]
+
+    recommended = np.unique(recommendations[recommendations >= 0])
+    return {
+        "precision": float(np.mean(n_hits / k)),
+        "recall": float(np.mean(n_hits / n_relevant)),
+        "map": float(np.mean((precision_at_rank * hits).sum(axis=1) / ideal_hits)),
+        "ndcg": float(np.mean((hits * discounts).sum(axis=1) / ideal_dcg)),
+        "coverage": len(recommended) / n_items,
+    }
+
+
+def evaluate_config(config: Dict[str, Any], train: UserHistory, train_ratings: pd.DataFrame,
+                    movie_ids: np.ndarray, features: Optional[np.ndarray], tag_dims: int,
+                    eval_rows: np.ndarray, relevant: Tuple[np.ndarray, np.ndarray], args: argparse.Namespace
+                    ) -> Dict[str, Any]:
+    """Fit one configuration, recommend for every evaluation user and score the results."""
+    n_items = len(movie_ids)
+    start_time = time.perf_counter()
+    scorer = build_scorer(config, train, train_ratings, movie_ids, features, tag_dims, args.workers, args.seed)
+    build_seconds = time.perf_counter() - start_time
+
+    rng = np.random.default_rng(args.seed)
+    latency_rows = rng.choice(eval_rows, min(args.latency_queries, len(eval_rows)), replace=False)
+
+    with SharedArrays() as shared:
+        for name, array in (("train_indptr", train.indptr), ("train_items", train.items),
+                            ("train_ratings", train.ratings), *scorer.items()):
+            shared.add(name, np.asarray(array))
+
+        start_time = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=attach,
+                                 initargs=(shared.specs(),)) as executor:
+            chunks = [chunk for chunk in np.array_split(eval_rows, args.workers * 4) if len(chunk)]
+            futures = [executor.submit(_recommend_rows, chunk, args.k, args.batch_size, n_items)
+                       for chunk in chunks]
+            parts = [future.result() for future in futures]
+            eval_seconds = time.perf_counter() - start_time
+            # One user per batch approximates the latency of a single request
+            _, latencies = executor.submit(_recommend_rows, latency_rows, args.k, 1, n_items).result()
+
+    recommendations = np.vstack([part[0] for part in parts])
+    batch_seconds = sum(sum(part[1]) for part in parts)
+    latencies_ms = np.asarray(latencies) * 1000
+
+    report = {
+        "name": config["name"],
+        "source": config["source"],
+        "users": len(eval_rows),
+        **ranking_metrics(recommendations, *relevant, n_items),
+        "batch_ms_per_user": 1000 * batch_seconds / len(eval_rows),
+        "latency_ms": {
+            "p50": float(np.percentile(latencies_ms, 50)),
+            "p95": float(np.percentile(latencies_ms, 95)),
+        },
+        "build_seconds": build_seconds,
+        "eval_seconds": eval_seconds,
+    }
+    logger.info(f"Evaluated {config['name']}: ndcg={report['ndcg']:.4f} in {build_seconds + eval_seconds:.1f}s")
+    return report
+
+
+def holdout_users(train: UserHistory, test: UserHistory, min_train_ratings: int,
+                  max_users: int, seed: int) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Select the users with relevant held-out movies and enough training ratings.
+
+    Returns:
+        Tuple of (training-history rows, (indptr, items) of their relevant movies)
+    """
+    test_users = np.asarray(test.user_ids)
+    positions = np.minimum(np.searchsorted(train.user_ids, test_users), len(train) - 1)
+    known = np.asarray(train.user_ids)[positions] == test_users
+    known &= np.diff(train.indptr)[positions] >= min_train_ratings
+    test_rows = np.flatnonzero(known)
+    if max_users and len(test_rows) > max_users:
+        test_rows = np.sort(np.random.default_rng(seed).choice(test_rows, max_users, replace=False))
+
+    lengths = test.indptr[test_rows + 1] - test.indptr[test_rows]
+    relevant_items = np.asarray(test.items)[_ranges(test.indptr[test_rows], lengths)]
+    relevant_indptr = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+    return positions[test_rows], (relevant_indptr, relevant_items)
+
+
+def load_tag_dims(model_dir: Path) -> int:
+    """Return the width of the tag vector block of the feature matrix."""
+    bundle_dir = Path(model_dir) / settings.ARTIFACT_BUNDLE_DIR
+    if is_bundle(bundle_dir):
+        return read_bundle(bundle_dir, mmap=True).get("tag_vectors").shape[1]
+    with open(Path(model_dir) / "tag_vectors.pkl", "rb") as f:
+        return np.asarray(pickle.load(f)).shape[1]
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print one row per configuration."""
+    k = report["params"]["k"]
+    print(f"\n{report['split']['eval_users']} users, {report['split']['test_ratings']} held-out ratings, k={k}")
+    print(f"{'config':<36}{'P@k':>8}{'R@k':>8}{'MAP':>8}{'NDCG':>8}{'cover':>8}"
+          f"{'ms/user':>9}{'p95 ms':>9}{'build s':>9}")
+    for result in report["configs"]:
+        print(f"{result['name']:<36}{result['precision']:>8.4f}{result['recall']:>8.4f}{result['map']:>8.4f}"
+              f"{result['ndcg']:>8.4f}{result['coverage']:>8.4f}{result['batch_ms_per_user']:>9.3f}"
+              f"{result['latency_ms']['p95']:>9.3f}{result['build_seconds']:>9.1f}")
+
+
+def compare_to_baseline(results: Sequence[Dict[str, Any]]) -> None:
+    """Add each configuration's relative change against the first one."""
+    baseline = results[0]
+    for result in results[1:]:
+        result["vs_baseline"] = {
+            metric: result[metric] / baseline[metric] - 1 if baseline[metric] else None
+            for metric in REPORTED_METRICS
+        }
+
+
+def main() -> None:
+    """Evaluate recommendation configurations on a temporal holdout and compare them."""
+    parser = argparse.ArgumentParser(description="Evaluate ranking quality and latency of recommendation configs")
+    parser.add_argument("--ratings", default=str(Path(settings.DATA_DIR) / settings.RATINGS_PATH))
+    parser.add_argument("--dataset", default=str(Path(settings.DATA_DIR) / settings.DATASET_PATH))
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR)
+    parser.add_argument("--config", action="append", default=None,
+                        help="source[:option=value,...], repeatable; the first one is the baseline "
+                             f"(default: {' '.join(DEFAULT_CONFIGS)})")
+    parser.add_argument("--k", type=int, default=10, help="cutoff of every ranking metric")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--per-user", action="store_true", help="hold out each user's latest ratings")
+    parser.add_argument("--relevance-threshold", type=float, default=4.0)
+    parser.add_argument("--min-train-ratings", type=int, default=5)
+    parser.add_argument("--max-users", type=int, default=0, help="sample this many evaluation users (0: all)")
+    parser.add_argument("--batch-size", type=int, default=256, help="users scored per matrix product")
+    parser.add_argument("--latency-queries", type=int, default=200, help="single-user queries timed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="write the report as JSON")
+    args = parser.parse_args()
+
+    configs = [parse_config(text) for text in args.config or DEFAULT_CONFIGS]
+    movie_ids = pd.read_csv(args.dataset, usecols=["movieId"])["movieId"].to_numpy()
+
+    start_time = time.perf_counter()
+    ratings = load_ratings(Path(args.ratings))
+    held_out = temporal_split(ratings, args.test_fraction, args.per_user)
+    train_ratings = ratings[~held_out]
+    test_ratings = ratings[held_out & (ratings["rating"].to_numpy() >= args.relevance_threshold)]
+    train = UserHistory.build(train_ratings["userId"].to_numpy(), train_ratings["movieId"].to_numpy(),
+                              train_ratings["rating"].to_numpy(), movie_ids)
+    test = UserHistory.build(test_ratings["userId"].to_numpy(), test_ratings["movieId"].to_numpy(),
+                             test_ratings["rating"].to_numpy(), movie_ids)
+    eval_rows, relevant = holdout_users(train, test, args.min_train_ratings, args.max_users, args.seed)
+    if not len(eval_rows):
+        raise SystemExit("No user has both training ratings and relevant held-out ratings")
+    logger.info(f"Split {len(ratings)} ratings in {time.perf_counter() - start_time:.1f}s: "
+                f"{len(train_ratings)} train, {int(held_out.sum())} held out, {len(eval_rows)} evaluation users")
+
+    features, tag_dims = None, 0
+    if any(config["source"] == "content" for config in configs):
+        features = load_feature_matrix(Path(args.model_dir))
+        tag_dims = load_tag_dims(Path(args.model_dir))
+        if len(features) != len(movie_ids):
+            raise SystemExit(f"Feature rows ({len(features)}) do not match the dataset ({len(movie_ids)} movies)")
+
+    results = [
+        evaluate_config(config, train, train_ratings, movie_ids, features, tag_dims, eval_rows, relevant, args)
+        for config in configs
+    ]
+    compare_to_baseline(results)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "params": {name: getattr(args, name) for name in (
+            "k", "test_fraction", "per_user", "relevance_threshold", "min_train_ratings", "batch_size", "seed"
+        )},
+        "split": {
+            "train_ratings": len(train_ratings),
+            "test_ratings": int(held_out.sum()),
+            "eval_users": len(eval_rows),
+        },
+        "configs": results,
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote report to {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
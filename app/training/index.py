@@ -0,0 +1,89 @@
+"""Offline build and evaluation of approximate nearest-neighbor indexes."""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from app.config import settings
+from app.models.artifacts import load_feature_matrix
+from app.models.index import ExactIndex, FlatIndex, IVFIndex, recall_at_k
+
+logger = logging.getLogger(__name__)
+
+
+def build_ivf(args: argparse.Namespace, features: np.ndarray, queries: np.ndarray,
+              exact: ExactIndex) -> Dict[str, Any]:
+    """Build the IVF index, measure its recall for several ``n_probe`` values and save it."""
+    start_time = time.perf_counter()
+    index = IVFIndex.build(features, n_lists=args.n_lists, n_probe=args.n_probe,
+                           n_iter=args.n_iter, seed=args.seed)
+    build_time = time.perf_counter() - start_time
+    logger.info(f"Built IVF index with {index.n_lists} lists in {build_time:.2f}s")
+
+    report = {"build_seconds": build_time, "n_lists": index.n_lists, "k": args.k, "n_probe": {}}
+    for n_probe in sorted({1, 2, 4, args.n_probe, 2 * args.n_probe}):
+        index.n_probe = n_probe
+        report["n_probe"][n_probe] = recall_at_k(index, exact, queries, k=args.k)
+    index.n_probe = args.n_probe
+
+    output_dir = Path(args.model_dir) / settings.INDEX_DIR / IVFIndex.backend
+    index.save(output_dir, params={"n_iter": args.n_iter, "seed": args.seed, "recall_report": report})
+    return report
+
+
+def compare_flat(args: argparse.Namespace, features: np.ndarray, queries: np.ndarray,
+                 exact: ExactIndex) -> Dict[str, Any]:
+    """
+    Measure the recall, speed and memory of the flat index in every storage precision.
+
+    Nothing is saved: the loader builds the flat index from the features
+    with the ``INDEX_DTYPE`` precision.
+    """
+    report = {"k": args.k, "features_dtype": str(features.dtype), "features_bytes": features.nbytes, "dtype": {}}
+    for dtype in FlatIndex.DTYPES:
+        start_time = time.perf_counter()
+        index = FlatIndex.build(features, dtype)
+        build_time = time.perf_counter() - start_time
+        report["dtype"][dtype] = {
+            "build_seconds": build_time,
+            "bytes": index.memory_usage(),
+            "compression": features.nbytes / index.memory_usage(),
+            **recall_at_k(index, exact, queries, k=args.k),
+        }
+        logger.info(f"Measured flat index with {dtype} vectors")
+    return report
+
+
+def main() -> None:
+    """Build an IVF index, or compare flat index precisions, and report recall against exact search."""
+    parser = argparse.ArgumentParser(description="Build an approximate nearest-neighbor index")
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR)
+    parser.add_argument("--backend", choices=[IVFIndex.backend, FlatIndex.backend], default=IVFIndex.backend,
+                        help="build the ivf index, or compare the flat index precisions")
+    parser.add_argument("--n-lists", type=int, default=None, help="k-means lists (default: sqrt(n))")
+    parser.add_argument("--n-probe", type=int, default=8, help="lists scanned per query")
+    parser.add_argument("--n-iter", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--k", type=int, default=10, help="k for the recall@k report")
+    parser.add_argument("--eval-queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    features = load_feature_matrix(Path(args.model_dir))
+    rng = np.random.default_rng(args.seed)
+    queries = np.asarray(features[rng.choice(len(features), min(args.eval_queries, len(features)), replace=False)])
+    # Exact search runs on the stored features, float64 for the trained models
+    exact = ExactIndex.build(features)
+
+    if args.backend == FlatIndex.backend:
+        report = compare_flat(args, features, queries, exact)
+    else:
+        report = build_ivf(args, features, queries, exact)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
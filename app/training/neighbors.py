@@ -0,0 +1,93 @@
+"""Offline precomputation of the top-K neighbor table."""
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.artifacts import load_feature_matrix
+from app.models.index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+NEIGHBOR_INDICES_FILE = "neighbor_indices.npy"
+NEIGHBOR_DISTANCES_FILE = "neighbor_distances.npy"
+
+
+def build_neighbor_table(
+    features: np.ndarray, k: int = 100, block_size: int = 1024
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the cosine top-K neighbors of every row, excluding the row itself.
+
+    The similarity matrix is produced one block of rows at a time so that peak
+    memory stays at ``block_size x n_rows`` instead of ``n_rows x n_rows``.
+
+    Args:
+        features: Feature matrix of shape (n_movies, n_features)
+        k: Number of neighbors to keep per movie
+        block_size: Number of query rows per matrix product
+
+    Returns:
+        Tuple of (indices, distances) arrays of shape (n_movies, k) as int32 and
+        float32, sorted by increasing cosine distance.
+    """
+    normalized = normalize_rows(features, dtype=np.float64)
+    n_rows = normalized.shape[0]
+    k = min(k, n_rows - 1)
+    if k < 1:
+        raise ValueError("At least two movies are required to build a neighbor table")
+
+    indices = np.empty((n_rows, k), dtype=np.int32)
+    distances = np.empty((n_rows, k), dtype=np.float32)
+
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        rows = np.arange(stop - start)
+        similarities = normalized[start:stop] @ normalized.T
+        # Exclude each movie from its own neighbor list
+        similarities[rows, rows + start] = -np.inf
+
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1, kind="stable")
+
+        indices[start:stop] = np.take_along_axis(top, order, axis=1)
+        distances[start:stop] = np.clip(
+            1.0 - np.take_along_axis(top_similarities, order, axis=1), 0.0, 2.0
+        )
+
+    return indices, distances
+
+
+def save_neighbor_table(indices: np.ndarray, distances: np.ndarray, model_dir: str) -> None:
+    """Write the neighbor table next to the other model artifacts."""
+    output_dir = Path(model_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    np.save(output_dir / NEIGHBOR_INDICES_FILE, indices.astype(np.int32, copy=False))
+    np.save(output_dir / NEIGHBOR_DISTANCES_FILE, distances.astype(np.float32, copy=False))
+    logger.info(f"Saved {indices.shape[0]}x{indices.shape[1]} neighbor table to {output_dir}")
+
+
+def main() -> None:
+    """Build the neighbor table from the artifact bundle or ``features.pkl``."""
+    parser = argparse.ArgumentParser(description="Precompute the top-K neighbor table")
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR)
+    parser.add_argument("--k", type=int, default=settings.NEIGHBOR_TABLE_K)
+    parser.add_argument("--block-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    features = load_feature_matrix(Path(args.model_dir))
+
+    start_time = time.perf_counter()
+    indices, distances = build_neighbor_table(features, k=args.k, block_size=args.block_size)
+    logger.info(f"Built neighbor table in {time.perf_counter() - start_time:.2f}s")
+    save_neighbor_table(indices, distances, args.model_dir)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
@@ -0,0 +1,55 @@
+"""Offline TF-IDF tag index for free-text recommendations."""
+import argparse
+import logging
+import pickle
+import time
+from pathlib import Path
+from typing import Any, List
+
+import pandas as pd
+
+from app.config import settings
+from app.models.artifacts import is_bundle, read_bundle
+from app.models.text import TagIndex
+from app.training.build import NO_TAGS
+
+logger = logging.getLogger(__name__)
+
+
+def load_vectorizer(model_dir: Path) -> Any:
+    """Read the fitted TF-IDF vectorizer from the artifact bundle, or ``tfidf_model.pkl`` if there is none."""
+    bundle_dir = Path(model_dir) / settings.ARTIFACT_BUNDLE_DIR
+    if is_bundle(bundle_dir):
+        return read_bundle(bundle_dir).get("tfidf")
+    with open(Path(model_dir) / "tfidf_model.pkl", "rb") as f:
+        return pickle.load(f)
+
+
+def tag_documents(all_tags: pd.Series) -> List[str]:
+    """Turn the pipe-separated ``all_tags`` column into one document per movie."""
+    return ["" if tags == NO_TAGS else tags for tags in all_tags.fillna(NO_TAGS)]
+
+
+def main() -> None:
+    """Build the tag index with the served vectorizer and save it next to the models."""
+    parser = argparse.ArgumentParser(description="Build the TF-IDF tag index for free-text recommendations")
+    parser.add_argument("--dataset", default=str(Path(settings.DATA_DIR) / settings.DATASET_PATH))
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR)
+    args = parser.parse_args()
+
+    vectorizer = load_vectorizer(Path(args.model_dir))
+    documents = tag_documents(pd.read_csv(args.dataset, usecols=["all_tags"])["all_tags"])
+
+    start_time = time.perf_counter()
+    index = TagIndex.build(vectorizer, documents)
+    build_time = time.perf_counter() - start_time
+
+    output_dir = Path(args.model_dir) / settings.TEXT_INDEX_DIR
+    manifest = index.save(output_dir)
+    print(f"Built tag index in {build_time:.2f}s: {index.describe()}")
+    print(f"Saved tag index {manifest['version']} to {output_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
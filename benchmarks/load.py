@@ -0,0 +1,82 @@
+"""In-process load tests of the FastAPI app over an ASGI transport."""
+import asyncio
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from benchmarks.stages import latency_summary
+
+# Scenario name -> (random generator, number of movies) -> request path
+SCENARIOS: Dict[str, Callable[[np.random.Generator, int], str]] = {
+    "recommend": lambda rng, n: f"/movies/{rng.integers(n)}/recommend?n_neighbors=10",
+    "recommend_hybrid": lambda rng, n: f"/movies/{rng.integers(n)}/recommend?n_neighbors=10&source=hybrid",
+    "recommend_filtered": lambda rng, n: (
+        f"/movies/{rng.integers(n)}/recommend?n_neighbors=10&year_min=2000&min_ratings=5"
+    ),
+    "text": lambda rng, n: f"/movies/recommend/by-text?q=dark%20river%20{rng.integers(n)}&n_neighbors=10",
+    "movie": lambda rng, n: f"/movies/{rng.integers(n)}",
+    # Synthetic movie ids are 1..n
+    "movie_by_id": lambda rng, n: f"/movies/by-id/{rng.integers(n) + 1}",
+    "search": lambda rng, n: f"/movies/search?q=the%20last%20{rng.integers(n)}",
+    "all_page": lambda rng, n: f"/movies/all?offset={rng.integers(max(n // 1000, 1)) * 1000}&limit=1000",
+    "all": lambda rng, n: "/movies/all",
+}
+DEFAULT_SCENARIOS = ["recommend", "recommend_hybrid", "movie", "search", "all_page"]
+
+
+async def drive(app: Any, path: Callable[[np.random.Generator, int], str], n_items: int,
+                concurrency: int, n_requests: int, warmup: int = 20, seed: int = 0) -> Dict[str, Any]:
+    """
+    Send ``n_requests`` requests through ``concurrency`` concurrent clients.
+
+    Each client awaits its response before sending the next request, so
+    ``concurrency`` is the number of requests in flight.
+
+    Returns:
+        Throughput, error count and latency percentiles
+    """
+    import httpx
+
+    rng = np.random.default_rng(seed)
+    paths = [path(rng, n_items) for _ in range(warmup + n_requests)]
+    latencies = np.empty(n_requests)
+    errors = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for request_path in paths[:warmup]:
+            await client.get(request_path)
+
+        next_request = 0
+
+        async def worker() -> None:
+            nonlocal next_request, errors
+            while next_request < n_requests:
+                request = next_request
+                next_request += 1
+                start_time = time.perf_counter()
+                response = await client.get(paths[warmup + request])
+                latencies[request] = time.perf_counter() - start_time
+                if response.status_code >= 400:
+                    errors += 1
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start_time
+
+    return {
+        "concurrency": concurrency,
+        "requests_per_second": n_requests / elapsed,
+        "errors": errors,
+        **latency_summary(latencies),
+    }
+
+
+def run_load(app: Any, n_items: int, scenarios=DEFAULT_SCENARIOS, concurrency: int = 16,
+             n_requests: int = 500) -> Dict[str, Dict[str, Any]]:
+    """Run each scenario against the app and return its results by name."""
+    return {
+        name: asyncio.run(drive(app, SCENARIOS[name], n_items, concurrency, n_requests))
+        for name in scenarios
+    }
@@ -0,0 +1,157 @@
+"""Run the benchmark suite, save baselines and check for regressions."""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.config import settings
+from benchmarks.synthetic import generate_dataset
+
+logger = logging.getLogger(__name__)
+
+# Metrics compared against the baseline: name -> True if higher is better
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "requests_per_second": True}
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine, so baselines from different boxes are not confused."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "index_backend": settings.INDEX_BACKEND,
+    }
+
+
+def benchmark_size(directory: Path, n_items: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate, load and benchmark one synthetic catalog size."""
+    from app.main import app
+    from app.models.loader import ModelLoader
+    from benchmarks.load import run_load
+    from benchmarks.stages import run_stages
+
+    dataset = generate_dataset(directory / f"items_{n_items}", n_items, args.features,
+                               args.neighbor_k, args.seed)
+    settings.DATA_DIR = dataset["data_dir"]
+    settings.MODEL_DIR = dataset["model_dir"]
+
+    model_loader = ModelLoader()
+    start_time = time.perf_counter()
+    model_loader.load_dataset()
+    model_loader.load_models()
+    load_time = time.perf_counter() - start_time
+
+    results = {"load_seconds": load_time, "stages": run_stages(model_loader, args.calls)}
+    if args.requests > 0:
+        results["load"] = run_load(app, n_items, args.scenarios, args.concurrency, args.requests)
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            min_change_ms: float) -> List[str]:
+    """
+    Return a description of every metric that regressed past ``threshold``.
+
+    Latencies must also have grown by at least ``min_change_ms`` so that
+    timer noise on sub-microsecond stages does not fail a run.
+    """
+    regressions = []
+    for size, results in current["sizes"].items():
+        base_results = baseline.get("sizes", {}).get(size)
+        if base_results is None:
+            continue
+        for group in ("stages", "load"):
+            for name, metrics in results.get(group, {}).items():
+                base_metrics = base_results.get(group, {}).get(name)
+                if base_metrics is None:
+                    continue
+                for metric, higher_is_better in COMPARED_METRICS.items():
+                    if metric not in metrics or metric not in base_metrics:
+                        continue
+                    value, base = metrics[metric], base_metrics[metric]
+                    if higher_is_better:
+                        regressed = value < base * (1 - threshold)
+                    else:
+                        regressed = value > base * (1 + threshold) and value - base >= min_change_ms
+                    if regressed:
+                        regressions.append(f"{size} {group}/{name} {metric}: {base:.4f} -> {value:.4f}")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print one table per catalog size."""
+    for size, results in report["sizes"].items():
+        print(f"\n{size} (loaded in {results['load_seconds']:.2f}s)")
+        print(f"{'stage':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+        for group in ("stages", "load"):
+            for name, metrics in results.get(group, {}).items():
+                throughput = f"{metrics['requests_per_second']:>10.0f}" if "requests_per_second" in metrics else ""
+                print(f"{group[0]}:{name:<22}{metrics['p50_ms']:>10.3f}{metrics['p95_ms']:>10.3f}"
+                      f"{metrics['p99_ms']:>10.3f}{throughput}")
+
+
+def main() -> None:
+    """Benchmark the recommend path on synthetic catalogs."""
+    from benchmarks.load import DEFAULT_SCENARIOS, SCENARIOS
+
+    parser = argparse.ArgumentParser(description="Benchmark and load-test the recommendation API")
+    parser.add_argument("--items", type=int, nargs="+", default=[10000],
+                        help="catalog sizes to benchmark (e.g. 10000 1000000 5000000)")
+    parser.add_argument("--features", type=int, default=160, help="feature matrix width")
+    parser.add_argument("--neighbor-k", type=int, default=settings.NEIGHBOR_TABLE_K)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--calls", type=int, default=200, help="calls per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="requests per load scenario (0 to skip)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--scenarios", nargs="+", default=DEFAULT_SCENARIOS, choices=sorted(SCENARIOS))
+    parser.add_argument("--work-dir", default=None,
+                        help="where synthetic datasets are kept and reused (default: a temporary directory)")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    parser.add_argument("--baseline", default=None, help="compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--min-change-ms", type=float, default=0.05,
+                        help="ignore latency increases smaller than this")
+    args = parser.parse_args()
+
+    report = {"created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+              "environment": environment(), "params": {"features": args.features,
+              "neighbor_k": args.neighbor_k, "concurrency": args.concurrency}, "sizes": {}}
+
+    with tempfile.TemporaryDirectory(prefix="movie-benchmarks-") as temp_dir:
+        directory = Path(args.work_dir or temp_dir)
+        for n_items in args.items:
+            logger.info(f"Benchmarking {n_items} movies")
+            report["sizes"][f"{n_items}x{args.features}"] = benchmark_size(directory, n_items, args)
+
+    print_report(report)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote results to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get("environment") != report["environment"]:
+            logger.warning("Baseline was recorded on a different environment, comparisons may be noisy")
+        regressions = compare(report, baseline, args.threshold, args.min_change_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
@@ -0,0 +1,127 @@
+"""Micro-benchmarks of each stage of the recommend path."""
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from app.config import settings
+from app.models.loader import ModelLoader
+from app.services.hybrid import fuse_candidates
+from app.services.listing import DEFAULT_FIELDS
+from app.services.recommendation import RecommendationService
+
+
+def latency_summary(latencies: np.ndarray) -> Dict[str, float]:
+    """Summarize per-call latencies (seconds) as milliseconds."""
+    milliseconds = np.asarray(latencies) * 1000
+    return {
+        "calls": int(len(milliseconds)),
+        "mean_ms": float(milliseconds.mean()),
+        "p50_ms": float(np.percentile(milliseconds, 50)),
+        "p95_ms": float(np.percentile(milliseconds, 95)),
+        "p99_ms": float(np.percentile(milliseconds, 99)),
+    }
+
+
+def time_stage(stage: Callable[[int], Any], n_calls: int, n_items: int,
+               warmup: int = 5, seed: int = 0) -> Dict[str, float]:
+    """Call ``stage(movie_index)`` on random movies and summarize the latencies."""
+    rng = np.random.default_rng(seed)
+    movies = rng.integers(0, n_items, warmup + n_calls).tolist()
+    for movie_index in movies[:warmup]:
+        stage(movie_index)
+
+    latencies = np.empty(n_calls)
+    for call, movie_index in enumerate(movies[warmup:]):
+        start_time = time.perf_counter()
+        stage(movie_index)
+        latencies[call] = time.perf_counter() - start_time
+    return latency_summary(latencies)
+
+
+def run_stages(model_loader: ModelLoader, n_calls: int = 200, n_neighbors: int = 10,
+               page_size: int = 1000) -> Dict[str, Dict[str, float]]:
+    """
+    Time the building blocks of ``/movies/{index}/recommend`` and ``/movies/all``.
+
+    Results are uncached: ``ENABLE_CACHING`` is off while the stages run
+    and listing pages are serialized from the catalog on every call.
+    ``recommend_cached`` measures a recommendation cache hit instead.
+
+    Returns:
+        Stage name -> latency summary
+    """
+    service = RecommendationService(model_loader)
+    models = service.models
+    catalog = model_loader.catalog
+    listing = model_loader.movie_listing
+    n_items = len(models.features)
+    n_live = min(n_neighbors + 1, n_items)
+    n_live_request = models.neighbor_indices.shape[1] + 1
+    prior = catalog.rating_prior()
+    # A selective filter: one genre, recent movies, a minimum popularity
+    filters = (catalog.genre_names[0], 2000, None, 5)
+    filter_mask = service.candidate_mask(*filters)
+    weights = {
+        "content": settings.HYBRID_CONTENT_WEIGHT,
+        "collaborative": settings.HYBRID_COLLABORATIVE_WEIGHT,
+        "prior": settings.HYBRID_PRIOR_WEIGHT,
+    }
+
+    def hybrid_fusion(movie_index: int) -> Any:
+        indices, scores = service.get_content_candidates(movie_index, settings.HYBRID_CANDIDATES)
+        no_candidates = np.empty(0, dtype=np.int64)
+        return fuse_candidates(indices, scores, no_candidates, no_candidates, prior, weights, n_neighbors)
+
+    stages = {
+        "validate": service.validate_movie_index,
+        "neighbor_table": lambda idx: models.neighbor_indices[idx, :n_neighbors].tolist(),
+        "kneighbors": lambda idx: models.index.query(models.features[idx].reshape(1, -1), n_neighbors=n_live),
+        "recommend_table": lambda idx: service.get_movie_recommendations(idx, n_neighbors),
+        "recommend_live": lambda idx: service.get_movie_recommendations(idx, n_live_request),
+        "filter_mask": lambda idx: service.candidate_mask(*filters),
+        "recommend_filtered": lambda idx: service.get_movie_recommendations(idx, n_neighbors, "content", filter_mask),
+        "hybrid": hybrid_fusion,
+        "format_recommendations": lambda idx: service.format_recommendations(
+            models.neighbor_indices[idx, :n_neighbors].tolist()
+        ),
+        "title_search": lambda idx: model_loader.search_titles(catalog.title(idx)[:12], 10),
+        "id_lookup": lambda idx: model_loader.resolve_movie_id("imdb", int(catalog.imdb_id[idx])),
+        "listing_page": lambda idx: listing._serialize(
+            idx - idx % page_size, page_size, DEFAULT_FIELDS, "json"
+        ),
+    }
+
+    # Live KNN scans every movie, so give the slow stages fewer calls on large catalogs
+    slow_calls = max(10, min(n_calls, int(n_calls * 100000 / max(n_items, 1))))
+    results = {}
+    caching = settings.ENABLE_CACHING
+    settings.ENABLE_CACHING = False
+    try:
+        for name, stage in stages.items():
+            calls = slow_calls if name in ("kneighbors", "recommend_live", "recommend_filtered") else n_calls
+            results[name] = time_stage(stage, calls, n_items)
+    finally:
+        settings.ENABLE_CACHING = caching
+
+    if caching:
+        # Every call after the first reads the same cached result
+        service.get_movie_recommendations(0, n_live_request)
+        results["recommend_cached"] = time_stage(
+            lambda idx: service.get_movie_recommendations(0, n_live_request), n_calls, n_items
+        )
+
+    if models.text_index is not None:
+        # Two-term queries over the vocabulary
+        words = models.tfidf.get_feature_names_out()
+        queries = [f"{a} {b}" for a in words for b in words if a != b]
+        results["text_search"] = time_stage(
+            lambda idx: service.get_text_recommendations(queries[idx % len(queries)], n_neighbors, 0.0),
+            n_calls, n_items
+        )
+
+    if n_items <= 100000:
+        results["listing_full"] = time_stage(
+            lambda idx: listing._serialize(0, None, DEFAULT_FIELDS, "json"), max(3, n_calls // 50), n_items
+        )
+    return results
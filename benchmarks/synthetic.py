@@ -0,0 +1,152 @@
+"""Synthetic catalogs and model bundles of configurable size."""
+import logging
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.config import settings
+from app.models.artifacts import is_bundle, read_bundle, write_bundle
+from app.models.catalog import NUMERIC_COLUMNS, Catalog
+from app.models.text import TagIndex
+
+logger = logging.getLogger(__name__)
+
+GENRE_NAMES = ["Action", "Adventure", "Animation", "Children", "Comedy", "Crime", "Documentary",
+               "Drama", "Fantasy", "Film-Noir", "Horror", "IMAX", "Musical", "Mystery", "Romance",
+               "Sci-Fi", "Thriller", "War", "Western"]
+TITLE_WORDS = ["The", "Last", "Night", "Story", "Return", "City", "Dark", "Love", "Man", "Lost",
+               "Star", "King", "Girl", "War", "Dream", "House", "Blue", "Secret", "River", "Game"]
+
+
+def generate_catalog(n_items: int, seed: int = 42) -> Catalog:
+    """Build a catalog with synthetic titles, release years, genres and ratings."""
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1920, 2024, n_items).astype(np.int16)
+    words = rng.integers(0, len(TITLE_WORDS), (n_items, 3))
+
+    encoded = [
+        f"{TITLE_WORDS[a]} {TITLE_WORDS[b]} {TITLE_WORDS[c]} {idx} ({year})".encode("utf-8")
+        for idx, (a, b, c), year in zip(range(n_items), words.tolist(), years.tolist())
+    ]
+    lengths = np.fromiter((len(title) for title in encoded), dtype=np.int64, count=n_items)
+
+    # One to three genres per movie
+    genre_mask = np.zeros(n_items, dtype=np.uint32)
+    for _ in range(3):
+        bits = rng.integers(0, len(GENRE_NAMES), n_items).astype(np.uint32)
+        keep = rng.random(n_items) < 0.6
+        genre_mask |= np.where(keep, np.uint32(1) << bits, np.uint32(0)).astype(np.uint32)
+    genre_mask[genre_mask == 0] = 1
+
+    arrays = {
+        "movie_id": np.arange(1, n_items + 1, dtype=np.int32),
+        "release_year": years,
+        "total_ratings": rng.zipf(1.5, n_items).clip(max=100000).astype(np.int32),
+        # Sparse, shuffled link ids, as in MovieLens
+        "imdb_id": rng.permutation(np.cumsum(rng.integers(1, 400, n_items))).astype(np.int32),
+        "tmdb_id": (rng.permutation(n_items) + 1).astype(np.int32),
+        "genre_mask": genre_mask,
+        "bayesian_avg": np.clip(rng.normal(3.4, 0.4, n_items), 0.5, 5.0).astype(np.float32),
+        "title_offsets": np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+        "title_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+    return Catalog(arrays, GENRE_NAMES)
+
+
+def generate_features(path: Path, n_items: int, n_features: int, seed: int = 42,
+                      block_size: int = 262144) -> np.ndarray:
+    """
+    Write a clustered float32 feature matrix to a memory-mapped ``.npy`` file.
+
+    Rows are a random cluster center plus noise, so approximate indexes see
+    structure similar to the real features. Rows are generated in blocks to
+    keep memory flat for catalogs of millions of movies.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = max(1, int(np.sqrt(n_items)))
+    centers = rng.normal(size=(n_clusters, n_features)).astype(np.float32)
+
+    features = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_items, n_features))
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        assignments = rng.integers(0, n_clusters, stop - start)
+        features[start:stop] = centers[assignments] + 0.5 * rng.normal(size=(stop - start, n_features))
+    features.flush()
+    return features
+
+
+def generate_neighbor_table(n_items: int, k: int, seed: int = 42) -> Dict[str, np.ndarray]:
+    """
+    Build a random top-K neighbor table with increasing distances.
+
+    Lookups cost the same as with a real table, which would take hours to
+    compute exactly for millions of movies.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, n_items - 1)
+    indices = rng.integers(0, n_items, (n_items, k), dtype=np.int32)
+    distances = np.sort(rng.random((n_items, k), dtype=np.float32), axis=1)
+    return {"neighbor_indices": indices, "neighbor_distances": distances}
+
+
+def generate_dataset(directory: Path, n_items: int, n_features: int = 160,
+                     neighbor_k: int = 100, seed: int = 42) -> Dict[str, Any]:
+    """
+    Write a catalog and a model bundle laid out like ``DATA_DIR`` and ``MODEL_DIR``.
+
+    Existing bundles generated with the same parameters are reused, since
+    building the largest sizes takes minutes.
+
+    Returns:
+        Dictionary with the ``data_dir`` and ``model_dir`` paths and the parameters
+    """
+    directory = Path(directory)
+    params = {"items": n_items, "features": n_features, "neighbor_k": neighbor_k, "seed": seed}
+    data_dir = directory / "data"
+    model_dir = directory / "models"
+    catalog_dir = data_dir / settings.CATALOG_DIR
+    bundle_dir = model_dir / settings.ARTIFACT_BUNDLE_DIR
+
+    if (is_bundle(catalog_dir) and is_bundle(bundle_dir)
+            and read_bundle(bundle_dir, mmap=True).params.get("synthetic") == params
+            and set(NUMERIC_COLUMNS) <= set(read_bundle(catalog_dir, mmap=True).arrays)
+            and is_bundle(model_dir / settings.TEXT_INDEX_DIR)):
+        logger.info(f"Reusing synthetic dataset in {directory}")
+        return {"data_dir": str(data_dir), "model_dir": str(model_dir), **params}
+
+    logger.info(f"Generating synthetic dataset with {n_items} movies x {n_features} features")
+    catalog = generate_catalog(n_items, seed)
+    catalog.save(catalog_dir)
+
+    model_dir.mkdir(parents=True, exist_ok=True)
+    scratch = model_dir / "features.scratch.npy"
+    features = generate_features(scratch, n_items, n_features, seed)
+
+    # A small fitted vectorizer stands in for the TF-IDF model
+    rng = np.random.default_rng(seed)
+    tfidf = TfidfVectorizer().fit([
+        " ".join(rng.choice(TITLE_WORDS, 5)).lower() for _ in range(min(n_items, 1000))
+    ])
+
+    write_bundle(
+        bundle_dir,
+        {
+            "features": features,
+            "tag_vectors": np.asarray(features[:, :min(50, n_features)]),
+            **generate_neighbor_table(n_items, neighbor_k, seed),
+        },
+        {"tfidf": tfidf},
+        params={"knn": {"metric": "cosine", "n_neighbors": 10}, "synthetic": params},
+    )
+    del features
+    scratch.unlink()
+
+    # Three random title words as each movie's tags
+    words = rng.integers(0, len(TITLE_WORDS), (n_items, 3))
+    TagIndex.build(tfidf, (" ".join(TITLE_WORDS[w] for w in row).lower() for row in words.tolist())).save(
+        model_dir / settings.TEXT_INDEX_DIR
+    )
+
+    return {"data_dir": str(data_dir), "model_dir": str(model_dir), **params}
@@ -0,0 +1,157 @@
+import pandas as pd
+import numpy as np
+import logging
+import os
+
+STATE_DIR = '../processed/aggregate_state'
+RATING_STATE_COLUMNS = ['count', 'mean', 'm2', 'min', 'max', 'first_year', 'last_year']
+
+def merge_rating_moments(left, right):
+    """
+    Merge two per-movie rating summaries indexed by movieId.
+
+    Counts, means and sums of squared deviations (M2) are combined with
+    Chan et al.'s parallel form of Welford's update, so no step needs the raw
+    ratings of earlier chunks or earlier runs.
+    """
+    left, right = left.align(right, join='outer')
+    for df in (left, right):
+        df[['count', 'mean', 'm2']] = df[['count', 'mean', 'm2']].fillna(0)
+
+    count = left['count'] + right['count']
+    delta = right['mean'] - left['mean']
+    merged = pd.DataFrame(index=left.index)
+    merged['count'] = count
+    merged['mean'] = left['mean'] + delta * right['count'] / count
+    merged['m2'] = left['m2'] + right['m2'] + delta ** 2 * left['count'] * right['count'] / count
+    merged['min'] = np.fmin(left['min'], right['min'])
+    merged['max'] = np.fmax(left['max'], right['max'])
+    merged['first_year'] = np.fmin(left['first_year'], right['first_year'])
+    merged['last_year'] = np.fmax(left['last_year'], right['last_year'])
+    return merged
+
+def summarize_ratings(ratings):
+    """Per-movie count, mean, M2, min, max and first/last rating year of a ratings frame."""
+    grouped = ratings.groupby('movieId')
+    summary = grouped['rating'].agg(['count', 'mean', 'var', 'min', 'max'])
+    summary['m2'] = summary.pop('var').fillna(0) * (summary['count'] - 1)
+    summary['first_year'] = grouped['year'].min()
+    summary['last_year'] = grouped['year'].max()
+    return summary[RATING_STATE_COLUMNS].astype('float64')
+
+def histogram_quantile(counts, q):
+    """Linear-interpolated quantile (as pandas computes it) from a value histogram."""
+    values = counts.index.to_numpy(dtype=np.float64)
+    cumulative = np.cumsum(counts.to_numpy())
+    position = q * (cumulative[-1] - 1)
+    lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+    upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+    return lower + (upper - lower) * (position - np.floor(position))
+
+def clip_bounds(counts):
+    """Outlier bounds (1.5 IQR around the quartiles) from a rating value histogram."""
+    q1 = histogram_quantile(counts, 0.25)
+    q3 = histogram_quantile(counts, 0.75)
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+class AggregateState:
+    """
+    Persisted per-movie aggregates that new ratings and tags can be folded into.
+
+    Holds the rating moments per movie, the histogram of raw rating values
+    (for the outlier bounds), the clipping and normalization constants the
+    aggregates were computed with, and the multiset of tag counts per movie.
+    """
+
+    def __init__(self, ratings, histogram, lower_bound, upper_bound, tag_counts):
+        self.ratings = ratings
+        self.histogram = histogram
+        self.lower_bound = float(lower_bound)
+        self.upper_bound = float(upper_bound)
+        self.tag_counts = tag_counts
+
+    @property
+    def rating_min(self):
+        return float(np.clip(self.histogram.index.min(), self.lower_bound, self.upper_bound))
+
+    @property
+    def rating_max(self):
+        return float(np.clip(self.histogram.index.max(), self.lower_bound, self.upper_bound))
+
+    @classmethod
+    def from_frames(cls, summary, histogram, lower_bound, upper_bound, tags):
+        """Build the state from rating summaries and the cleaned tags frame."""
+        tag_counts = tags.groupby(['movieId', 'tag']).size().rename('count').reset_index()
+        return cls(summary, histogram, lower_bound, upper_bound, tag_counts)
+
+    def fold_ratings(self, summary, histogram):
+        """Merge the summary of new ratings into the state."""
+        self.ratings = merge_rating_moments(self.ratings, summary)
+        self.histogram = self.histogram.add(histogram, fill_value=0).sort_index()
+
+        lower_bound, upper_bound = clip_bounds(self.histogram)
+        if (lower_bound, upper_bound) != (self.lower_bound, self.upper_bound):
+            logging.warning(
+                f"Outlier bounds moved to [{lower_bound}, {upper_bound}] from "
+                f"[{self.lower_bound}, {self.upper_bound}]; run a full rebuild to re-clip history"
+            )
+
+    def fold_tags(self, tags):
+        """Add new tags to the per-movie tag multisets."""
+        counts = tags.groupby(['movieId', 'tag']).size().rename('count').reset_index()
+        self.tag_counts = pd.concat([self.tag_counts, counts]).groupby(
+            ['movieId', 'tag'], as_index=False
+        )['count'].sum()
+
+    def rating_columns(self, movie_ids=None):
+        """Combined-dataset rating columns for the given movies (all when None)."""
+        ratings = self.ratings if movie_ids is None else self.ratings.reindex(movie_ids)
+        std = np.sqrt(ratings['m2'] / (ratings['count'] - 1)).where(ratings['count'] > 1)
+        rating_range = self.rating_max - self.rating_min
+        return pd.DataFrame({
+            'total_ratings': ratings['count'],
+            'avg_rating': ratings['mean'],
+            'rating_std': std,
+            'min_rating': ratings['min'],
+            'max_rating': ratings['max'],
+            'avg_normalized_rating': (ratings['mean'] - self.rating_min) / rating_range,
+            'normalized_rating_std': std / rating_range,
+            'first_rating_year': ratings['first_year'],
+            'last_rating_year': ratings['last_year']
+        }, index=ratings.index)
+
+    def unique_tag_counts(self, movie_ids):
+        """Number of distinct tags per movie."""
+        return self.tag_counts.groupby('movieId')['tag'].nunique().reindex(movie_ids).fillna(0)
+
+    def save(self, state_dir=STATE_DIR):
+        """Write the state as NumPy arrays plus a CSV of tag counts."""
+        os.makedirs(state_dir, exist_ok=True)
+        np.savez(
+            os.path.join(state_dir, 'ratings.npz'),
+            movie_id=self.ratings.index.to_numpy(dtype=np.int64),
+            histogram_values=self.histogram.index.to_numpy(dtype=np.float64),
+            histogram_counts=self.histogram.to_numpy(dtype=np.int64),
+            bounds=np.array([self.lower_bound, self.upper_bound]),
+            **{column: self.ratings[column].to_numpy() for column in RATING_STATE_COLUMNS}
+        )
+        self.tag_counts.to_csv(os.path.join(state_dir, 'tag_counts.csv'), index=False)
+        logging.info(f"Saved aggregate state for {len(self.ratings)} movies to {state_dir}")
+
+    @classmethod
+    def load(cls, state_dir=STATE_DIR):
+        """Read a state written by ``save``."""
+        path = os.path.join(state_dir, 'ratings.npz')
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No aggregate state in {state_dir}; run the full pipeline first")
+
+        with np.load(path) as arrays:
+            ratings = pd.DataFrame(
+                {column: arrays[column] for column in RATING_STATE_COLUMNS},
+                index=pd.Index(arrays['movie_id'], name='movieId')
+            )
+            histogram = pd.Series(arrays['histogram_counts'], index=arrays['histogram_values'])
+            lower_bound, upper_bound = arrays['bounds']
+        tag_counts = pd.read_csv(os.path.join(state_dir, 'tag_counts.csv'), dtype={'tag': str})
+        return cls(ratings, histogram, lower_bound, upper_bound, tag_counts)
@@ -1,8 +1,15 @@
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+import argparse
 import logging
 import os
+import resource
+import time
+
+from aggregates import AggregateState, clip_bounds, merge_rating_moments, summarize_ratings
 
 # Set up logging
 logging.basicConfig(
@@ -11,16 +18,56 @@ logging.basicConfig(
     filename='data_cleaning.log'
 )
 
-def load_data():
-    """Load all datasets and display their basic information."""
+RAW_FILES = {
+    'movies': '../raw/movies.csv',
+    'ratings': '../raw/ratings.csv',
+    'tags': '../raw/tags.csv',
+    'links': '../raw/links.csv'
+}
+
+# Compact dtypes used by the streaming pipeline
+STREAM_DTYPES = {
+    'movies': {'movieId': 'int32'},
+    'ratings': {'userId': 'int32', 'movieId': 'int32', 'rating': 'float32', 'timestamp': 'int64'},
+    'tags': {'userId': 'int32', 'movieId': 'int32', 'timestamp': 'int64'},
+    'links': {'movieId': 'int32', 'imdbId': 'float64', 'tmdbId': 'float64'}
+}
+
+OUTPUT_FORMATS = ('csv', 'parquet', 'npz')
+
+# Wall time and peak memory per pipeline stage
+stage_report = []
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage and record the process peak RSS after it."""
+    start_time = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start_time
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    stage_report.append((name, elapsed, peak_mb))
+    logging.info(f"Stage {name}: {elapsed:.2f}s, peak RSS {peak_mb:.1f} MB")
+
+def log_stage_report():
+    """Log and print the per-stage timing and memory summary."""
+    lines = [f"{'stage':<28}{'seconds':>10}{'peak RSS (MB)':>16}"]
+    lines += [f"{name:<28}{elapsed:>10.2f}{peak_mb:>16.1f}" for name, elapsed, peak_mb in stage_report]
+    report = "\n".join(lines)
+    logging.info(f"Stage report:\n{report}")
+    print(report)
+
+def load_data(names=('movies', 'ratings', 'tags', 'links'), dtypes=None):
+    """Load all datasets in parallel and display their basic information."""
     logging.info("Loading datasets...")
+    dtypes = dtypes or {}
     
-    datasets = {
-        'movies': pd.read_csv("../raw/movies.csv"),
-        'ratings': pd.read_csv('../raw/ratings.csv'),
-        'tags': pd.read_csv('../raw/tags.csv'),
-        'links': pd.read_csv('../raw/links.csv')
-    }
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        futures = {
+            name: executor.submit(pd.read_csv, RAW_FILES[name], dtype=dtypes.get(name))
+            for name in names
+        }
+        datasets = {name: future.result() for name, future in futures.items()}
     
     for name, df in datasets.items():
         logging.info(f"\n{name.upper()} Dataset:")
@@ -40,7 +87,8 @@ def handle_missing_values(datasets):
         datasets['movies']['genres'] = datasets['movies']['genres'].fillna('Unknown')
     
     # Handle ratings dataset - drop rows with missing ratings
-    datasets['ratings'].dropna(subset=['rating'], inplace=True)
+    if 'ratings' in datasets:
+        datasets['ratings'].dropna(subset=['rating'], inplace=True)
     
     # Handle tags dataset - drop rows with missing tags
     datasets['tags'].dropna(subset=['tag'], inplace=True)
@@ -59,13 +107,13 @@ def remove_duplicates(datasets):
         if name == 'ratings':
             # Keep the latest rating for each user-movie pair
             df = df.sort_values('timestamp').drop_duplicates(
-                subset=['userId', 'movieId'], 
+                subset=['userId', 'movieId'],
                 keep='last'
             )
         elif name == 'tags':
             # Keep the latest tag for each user-movie pair
             df = df.sort_values('timestamp').drop_duplicates(
-                subset=['userId', 'movieId', 'tag'], 
+                subset=['userId', 'movieId', 'tag'],
                 keep='last'
             )
         else:
@@ -77,16 +125,22 @@ def remove_duplicates(datasets):
     
     return datasets
 
+def add_date_columns(df):
+    """Convert epoch-second timestamps to datetimes and add year/month/day columns."""
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+    df['year'] = df['timestamp'].dt.year
+    df['month'] = df['timestamp'].dt.month
+    df['day'] = df['timestamp'].dt.day
+    return df
+
 def convert_data_types(datasets):
     """Convert data types and handle timestamps."""
     logging.info("Converting data types...")
     
     # Convert timestamps to datetime
-    for df in [datasets['ratings'], datasets['tags']]:
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-        df['year'] = df['timestamp'].dt.year
-        df['month'] = df['timestamp'].dt.month
-        df['day'] = df['timestamp'].dt.day
+    for name in ('ratings', 'tags'):
+        if name in datasets:
+            add_date_columns(datasets[name])
     
     # Convert IDs to integers
     for name, df in datasets.items():
@@ -118,42 +172,113 @@ def handle_outliers(datasets):
     
     return datasets
 
+def encode_genres(movies):
+    """Multi-hot encode the pipe-separated genres in one vectorized pass."""
+    # Keep the columns in order of first appearance, as in earlier pipeline outputs
+    genres_list = pd.unique(movies['genres'].str.split('|').explode())
+    dummies = movies['genres'].str.get_dummies(sep='|').reindex(columns=genres_list, fill_value=0)
+    dummies.columns = [f'genre_{genre}' for genre in genres_list]
+    return pd.concat([movies, dummies.astype(int)], axis=1)
+
 def standardize_and_encode(datasets):
     """Standardize numerical features and encode categorical features."""
     logging.info("Standardizing and encoding features...")
     
     # Normalize ratings to 0-1 scale
-    ratings = datasets['ratings']
-    ratings['normalized_rating'] = (ratings['rating'] - ratings['rating'].min()) / \
-                                 (ratings['rating'].max() - ratings['rating'].min())
+    if 'ratings' in datasets:
+        ratings = datasets['ratings']
+        ratings['normalized_rating'] = (ratings['rating'] - ratings['rating'].min()) / \
+                                     (ratings['rating'].max() - ratings['rating'].min())
     
     # One-hot encode genres
-    movies = datasets['movies']
-    genres_list = movies['genres'].str.split('|').explode().unique()
-    for genre in genres_list:
-        movies[f'genre_{genre}'] = movies['genres'].str.contains(genre).astype(int)
+    datasets['movies'] = encode_genres(datasets['movies'])
     
     return datasets
 
-def extract_features(datasets):
-    """Extract and engineer new features."""
+def extract_features(datasets, rating_stats=None):
+    """
+    Extract and engineer new features.
+    
+    Per-movie rating statistics are computed from the ratings frame, or taken
+    from ``rating_stats`` when the streaming pipeline aggregated them already.
+    """
     logging.info("Extracting features...")
     
     # Extract release year from movie title
     datasets['movies']['release_year'] = datasets['movies']['title'].str.extract(r'\((\d{4})\)').astype(float)
     
     # Compute rating statistics per movie
-    rating_stats = datasets['ratings'].groupby('movieId').agg({
-        'rating': ['count', 'mean', 'std']
-    }).reset_index()
-    rating_stats.columns = ['movieId', 'rating_count', 'average_rating', 'rating_std']
+    if rating_stats is None:
+        rating_stats = datasets['ratings'].groupby('movieId').agg({
+            'rating': ['count', 'mean', 'std']
+        }).reset_index()
+        rating_stats.columns = ['movieId', 'rating_count', 'average_rating', 'rating_std']
     
     # Merge rating statistics with movies dataset
     datasets['movies'] = datasets['movies'].merge(rating_stats, on='movieId', how='left')
     
     return datasets
 
-def validate_and_save(datasets):
+def write_frame(df, base_path, formats):
+    """Write a DataFrame as CSV, Parquet and/or a NumPy archive of its numeric columns."""
+    if 'csv' in formats:
+        df.to_csv(f'{base_path}.csv', index=False)
+    if 'parquet' in formats:
+        df.to_parquet(f'{base_path}.parquet', index=False)
+    if 'npz' in formats:
+        numeric = df.select_dtypes(include=[np.number])
+        np.savez(f'{base_path}.npz', **{column: numeric[column].to_numpy() for column in numeric.columns})
+
+@contextmanager
+def chunk_writer(base_path, formats, append=False):
+    """
+    Yield a function that writes DataFrame chunks to CSV and/or Parquet outputs.
+    
+    The outputs are replaced, or extended when ``append`` is set. Parquet files
+    cannot be appended to, so an existing file is copied row group by row group
+    into a new one, which replaces it once every chunk has been written.
+    """
+    csv_path = f'{base_path}.csv'
+    parquet_path = f'{base_path}.parquet'
+    csv_columns = None
+    if 'csv' in formats and append and os.path.exists(csv_path):
+        csv_columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    parquet_writer = None
+    
+    def write(chunk):
+        nonlocal csv_columns, parquet_writer
+        if 'csv' in formats:
+            if csv_columns is None:
+                chunk.to_csv(csv_path, index=False)
+                csv_columns = chunk.columns.tolist()
+            else:
+                chunk[csv_columns].to_csv(csv_path, mode='a', header=False, index=False)
+        if 'parquet' in formats:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if parquet_writer is None:
+                existing = pq.ParquetFile(parquet_path) if append and os.path.exists(parquet_path) else None
+                schema = existing.schema_arrow if existing else pa.Schema.from_pandas(chunk, preserve_index=False)
+                parquet_writer = pq.ParquetWriter(f'{parquet_path}.tmp', schema)
+                if existing is not None:
+                    for row_group in range(existing.num_row_groups):
+                        parquet_writer.write_table(existing.read_row_group(row_group))
+            parquet_writer.write_table(
+                pa.Table.from_pandas(chunk, schema=parquet_writer.schema, preserve_index=False)
+            )
+    
+    try:
+        yield write
+    except BaseException:
+        if parquet_writer is not None:
+            parquet_writer.close()
+            os.remove(f'{parquet_path}.tmp')
+        raise
+    if parquet_writer is not None:
+        parquet_writer.close()
+        os.replace(f'{parquet_path}.tmp', parquet_path)
+
+def validate_and_save(datasets, formats=('csv',)):
     """Perform final validation and save cleaned datasets."""
     logging.info("Validating and saving cleaned datasets...")
     
@@ -167,30 +292,36 @@ def validate_and_save(datasets):
         logging.info(f"Missing values in {name} dataset: {missing}")
         
         # Save cleaned dataset
-        output_path = f'../processed/cleaned_{name}.csv'
-        df.to_csv(output_path, index=False)
-        logging.info(f"Saved cleaned {name} dataset to {output_path}")
+        output_path = f'../processed/cleaned_{name}'
+        write_frame(df, output_path, formats)
+        logging.info(f"Saved cleaned {name} dataset to {output_path} ({', '.join(formats)})")
     
     return True
 
-def combine_datasets(datasets):
-    """Combine all cleaned datasets into a single comprehensive dataset."""
+def combine_datasets(datasets, ratings_agg=None, formats=('csv',)):
+    """
+    Combine all cleaned datasets into a single comprehensive dataset.
+    
+    ``ratings_agg`` holds per-movie rating aggregates precomputed by the
+    streaming pipeline; without it they are computed from the ratings frame.
+    """
     logging.info("Combining all datasets into a single file...")
     
     # Start with movies as the base
     combined_df = datasets['movies'].copy()
     
     # Add average rating information
-    ratings_agg = datasets['ratings'].groupby('movieId').agg({
-        'rating': ['count', 'mean', 'std', 'min', 'max'],
-        'normalized_rating': ['mean', 'std'],
-        'year': ['min', 'max']  # First and last rating dates
-    }).reset_index()
-    
-    # Flatten column names
-    ratings_agg.columns = ['movieId', 'total_ratings', 'avg_rating', 'rating_std',
-                          'min_rating', 'max_rating', 'avg_normalized_rating',
-                          'normalized_rating_std', 'first_rating_year', 'last_rating_year']
+    if ratings_agg is None:
+        ratings_agg = datasets['ratings'].groupby('movieId').agg({
+            'rating': ['count', 'mean', 'std', 'min', 'max'],
+            'normalized_rating': ['mean', 'std'],
+            'year': ['min', 'max']  # First and last rating dates
+        }).reset_index()
+        
+        # Flatten column names
+        ratings_agg.columns = ['movieId', 'total_ratings', 'avg_rating', 'rating_std',
+                              'min_rating', 'max_rating', 'avg_normalized_rating',
+                              'normalized_rating_std', 'first_rating_year', 'last_rating_year']
     
     # Combine tags for each movie
     tags_agg = datasets['tags'].groupby('movieId')['tag'].agg(lambda x: '|'.join(x)).reset_index()
@@ -219,9 +350,9 @@ def combine_datasets(datasets):
                                      (combined_df['total_ratings'].max() - combined_df['total_ratings'].min())
     
     # Save the combined dataset
-    output_path = '../processed/combined_movie_data.csv'
-    combined_df.to_csv(output_path, index=False)
-    logging.info(f"Saved combined dataset to {output_path}")
+    output_path = '../processed/combined_movie_data'
+    write_frame(combined_df, output_path, formats)
+    logging.info(f"Saved combined dataset to {output_path} ({', '.join(formats)})")
     
     # Log some statistics about the combined dataset
     logging.info(f"Combined dataset shape: {combined_df.shape}")
@@ -230,28 +361,224 @@ def combine_datasets(datasets):
     
     return combined_df
 
-def main():
-    """Main function to orchestrate the data cleaning pipeline."""
-    logging.info("Starting data cleaning pipeline...")
+def rating_histogram(chunk_size):
+    """Count each distinct rating value in one pass over the rating column."""
+    counts = pd.Series(dtype='int64')
+    for chunk in pd.read_csv(RAW_FILES['ratings'], usecols=['rating'],
+                             dtype={'rating': 'float32'}, chunksize=chunk_size):
+        counts = counts.add(chunk['rating'].dropna().value_counts(), fill_value=0)
+    return counts.sort_index()
+
+def clean_ratings_chunk(chunk, state):
+    """Drop, deduplicate, clip and date-convert a ratings chunk with the state's constants."""
+    chunk = chunk.dropna(subset=['rating'])
+    chunk = chunk.sort_values('timestamp').drop_duplicates(subset=['userId', 'movieId'], keep='last')
+    chunk['rating'] = chunk['rating'].clip(state.lower_bound, state.upper_bound)
+    add_date_columns(chunk)
+    chunk['normalized_rating'] = (
+        (chunk['rating'] - state.rating_min) / (state.rating_max - state.rating_min)
+    ).astype('float32')
+    return chunk
+
+def rating_frames(state):
+    """Per-movie rating frames for extract_features and combine_datasets."""
+    columns = state.rating_columns()
+    movie_ids = columns.index.astype(int)
+    rating_stats = pd.DataFrame({
+        'movieId': movie_ids,
+        'rating_count': columns['total_ratings'].to_numpy(),
+        'average_rating': columns['avg_rating'].to_numpy(),
+        'rating_std': columns['rating_std'].to_numpy()
+    })
+    ratings_agg = columns.reset_index(drop=True)
+    ratings_agg.insert(0, 'movieId', movie_ids)
+    return rating_stats, ratings_agg
+
+def stream_ratings(chunk_size, formats, tags):
+    """
+    Clean ratings chunk by chunk and aggregate them per movie.
+    
+    Outlier bounds need global quartiles, which come from a first pass that
+    only builds a histogram of rating values. The second pass clips, converts
+    and aggregates each chunk, and appends it to the cleaned ratings outputs.
+    Duplicate user-movie ratings are only removed within a chunk: MovieLens
+    ships one rating per pair, so this matches the in-memory pipeline there.
+    
+    Returns:
+        The AggregateState holding the per-movie rating aggregates
+    """
+    with stage('ratings: histogram'):
+        counts = rating_histogram(chunk_size)
+        lower_bound, upper_bound = clip_bounds(counts)
+        state = AggregateState.from_frames(None, counts, lower_bound, upper_bound, tags)
+    
+    with stage('ratings: aggregate'), chunk_writer('../processed/cleaned_ratings', formats) as write:
+        summary = None
+        for chunk in pd.read_csv(RAW_FILES['ratings'], dtype=STREAM_DTYPES['ratings'], chunksize=chunk_size):
+            chunk = clean_ratings_chunk(chunk, state)
+            chunk_summary = summarize_ratings(chunk)
+            summary = chunk_summary if summary is None else merge_rating_moments(summary, chunk_summary)
+            write(chunk)
+    
+    state.ratings = summary
+    return state
+
+def run_streaming(chunk_size, formats):
+    """Run the pipeline without ever holding the full ratings table in memory."""
+    with stage('load'):
+        datasets = load_data(names=('movies', 'tags', 'links'), dtypes=STREAM_DTYPES)
+    
+    with stage('clean'):
+        datasets = handle_missing_values(datasets)
+        datasets = remove_duplicates(datasets)
+        datasets = convert_data_types(datasets)
+        datasets = standardize_and_encode(datasets)
+    
+    state = stream_ratings(chunk_size, formats, datasets['tags'])
+    rating_stats, ratings_agg = rating_frames(state)
+    
+    with stage('extract features'):
+        datasets = extract_features(datasets, rating_stats)
     
-    # Load data
-    datasets = load_data()
+    with stage('save cleaned'):
+        validate_and_save(datasets, formats)
+        state.save()
+    
+    with stage('combine'):
+        combine_datasets(datasets, ratings_agg, formats)
+
+def run_in_memory(formats):
+    """Run the original pipeline with every dataset loaded whole."""
+    with stage('load'):
+        datasets = load_data()
     
     # Apply cleaning steps
-    datasets = handle_missing_values(datasets)
-    datasets = remove_duplicates(datasets)
-    datasets = convert_data_types(datasets)
-    datasets = handle_outliers(datasets)
-    datasets = standardize_and_encode(datasets)
-    datasets = extract_features(datasets)
+    with stage('clean'):
+        datasets = handle_missing_values(datasets)
+        datasets = remove_duplicates(datasets)
+        histogram = datasets['ratings']['rating'].value_counts().sort_index()
+        datasets = convert_data_types(datasets)
+        datasets = handle_outliers(datasets)
+        datasets = standardize_and_encode(datasets)
+    
+    with stage('extract features'):
+        datasets = extract_features(datasets)
     
     # Save individual cleaned datasets
-    validate_and_save(datasets)
+    with stage('save cleaned'):
+        validate_and_save(datasets, formats)
+        lower_bound, upper_bound = clip_bounds(histogram)
+        AggregateState.from_frames(
+            summarize_ratings(datasets['ratings']), histogram, lower_bound, upper_bound, datasets['tags']
+        ).save()
     
     # Create and save combined dataset
-    combined_df = combine_datasets(datasets)
+    with stage('combine'):
+        combine_datasets(datasets, formats=formats)
+
+def run_update(ratings_delta, tags_delta, formats):
+    """
+    Fold delta files of new ratings and tags into the persisted aggregates.
+    
+    Only the rows of movies touched by the deltas are recomputed in the
+    combined dataset; ``rating_popularity`` is renormalized for every row
+    because it depends on the global rating-count range. The cleaned deltas
+    are appended to the cleaned ratings and tags outputs, which the user
+    histories and the collaborative models are built from. Deltas are treated
+    as append-only: a re-rating of an already rated user-movie pair is counted
+    as a new rating until the next full rebuild.
+    """
+    with stage('load state'):
+        state = AggregateState.load()
+        combined_df = pd.read_csv('../processed/combined_movie_data.csv').set_index('movieId', drop=False)
+        affected = set()
+    
+    ratings = None
+    if ratings_delta:
+        with stage('fold ratings'):
+            ratings = pd.read_csv(ratings_delta, dtype=STREAM_DTYPES['ratings'])
+            histogram = ratings['rating'].dropna().value_counts()
+            ratings = clean_ratings_chunk(ratings, state)
+            state.fold_ratings(summarize_ratings(ratings), histogram)
+            affected.update(ratings['movieId'].unique().tolist())
+    
+    tags = None
+    new_tags = None
+    if tags_delta:
+        with stage('fold tags'):
+            tags = pd.read_csv(tags_delta, dtype=STREAM_DTYPES['tags']).dropna(subset=['tag'])
+            tags = tags.sort_values('timestamp').drop_duplicates(subset=['userId', 'movieId', 'tag'], keep='last')
+            add_date_columns(tags)
+            state.fold_tags(tags)
+            new_tags = tags.groupby('movieId')['tag'].agg(lambda x: '|'.join(x))
+            affected.update(new_tags.index.tolist())
+    
+    with stage('re-emit rows'):
+        unknown = sorted(affected - set(combined_df.index))
+        if unknown:
+            logging.warning(f"Ignoring {len(unknown)} movies missing from the combined dataset: {unknown[:10]}")
+        movie_ids = sorted(affected - set(unknown))
+        
+        columns = state.rating_columns(movie_ids)
+        for column in columns.columns:
+            target = {'rating_std': 'rating_std_y'}.get(column, column)
+            combined_df.loc[movie_ids, target] = columns[column].to_numpy()
+        combined_df.loc[movie_ids, 'rating_count'] = columns['total_ratings'].to_numpy()
+        combined_df.loc[movie_ids, 'average_rating'] = columns['avg_rating'].to_numpy()
+        combined_df.loc[movie_ids, 'rating_std_x'] = columns['rating_std'].to_numpy()
+        
+        if new_tags is not None:
+            tagged = [movie_id for movie_id in new_tags.index if movie_id in combined_df.index]
+            old_tags = combined_df.loc[tagged, 'all_tags']
+            combined_df.loc[tagged, 'all_tags'] = np.where(
+                old_tags == 'no_tags', new_tags[tagged], old_tags + '|' + new_tags[tagged]
+            )
+        combined_df.loc[movie_ids, 'num_unique_tags'] = state.unique_tag_counts(movie_ids).to_numpy()
+        combined_df.loc[movie_ids, 'has_tags'] = (combined_df.loc[movie_ids, 'num_unique_tags'] > 0).astype(int)
+        
+        total = combined_df['total_ratings']
+        combined_df['rating_popularity'] = (total - total.min()) / (total.max() - total.min())
+        
+        write_frame(combined_df.reset_index(drop=True), '../processed/combined_movie_data', formats)
+        pd.DataFrame({'movieId': movie_ids}).to_csv('../processed/affected_movies.csv', index=False)
+        logging.info(f"Re-emitted {len(movie_ids)} affected movies")
+    
+    with stage('append cleaned'):
+        for name, delta in (('ratings', ratings), ('tags', tags)):
+            if delta is not None:
+                with chunk_writer(f'../processed/cleaned_{name}', formats, append=True) as write:
+                    write(delta)
+                logging.info(f"Appended {len(delta)} rows to cleaned_{name}")
+        state.save()
+
+def main():
+    """Main function to orchestrate the data cleaning pipeline."""
+    parser = argparse.ArgumentParser(description="Clean and combine the MovieLens datasets")
+    parser.add_argument('--stream', action='store_true',
+                        help="read ratings in chunks with compact dtypes (for full-size MovieLens)")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="ratings rows per chunk")
+    parser.add_argument('--ratings-delta', help="fold a file of new ratings into the existing outputs")
+    parser.add_argument('--tags-delta', help="fold a file of new tags into the existing outputs")
+    parser.add_argument('--formats', default='csv',
+                        help=f"comma-separated output formats: {', '.join(OUTPUT_FORMATS)}")
+    args = parser.parse_args()
+    
+    formats = tuple(fmt.strip() for fmt in args.formats.split(',') if fmt.strip())
+    unknown = set(formats) - set(OUTPUT_FORMATS)
+    if unknown or not formats:
+        parser.error(f"unknown output formats: {sorted(unknown)}")
+    
+    logging.info("Starting data cleaning pipeline...")
+    
+    if args.ratings_delta or args.tags_delta:
+        run_update(args.ratings_delta, args.tags_delta, formats)
+    elif args.stream:
+        run_streaming(args.chunk_size, formats)
+    else:
+        run_in_memory(formats)
     
+    log_stage_report()
     logging.info("Data cleaning pipeline completed successfully!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
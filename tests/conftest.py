@@ -0,0 +1,12 @@
+"""Small in-memory fixtures shared by the tests."""
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def features() -> np.ndarray:
+    """A random feature matrix with one zero row, like a movie without tags."""
+    rng = np.random.default_rng(0)
+    features = rng.standard_normal((200, 16)).astype(np.float32)
+    features[17] = 0.0
+    return features
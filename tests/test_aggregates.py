@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data" / "processed"))
+
+from aggregates import AggregateState, clip_bounds, merge_rating_moments, summarize_ratings  # noqa: E402
+
+
+def random_ratings(rng, n, movie_ids):
+    return pd.DataFrame({
+        "movieId": rng.choice(movie_ids, n),
+        "rating": rng.choice(np.arange(1, 11) / 2, n),
+        "year": rng.integers(1996, 2024, n),
+    })
+
+
+def test_folding_a_delta_matches_summarizing_everything():
+    rng = np.random.default_rng(0)
+    history = random_ratings(rng, 500, np.arange(1, 30))
+    # Movie 40 only appears in the delta and movie 41 gets a single rating
+    delta = pd.concat([random_ratings(rng, 80, np.arange(20, 41)),
+                       pd.DataFrame({"movieId": [41], "rating": [3.0], "year": [2023]})])
+
+    histogram = history["rating"].value_counts().sort_index()
+    state = AggregateState.from_frames(summarize_ratings(history), histogram, *clip_bounds(histogram),
+                                       pd.DataFrame(columns=["movieId", "tag"]))
+    state.fold_ratings(summarize_ratings(delta), delta["rating"].value_counts())
+
+    expected = summarize_ratings(pd.concat([history, delta]))
+    pd.testing.assert_frame_equal(state.ratings.sort_index(), expected, check_names=False)
+    assert state.histogram.sum() == len(history) + len(delta)
+
+
+def test_merging_chunk_summaries_matches_one_pass():
+    rng = np.random.default_rng(1)
+    ratings = random_ratings(rng, 1000, np.arange(1, 50))
+    chunks = [summarize_ratings(ratings.iloc[start:start + 150]) for start in range(0, len(ratings), 150)]
+
+    merged = chunks[0]
+    for chunk in chunks[1:]:
+        merged = merge_rating_moments(merged, chunk)
+
+    pd.testing.assert_frame_equal(merged.sort_index(), summarize_ratings(ratings), check_names=False)
@@ -0,0 +1,38 @@
+import numpy as np
+import scipy.sparse as sp
+
+from app.models.factors import FactorModel
+from app.models.users import UserHistory
+from app.training.als import initial_factors, train_als
+
+PARAMS = {"implicit": False, "alpha": 1.0, "reg": 0.1, "global_mean": 3.0}
+
+
+def random_matrix(n_users: int = 30, n_items: int = 20) -> sp.csr_matrix:
+    rng = np.random.default_rng(2)
+    matrix = sp.random(n_users, n_items, density=0.3, format="csr", random_state=rng)
+    matrix.data = np.ceil(matrix.data * 10) / 2
+    return matrix
+
+
+def test_chunk_budget_does_not_change_the_factors():
+    ratings = random_matrix()
+    rng = np.random.default_rng(3)
+    users, items = rng.normal(0, 0.01, (30, 4)), rng.normal(0, 0.01, (20, 4))
+
+    # A zero budget solves one row per task
+    expected = train_als(ratings, users, items, PARAMS, 2, workers=1)
+    factors = train_als(ratings, users, items, PARAMS, 2, workers=1, max_chunk_mb=0)
+    for result, reference in zip(factors, expected):
+        np.testing.assert_allclose(result, reference)
+
+
+def test_warm_start_from_a_model_without_users():
+    history = UserHistory.build(np.array([5, 5, 9]), np.array([10, 20, 20]), np.array([4.0, 3.0, 5.0]),
+                                np.array([10, 20, 30]))
+    previous = FactorModel(np.array([], dtype=np.int64), np.zeros((0, 4)), np.ones((3, 4)), version="v1")
+
+    user_factors, item_factors = initial_factors(history, 3, 4, seed=0, previous=previous)
+
+    assert user_factors.shape == (2, 4)
+    np.testing.assert_array_equal(item_factors, previous.item_factors)
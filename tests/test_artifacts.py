@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.models.artifacts import MANIFEST_FILE, ArtifactError, read_bundle, write_bundle
+
+
+def test_round_trip_records_shapes_and_checksums(tmp_path):
+    arrays = {"features": np.arange(12, dtype=np.float32).reshape(3, 4)}
+    manifest = write_bundle(tmp_path, arrays, {"vocabulary": {"comedy": 0}}, params={"k": 3})
+
+    entry = manifest["arrays"]["features"]
+    assert entry["shape"] == [3, 4] and entry["dtype"] == "<f4" and len(entry["sha256"]) == 64
+
+    bundle = read_bundle(tmp_path, verify_checksums=True)
+    assert bundle.version == manifest["version"]
+    assert bundle.params == {"k": 3}
+    np.testing.assert_array_equal(bundle.get("features"), arrays["features"])
+    assert bundle.get("vocabulary") == {"comedy": 0}
+    assert bundle.get("missing") is None
+
+
+def test_version_is_derived_from_the_contents(tmp_path):
+    first = write_bundle(tmp_path / "a", {"x": np.zeros(3)})
+    second = write_bundle(tmp_path / "b", {"x": np.zeros(3)})
+    third = write_bundle(tmp_path / "c", {"x": np.ones(3)})
+    assert first["version"] == second["version"] != third["version"]
+
+
+def test_corrupt_file_fails_checksum_verification(tmp_path):
+    write_bundle(tmp_path, {"x": np.zeros(64, dtype=np.float32)})
+    with open(tmp_path / "x.npy", "r+b") as f:
+        f.seek(-4, 2)
+        f.write(b"\x01\x02\x03\x04")
+
+    read_bundle(tmp_path)
+    with pytest.raises(ArtifactError, match="Checksum mismatch"):
+        read_bundle(tmp_path, verify_checksums=True)
+
+
+def test_manifest_mismatch_and_missing_files_are_rejected(tmp_path):
+    write_bundle(tmp_path, {"x": np.zeros((2, 2), dtype=np.float32)})
+    manifest = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    manifest["arrays"]["x"]["shape"] = [4]
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps(manifest))
+    with pytest.raises(ArtifactError, match="manifest says"):
+        read_bundle(tmp_path)
+
+    (tmp_path / "x.npy").unlink()
+    with pytest.raises(ArtifactError, match="not found"):
+        read_bundle(tmp_path)
+    with pytest.raises(ArtifactError, match="Manifest not found"):
+        read_bundle(tmp_path / "empty")
@@ -0,0 +1,93 @@
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.models.index import FlatIndex, NeighborIndex
+from app.services.batcher import QueryBatcher
+
+
+class CountingIndex(NeighborIndex):
+    """Wraps an index and records the row count of every query it runs."""
+
+    def __init__(self, index: NeighborIndex):
+        self.index = index
+        self.calls = []
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def query(self, vectors, n_neighbors):
+        self.calls.append((len(vectors), n_neighbors))
+        return self.index.query(vectors, n_neighbors)
+
+
+async def run_queries(batcher, index, queries):
+    try:
+        return await asyncio.gather(*(batcher.query(index, vectors, k) for vectors, k in queries))
+    finally:
+        batcher.shutdown()
+
+
+def test_concurrent_queries_share_one_search(features):
+    flat = FlatIndex.build(features)
+    index = CountingIndex(flat)
+    queries = [(features[[0]], 3), (features[[5, 6]], 10), (features[9], 1)]
+
+    results = asyncio.run(run_queries(QueryBatcher(0.05, 64, 1024, 1), index, queries))
+
+    assert index.calls == [(4, 10)]
+    for (vectors, k), (distances, indices) in zip(queries, results):
+        expected_distances, expected_indices = flat.query(vectors, k)
+        assert indices.shape == expected_indices.shape
+        np.testing.assert_array_equal(indices, expected_indices)
+        np.testing.assert_allclose(distances, expected_distances)
+
+
+def test_full_batches_flush_without_waiting(features):
+    index = CountingIndex(FlatIndex.build(features))
+    queries = [(features[[i]], 2) for i in range(5)]
+    asyncio.run(run_queries(QueryBatcher(10.0, 2, 1024, 1), index, queries))
+    assert [rows for rows, _ in index.calls] == [2, 2, 1]
+
+
+def test_search_errors_reach_every_caller(features):
+    class BrokenIndex(CountingIndex):
+        def query(self, vectors, n_neighbors):
+            raise RuntimeError("index went away")
+
+    async def main():
+        batcher = QueryBatcher(0.01, 64, 1024, 1)
+        try:
+            return await asyncio.gather(*(batcher.query(BrokenIndex(None), features[[i]], 2) for i in range(3)),
+                                        return_exceptions=True)
+        finally:
+            batcher.shutdown()
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_queue_limit_rejects_with_503(features):
+    batcher = QueryBatcher(0.01, 64, 2, 1)
+    index = FlatIndex.build(features)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run_queries(batcher, index, [(features[[0, 1]], 2), (features[[2]], 2)]))
+    assert error.value.status_code == 503 and batcher.rejected == 1
+
+
+def test_batches_that_cannot_be_stacked_fail_every_caller(features):
+    async def main():
+        batcher = QueryBatcher(0.01, 64, 1024, 1)
+        index = FlatIndex.build(features)
+        try:
+            return await asyncio.wait_for(asyncio.gather(
+                batcher.query(index, features[[0]], 2), batcher.query(index, features[[1], :8], 2),
+                return_exceptions=True
+            ), timeout=5)
+        finally:
+            batcher.shutdown()
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from app.services.cache import ENTRY_OVERHEAD, TopKCache
+
+
+def test_longer_lists_answer_shorter_requests():
+    cache = TopKCache(10, 1 << 20)
+    cache.put(("v", 1, "content"), 5, np.arange(5))
+    np.testing.assert_array_equal(cache.get(("v", 1, "content"), 3), [0, 1, 2])
+    assert cache.get(("v", 1, "content"), 6) is None
+    assert cache.get(("v", 2, "content"), 3) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_short_lists_hold_every_neighbor():
+    cache = TopKCache(10, 1 << 20)
+    cache.put(("v", 1, "collaborative"), 10, np.arange(4))
+    np.testing.assert_array_equal(cache.get(("v", 1, "collaborative"), 50), np.arange(4))
+
+
+def test_smaller_results_do_not_replace_larger_ones():
+    cache = TopKCache(10, 1 << 20)
+    cache.put(("v", 1, "content"), 8, np.arange(8))
+    cache.put(("v", 1, "content"), 2, np.array([7, 6]))
+    np.testing.assert_array_equal(cache.get(("v", 1, "content"), 2), [0, 1])
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.cache.time.monotonic", lambda: now[0])
+    cache = TopKCache(10, 1 << 20, ttl=60)
+    cache.put(("v", 1, "content"), 3, np.arange(3))
+    now[0] += 59
+    assert cache.get(("v", 1, "content"), 3) is not None
+    now[0] += 2
+    assert cache.get(("v", 1, "content"), 3) is None
+    assert cache.expirations == 1 and cache.stats()["entries"] == 0
+
+
+def test_byte_cap_evicts_least_recently_used():
+    entry_bytes = 10 * 4 + ENTRY_OVERHEAD
+    cache = TopKCache(100, 2 * entry_bytes)
+    for movie in range(3):
+        cache.put(("v", movie, "content"), 10, np.arange(10))
+        if movie == 1:
+            cache.get(("v", 0, "content"), 10)
+    assert cache.get(("v", 1, "content"), 10) is None
+    assert cache.get(("v", 0, "content"), 10) is not None
+    assert cache.stats()["bytes"] == 2 * entry_bytes and cache.evictions == 1
+
+    cache.put(("v", 9, "content"), 1000, np.arange(1000))
+    assert cache.get(("v", 9, "content"), 1000) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TopKCache(0, 1 << 20)
+    cache.put(("v", 1, "content"), 3, np.arange(3))
+    assert cache.get(("v", 1, "content"), 3) is None
@@ -0,0 +1,152 @@
+import asyncio
+import socketserver
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.cache import RespBackend, TopKCache
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """In-process stand-in for a Redis server that speaks enough RESP for ``RespBackend``."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RespHandler)
+        self.store = {}
+        self.commands = []
+        self.connections = 0
+        self.drop_next = False
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.server_address[1]}/2"
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                parts.append(self.rfile.read(length + 2)[:-2])
+            self.server.commands.append(parts)
+            if self.server.drop_next:
+                self.server.drop_next = False
+                return
+            self.wfile.write(self.reply(parts))
+
+    def reply(self, parts):
+        command = parts[0].upper()
+        if command == b"GET":
+            value = self.server.store.get(parts[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            self.server.store[parts[1]] = parts[2]
+            return b"+OK\r\n"
+        if command == b"SELECT":
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def server():
+    server = RespServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_and_set_with_expiry(server):
+    backend = RespBackend(server.url, timeout=1.0)
+    backend.set("key", b"\x00\x01", 1.5)
+    assert backend.get("key") == b"\x00\x01"
+    assert backend.get("missing") is None
+    assert server.commands[0] == [b"SELECT", b"2"]
+    assert server.commands[1] == [b"SET", b"key", b"\x00\x01", b"PX", b"1500"]
+    backend.close()
+
+
+def test_server_errors_are_raised(server):
+    backend = RespBackend(server.url, timeout=1.0)
+    with pytest.raises(RuntimeError, match="unknown command"):
+        backend.command(b"FLUSHALL")
+    backend.close()
+
+
+def test_reconnects_after_a_dropped_connection(server):
+    backend = RespBackend(server.url, timeout=1.0)
+    backend.set("key", b"value", 0)
+    server.drop_next = True
+    with pytest.raises(ConnectionError):
+        backend.get("key")
+    assert backend.get("key") == b"value"
+    assert server.connections == 2
+    backend.close()
+
+
+def test_cache_shares_results_through_the_backend(server):
+    writer = TopKCache(10, 1 << 20, 60, RespBackend(server.url, timeout=1.0))
+    reader = TopKCache(10, 1 << 20, 60, RespBackend(server.url, timeout=1.0))
+    writer.put(("v", 1, "content"), 5, np.arange(5))
+
+    np.testing.assert_array_equal(reader.get(("v", 1, "content"), 3), [0, 1, 2])
+    assert reader.backend_hits == 1
+    # The hit is kept locally, so the next lookup does not reach the backend
+    n_commands = len(server.commands)
+    assert reader.get(("v", 1, "content"), 5) is not None
+    assert len(server.commands) == n_commands
+
+
+@pytest.mark.parametrize("value", [b"", b"\x01\x02\x03", np.array([-1, 4], dtype=np.int32).tobytes()])
+def test_malformed_values_are_misses(server, value):
+    cache = TopKCache(10, 1 << 20, 60, RespBackend(server.url, timeout=1.0))
+    server.store[b"movie-recs:v:1:content"] = value
+    assert cache.get(("v", 1, "content"), 1) is None
+    assert cache.misses == 1 and cache.backend_errors == 0
+
+
+def test_backend_is_skipped_until_the_retry_interval_passes(server, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.cache.time.monotonic", lambda: now[0])
+    port = server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    backend = RespBackend(f"redis://127.0.0.1:{port}", timeout=0.2)
+    cache = TopKCache(10, 1 << 20, 0, backend, retry_interval=5.0)
+
+    assert cache.get(("v", 1, "content"), 3) is None
+    assert cache.backend_errors == 1
+    cache.put(("v", 2, "content"), 3, np.arange(3))
+    assert cache.get(("v", 3, "content"), 3) is None
+    assert cache.backend_errors == 1
+
+    now[0] += 5.0
+    assert cache.get(("v", 3, "content"), 3) is None
+    assert cache.backend_errors == 2
+
+
+def test_async_lookups_run_backend_io_off_the_loop(server):
+    cache = TopKCache(10, 1 << 20, 60, RespBackend(server.url, timeout=1.0))
+    threads = []
+    command = cache.backend.command
+    cache.backend.command = lambda *parts: threads.append(threading.current_thread()) or command(*parts)
+
+    async def main():
+        await cache.put_many_async({("v", 1, "content"): np.arange(4)}, 4)
+        cache.clear()
+        found = await cache.get_many_async([("v", 1, "content"), ("v", 2, "content")], 2)
+        return found, threading.current_thread()
+
+    found, loop_thread = asyncio.run(main())
+    assert found[0].tolist() == [0, 1] and found[1] is None
+    assert threads and loop_thread not in threads
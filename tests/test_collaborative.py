@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from app.training.collaborative import build_item_matrix, build_neighbor_graph, top_k_similarities
+
+
+def random_ratings(n_users: int = 40, n_items: int = 30, n_ratings: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "userId": rng.integers(0, n_users, n_ratings),
+        "movieId": rng.integers(0, n_items, n_ratings) + 100,
+        "rating": rng.integers(1, 11, n_ratings) / 2.0,
+    })
+
+
+def test_blocks_match_a_dense_top_k():
+    ratings = random_ratings()
+    matrix = build_item_matrix(ratings["userId"].to_numpy(), ratings["movieId"].to_numpy() - 100,
+                               ratings["rating"].to_numpy(), 30)
+    dense = (matrix @ matrix.T).toarray()
+    np.fill_diagonal(dense, -np.inf)
+
+    indptr, indices, similarities = top_k_similarities(matrix, 5, block_size=7)
+
+    for row in range(30):
+        neighbors = slice(indptr[row], indptr[row + 1])
+        expected = np.sort(dense[row][dense[row] > 0])[::-1][:5]
+        np.testing.assert_allclose(similarities[neighbors], expected, rtol=1e-5)
+        np.testing.assert_allclose(dense[row, indices[neighbors]], expected, rtol=1e-5)
+        assert row not in indices[neighbors]
+
+
+def test_block_size_follows_the_memory_budget():
+    graph = build_neighbor_graph(random_ratings(), np.arange(100, 130), k=5, max_block_mb=1)
+    assert graph.params["block_size"] == (1 << 20) // (16 * 30)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from app.training.evaluate import load_ratings, ranking_metrics
+
+
+def test_ranking_metrics_on_a_hand_computed_example():
+    # User 0 has relevant {1, 4} and hits at ranks 1 and 3; user 1 has relevant {2} and no hit
+    recommendations = np.array([[1, 0, 4], [3, 5, -1]])
+    relevant_indptr = np.array([0, 2, 3])
+    relevant_items = np.array([1, 4, 2])
+
+    metrics = ranking_metrics(recommendations, relevant_indptr, relevant_items, n_items=10)
+
+    ndcg_user0 = (1 + 1 / np.log2(4)) / (1 + 1 / np.log2(3))
+    assert metrics["precision"] == pytest.approx((2 / 3 + 0) / 2)
+    assert metrics["recall"] == pytest.approx((1 + 0) / 2)
+    assert metrics["map"] == pytest.approx((1 + 2 / 3) / 2 / 2)
+    assert metrics["ndcg"] == pytest.approx(ndcg_user0 / 2)
+    assert metrics["coverage"] == pytest.approx(5 / 10)
+
+
+def test_perfect_recommendations_score_one():
+    recommendations = np.array([[2, 5], [7, 1]])
+    metrics = ranking_metrics(recommendations, np.array([0, 2, 4]), np.array([2, 5, 1, 7]), n_items=8)
+    assert metrics["precision"] == metrics["recall"] == metrics["map"] == pytest.approx(1.0)
+    assert metrics["ndcg"] == pytest.approx(1.0)
+
+
+def test_load_ratings_converts_date_strings_to_epoch_seconds(tmp_path):
+    path = tmp_path / "cleaned_ratings.csv"
+    path.write_text("userId,movieId,rating,timestamp\n"
+                    "1,10,4.0,2000-07-30 18:45:03\n"
+                    "2,20,3.5,1970-01-01 00:00:01\n")
+    ratings = load_ratings(path)
+    assert ratings["timestamp"].tolist() == [964982703, 1]
+    assert ratings["timestamp"].dtype == np.int64
+
+
+def test_load_ratings_keeps_numeric_timestamps(tmp_path):
+    path = tmp_path / "ratings.csv"
+    path.write_text("userId,movieId,rating,timestamp\n1,10,4.0,964982703\n")
+    assert load_ratings(path)["timestamp"].tolist() == [964982703]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from app.models.filters import FilterIndex
+
+GENRES = ["Action", "Comedy", "Drama"]
+# Bit i set when the movie has GENRES[i]
+GENRE_MASK = np.array([0b001, 0b011, 0b010, 0b110, 0b000, 0b111], dtype=np.uint32)
+YEARS = np.array([1995, 2001, 0, 1999, 2010, 2001])
+RATINGS = np.array([10, 0, 5, 50, 3, 7])
+
+
+@pytest.fixture
+def filter_index() -> FilterIndex:
+    return FilterIndex(GENRES, GENRE_MASK, {"release_year": YEARS, "total_ratings": RATINGS})
+
+
+def test_no_filter_gives_no_mask(filter_index):
+    assert filter_index.mask() is None
+
+
+def test_genres_must_all_match(filter_index):
+    np.testing.assert_array_equal(np.flatnonzero(filter_index.mask(["Comedy"])), [1, 2, 3, 5])
+    np.testing.assert_array_equal(np.flatnonzero(filter_index.mask(["Action", "Comedy"])), [1, 5])
+
+
+def test_year_range_is_inclusive_and_skips_unknown_years(filter_index):
+    np.testing.assert_array_equal(np.flatnonzero(filter_index.mask(year_min=1999, year_max=2001)), [1, 3, 5])
+    np.testing.assert_array_equal(np.flatnonzero(filter_index.mask(year_max=1999)), [0, 3])
+
+
+def test_filters_combine(filter_index):
+    mask = filter_index.mask(filter_index.parse_genres("comedy"), year_min=2000, min_ratings=5)
+    np.testing.assert_array_equal(np.flatnonzero(mask), [5])
+
+
+def test_unknown_genres_and_columns(filter_index):
+    with pytest.raises(ValueError, match="Unknown genres"):
+        filter_index.parse_genres("Comedy,Nope")
+    with pytest.raises(ValueError, match="no total_ratings column"):
+        FilterIndex(GENRES, GENRE_MASK, {}).mask(min_ratings=1)
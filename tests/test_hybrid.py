@@ -0,0 +1,25 @@
+import numpy as np
+
+from app.services.hybrid import fuse_candidates
+
+WEIGHTS = {"content": 0.5, "collaborative": 0.4, "prior": 0.1}
+
+
+def test_scores_are_weighted_sums_over_the_union():
+    indices, scores = fuse_candidates(
+        np.array([1, 2]), np.array([0.9, 0.5]),
+        np.array([2, 3]), np.array([0.8, 0.6]),
+        np.array([0.0, 1.0, 0.5, 0.0]), WEIGHTS, 10
+    )
+    assert indices.tolist() == [2, 1, 3]
+    np.testing.assert_allclose(scores["score"], [0.25 + 0.32 + 0.05, 0.45 + 0.1, 0.24], rtol=1e-6)
+    np.testing.assert_allclose(scores["content"], [0.5, 0.9, 0.0])
+    np.testing.assert_allclose(scores["collaborative"], [0.8, 0.0, 0.6])
+
+
+def test_top_n_without_prior():
+    indices, scores = fuse_candidates(
+        np.arange(5), np.linspace(1.0, 0.2, 5), np.empty(0, dtype=np.int64), np.empty(0), None, WEIGHTS, 2
+    )
+    assert indices.tolist() == [0, 1]
+    assert scores["prior"].tolist() == [0.0, 0.0]
@@ -0,0 +1,28 @@
+import numpy as np
+
+from app.models.ids import IdIndex, IdLookup
+
+
+def test_dense_lookup():
+    lookup = IdLookup(np.array([5, 1, 0, 9, 1]))
+    assert lookup.dense and lookup.n_ids == 3 and lookup.duplicates == 1
+    assert [lookup.position(value) for value in (5, 1, 9)] == [0, 1, 3]
+    assert [lookup.position(value) for value in (0, 2, 10, -1, 10 ** 9)] == [None] * 5
+
+
+def test_sorted_lookup_for_sparse_ids():
+    ids = np.array([114709, 0, 2571, 133093, 114709])
+    lookup = IdLookup(ids)
+    assert not lookup.dense
+    assert [lookup.position(value) for value in (114709, 2571, 133093)] == [0, 2, 3]
+    assert [lookup.position(value) for value in (0, 1, 114710, 10 ** 9)] == [None] * 4
+    assert lookup.memory_usage() == lookup.keys.nbytes + lookup.rows.nbytes
+
+
+def test_index_over_several_id_types():
+    index = IdIndex({"id": np.array([1, 2, 3]), "imdb": np.array([114709, 113497, 0])})
+    assert index.position("id", 3) == 2
+    assert index.position("imdb", 113497) == 1
+    assert index.position("imdb", 0) is None
+    assert index.describe()["id"]["layout"] == "dense"
+    assert index.describe()["imdb"]["layout"] == "sorted"
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from app.models.index import ExactIndex, FlatIndex, recall_at_k
+from app.models.shards import ShardedIndex
+from app.services.metrics import Histogram
+
+
+def test_flat_index_matches_exact_search(features):
+    flat, exact = FlatIndex.build(features, block_size=64), ExactIndex.build(features)
+    distances, _ = flat.query(features[:20], 10)
+    expected_distances, _ = exact.query(features[:20], 10)
+    np.testing.assert_allclose(distances, expected_distances, atol=1e-5)
+    assert recall_at_k(flat, exact, features[:20], 10)["recall"] == 1.0
+
+
+@pytest.mark.parametrize("dtype, min_recall", [("float16", 0.99), ("int8", 0.9)])
+def test_quantized_flat_index_keeps_recall(features, dtype, min_recall):
+    flat = FlatIndex.build(features, dtype)
+    assert flat.dtype == dtype
+    assert recall_at_k(flat, ExactIndex.build(features), features[:50], 10)["recall"] >= min_recall
+
+
+def test_sharded_index_equals_flat_index(features):
+    flat = FlatIndex.build(features, block_size=32)
+    latency = Histogram("shard_seconds", "", ("shard",))
+    sharded = ShardedIndex(flat, 3, latency)
+    try:
+        distances, indices = sharded.query(features[:25], 12)
+        expected_distances, expected_indices = flat.query(features[:25], 12)
+        np.testing.assert_array_equal(indices, expected_indices)
+        np.testing.assert_allclose(distances, expected_distances)
+        assert sharded.bounds.tolist() == [0, 66, 133, 200]
+        assert sorted(key[0] for key in latency._values) == ["0", "1", "2", "merge"]
+    finally:
+        sharded.close()
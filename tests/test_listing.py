@@ -0,0 +1,87 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.listing import MovieListing, etag_matches
+
+TITLES = [f"Movie {i}" for i in range(10)]
+
+
+def make_listing(version: str = "v1", **kwargs) -> MovieListing:
+    return MovieListing({
+        "index": lambda start, stop: list(range(start, stop)),
+        "movieId": lambda start, stop: [100 + i for i in range(start, stop)],
+        "title": lambda start, stop: TITLES[start:stop],
+    }, len(TITLES), version, **kwargs)
+
+
+def test_pages_follow_the_cursor_to_the_end():
+    listing = make_listing()
+    offset, seen = 0, []
+    while True:
+        page = json.loads(listing.render(offset, 4, ("movieId", "title"), "json"))
+        seen += [movie["movieId"] for movie in page["movies"]]
+        if page["next_cursor"] is None:
+            break
+        offset = listing.decode_cursor(page["next_cursor"])
+    assert seen == list(range(100, 110))
+
+
+def test_ndjson_renders_one_row_per_line():
+    lines = make_listing().render(8, None, ("index",), "ndjson").decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{"index": 8}, {"index": 9}]
+
+
+@pytest.mark.parametrize("cursor, status", [
+    ("not-base64!", 400),
+    (base64.urlsafe_b64encode(b"v1:-1").decode(), 400),
+    (base64.urlsafe_b64encode(b"v1:11").decode(), 400),
+    (base64.urlsafe_b64encode(b"v0:2").decode(), 410),
+])
+def test_bad_cursors_are_rejected(cursor, status):
+    with pytest.raises(HTTPException) as error:
+        make_listing().decode_cursor(cursor)
+    assert error.value.status_code == status
+
+
+def test_last_cursor_points_past_the_end():
+    listing = make_listing()
+    assert listing.decode_cursor(listing.encode_cursor(len(TITLES))) == len(TITLES)
+
+
+def test_etag_depends_on_version_and_parameters():
+    listing = make_listing()
+    etag = listing.etag(0, 5, ("title",), "json")
+    assert etag == make_listing().etag(0, 5, ("title",), "json")
+    assert len({etag, listing.etag(5, 5, ("title",), "json"), listing.etag(0, 5, ("index",), "json"),
+                listing.etag(0, 5, ("title",), "ndjson"), make_listing("v2").etag(0, 5, ("title",), "json")}) == 5
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ("*", True),
+    ('"ab"', False),
+    ('"abcd"', False),
+    ('"xabc"', False),
+])
+def test_if_none_match(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+def test_page_cache_hits_and_byte_cap():
+    listing = make_listing()
+    first = listing.render(0, 2, ("title",), "json")
+    assert listing.render(0, 2, ("title",), "json") is first
+    assert listing.stats()["hits"] == 1 and listing.stats()["bytes"] == len(first)
+
+    capped = make_listing(max_cached_bytes=len(first) + 10)
+    capped.render(0, 2, ("title",), "json")
+    capped.render(2, 2, ("title",), "json")
+    assert capped.stats()["entries"] == 1 and capped.stats()["evictions"] == 1
+    capped.render(0, None, ("title",), "json")
+    assert capped.stats()["entries"] == 1 and capped.stats()["bytes"] <= len(first) + 10
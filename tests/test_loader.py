@@ -0,0 +1,30 @@
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.models.loader import ModelLoader
+
+
+def test_watcher_retries_a_change_it_could_not_reload(monkeypatch):
+    loader = ModelLoader()
+    fingerprints = iter(["a", "b"])
+    monkeypatch.setattr(loader, "artifact_fingerprint", lambda: next(fingerprints, "b"))
+    reloads = []
+    done = threading.Event()
+
+    def reload_models():
+        reloads.append(time.monotonic())
+        if len(reloads) == 1:
+            raise HTTPException(status_code=409, detail="A model reload is already in progress")
+        done.set()
+
+    monkeypatch.setattr(loader, "reload_models", reload_models)
+    loader.start_watching(0.01)
+    try:
+        assert done.wait(5)
+        time.sleep(0.05)
+    finally:
+        loader.stop_watching()
+    # The rejected reload is retried once; after the successful one the change is recorded
+    assert len(reloads) == 2
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.profiler import SamplingProfiler, profiler
+
+
+def test_slow_request_stacks_are_written_as_folded_lines(tmp_path):
+    sampler = SamplingProfiler()
+    sampler.start(0.05, tmp_path, interval=0.002)
+    try:
+        start = time.perf_counter()
+        worker = threading.Thread(target=time.sleep, args=(0.1,))
+        worker.start()
+        worker.join()
+        stop = time.perf_counter()
+        assert sampler.record("GET /fast", start, start + 0.01) is None
+        path = sampler.record("GET /movies/1", start, stop)
+    finally:
+        sampler.stop()
+
+    assert path.parent == tmp_path and "GET__movies_1" in path.name
+    lines = path.read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert sampler.describe()["dumps"] == 1
+
+
+def test_middleware_writes_profiles_off_the_event_loop(monkeypatch):
+    calls = []
+
+    def record(label, start, stop):
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append(label)
+
+    monkeypatch.setattr(profiler, "is_slow", lambda seconds: True)
+    monkeypatch.setattr(profiler, "record", record)
+    TestClient(app).get("/metrics")
+    assert calls == ["GET /metrics"]
@@ -0,0 +1,38 @@
+from app.models.search import TitleSearchIndex, normalize_title
+
+TITLES = [
+    "Toy Story (1995)",
+    "Toy Story 2 (1999)",
+    "Matrix, The (1999)",
+    "Amélie (Fabuleux destin d'Amélie Poulain, Le) (2001)",
+    "Heat (1995)",
+]
+
+
+def test_normalize_title():
+    assert normalize_title("Matrix, The (1999)") == "the matrix"
+    assert normalize_title("  Amélie!  ") == "amelie"
+
+
+def test_exact_matches_rank_before_prefix_matches():
+    results = TitleSearchIndex(TITLES).search("toy story")
+    assert [result["index"] for result in results[:2]] == [0, 1]
+    assert [result["match"] for result in results[:2]] == ["exact", "prefix"]
+
+
+def test_leading_article_is_optional():
+    index = TitleSearchIndex(TITLES)
+    assert index.search("matrix")[0]["index"] == 2
+    assert index.search("the matrix (1999)")[0]["match"] == "exact"
+
+
+def test_typos_fall_back_to_trigram_matches():
+    results = TitleSearchIndex(TITLES).search("toy stroy", limit=2)
+    assert {result["index"] for result in results} == {0, 1}
+    assert all(result["match"] == "fuzzy" for result in results)
+
+
+def test_limit_and_empty_queries():
+    index = TitleSearchIndex(TITLES)
+    assert len(index.search("toy", limit=1)) == 1
+    assert index.search("!!!") == []
@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.models.users import UserHistory
+
+
+def test_build_maps_ids_and_keeps_the_last_duplicate_rating():
+    catalog_movie_ids = np.array([10, 30, 20])
+    history = UserHistory.build(
+        user_ids=np.array([7, 3, 7, 3, 7, 3]),
+        movie_ids=np.array([20, 10, 10, 99, 20, 30]),
+        ratings=np.array([1.0, 4.0, 3.5, 5.0, 2.5, 2.0]),
+        catalog_movie_ids=catalog_movie_ids
+    )
+
+    assert history.user_ids.tolist() == [3, 7]
+    items, ratings = history.history(history.position(3))
+    assert items.tolist() == [0, 1] and ratings.tolist() == [4.0, 2.0]
+    items, ratings = history.history(history.position(7))
+    assert items.tolist() == [0, 2] and ratings.tolist() == [3.5, 2.5]
+    assert history.position(5) is None
+    assert history.describe()["ratings"] == 4
+
+
+def test_checksums_change_only_for_changed_users():
+    catalog_movie_ids = np.array([10, 20])
+    before = UserHistory.build(np.array([1, 2]), np.array([10, 20]), np.array([3.0, 4.0]), catalog_movie_ids)
+    after = UserHistory.build(np.array([1, 2]), np.array([10, 20]), np.array([3.0, 4.5]), catalog_movie_ids)
+    assert before.checksums[0] == after.checksums[0]
+    assert before.checksums[1] != after.checksums[1]
+
+
+def test_save_and_load(tmp_path):
+    history = UserHistory.build(np.array([1]), np.array([10]), np.array([5.0]), np.array([10]))
+    history.save(tmp_path)
+    loaded = UserHistory.load(tmp_path)
+    assert loaded.version == history.version
+    assert loaded.history(0)[0].tolist() == [0]